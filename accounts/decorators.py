@@ -0,0 +1,27 @@
+from functools import wraps
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect
+
+from .principal import get_principal
+
+
+def employee_required(view_func=None, denied_message=None):
+    """
+    Login required, and only employees/admins get through — everyone else is sent home.
+    Pass `denied_message` to flash an error before redirecting.
+    """
+    def decorator(func):
+        @wraps(func)
+        def _wrapped(request, *args, **kwargs):
+            if not get_principal(request).is_staff_member:
+                if denied_message:
+                    messages.error(request, denied_message)
+                return redirect('home')
+            return func(request, *args, **kwargs)
+        return login_required(_wrapped)
+
+    if view_func is not None:
+        return decorator(view_func)
+    return decorator
@@ -0,0 +1,19 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from .principal import get_principal
+
+
+class PrincipalMiddleware:
+    """Attach a lazily-resolved `request.principal`. Must come after AuthenticationMiddleware."""
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.principal = SimpleLazyObject(lambda: get_principal(request))
+        return self.get_response(request)  # a coroutine under ASGI, awaited by the caller
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:25
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate('mobile_number', 'NOCASE'), name='user_mobile_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate('first_name', 'NOCASE'), name='user_first_name_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate('last_name', 'NOCASE'), name='user_last_name_nocase_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.db.models.functions import Collate
 from django.utils import timezone
 import random
 import string
@@ -49,6 +50,15 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    class Meta:
+        indexes = [
+            # Admin search and autocomplete: LIKE 'prefix%' can only use an index in SQLite's
+            # NOCASE collation (see core.admin_tools)
+            models.Index(Collate('mobile_number', 'NOCASE'), name='user_mobile_nocase_idx'),
+            models.Index(Collate('first_name', 'NOCASE'), name='user_first_name_nocase_idx'),
+            models.Index(Collate('last_name', 'NOCASE'), name='user_last_name_nocase_idx'),
+        ]
+
     def __str__(self):
         return f"{self.get_full_name() or self.mobile_number} ({self.role})"
 
@@ -95,6 +105,12 @@ class OTPVerification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            # OTP verification and the invalidate-previous update in generate_otp (unused OTPs only)
+            models.Index(fields=['mobile_number', 'purpose'], condition=models.Q(is_used=False), name='otp_mobile_purpose_unused_idx'),
+        ]
+
     def is_valid(self):
         return not self.is_used and timezone.now() < self.expires_at
 
@@ -110,6 +126,18 @@ class OTPVerification(models.Model):
             expires_at=expires_at
         )
 
+    @classmethod
+    async def agenerate_otp(cls, mobile_number, purpose='login'):
+        otp = ''.join(random.choices(string.digits, k=6))
+        expires_at = timezone.now() + timezone.timedelta(minutes=10)
+        await cls.objects.filter(mobile_number=mobile_number, purpose=purpose, is_used=False).aupdate(is_used=True)
+        return await cls.objects.acreate(
+            mobile_number=mobile_number,
+            otp=otp,
+            purpose=purpose,
+            expires_at=expires_at
+        )
+
     def __str__(self):
         return f"OTP for {self.mobile_number} - {self.purpose}"
 
@@ -132,6 +160,13 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Notification list, newest first
+            models.Index(fields=['user', 'created_at'], name='notif_user_created_idx'),
+            # Unread badge. Partial, because filter(is_read=False) compiles to NOT is_read,
+            # which SQLite cannot seek on as an index column but can match to this condition
+            models.Index(fields=['user', 'created_at'], condition=models.Q(is_read=False), name='notif_user_unread_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.user.mobile_number}"
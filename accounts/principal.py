@@ -0,0 +1,84 @@
+"""
+Per-request principal: the user, their role, employee profile and service center
+resolved once with a single joined query and memoized in the cache by user ID.
+Also the per-center staff version that keys cached worker-list fragments.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+STAFF_ROLES = ('employee', 'admin')
+PRINCIPAL_CACHE_TIMEOUT = getattr(settings, 'PRINCIPAL_CACHE_TIMEOUT', 60)
+
+
+def principal_cache_key(user_id):
+    return f'principal:{user_id}'
+
+
+class Principal:
+    """Who is making the request — the views only ever read these four attributes."""
+    __slots__ = ('user', 'role', 'employee', 'center')
+
+    def __init__(self, user, employee=None):
+        self.user = user
+        self.role = getattr(user, 'role', None) if user.is_authenticated else None
+        self.employee = employee
+        self.center = employee.service_center if employee else None
+
+    @property
+    def is_staff_member(self):
+        return self.role in STAFF_ROLES
+
+    def __repr__(self):
+        return f'<Principal user={self.user.pk} role={self.role} center={getattr(self.center, "pk", None)}>'
+
+
+def load_employee(user):
+    """Employee profile (with its service center) for `user`, from cache or one query."""
+    from .models import Employee
+
+    key = principal_cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is None:
+        employee = Employee.objects.select_related('service_center').filter(user_id=user.pk).first()
+        # Wrapped in a tuple so "no employee profile" is cached too
+        cached = (employee,)
+        cache.set(key, cached, PRINCIPAL_CACHE_TIMEOUT)
+    employee = cached[0]
+    if employee is not None:
+        employee.user = user
+    return employee
+
+
+def get_principal(request):
+    if not hasattr(request, '_cached_principal'):
+        user = request.user
+        employee = load_employee(user) if user.is_authenticated and user.role in STAFF_ROLES else None
+        request._cached_principal = Principal(user, employee)
+    return request._cached_principal
+
+
+def invalidate_principal(user_id):
+    cache.delete(principal_cache_key(user_id))
+
+
+# ── Center staff version ─────────────────────────────────────────────
+
+def _staff_version_key(center_id):
+    return f'center-staff:{center_id}'
+
+
+def center_staff_version(center_id):
+    """Opaque token that changes whenever an employee of the center (or their user) changes."""
+    key = _staff_version_key(center_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_center_staff(center_id):
+    if center_id is not None:
+        cache.set(_staff_version_key(center_id), time.time_ns(), None)
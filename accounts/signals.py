@@ -0,0 +1,37 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from core.models import ServiceCenter
+from .models import Employee, User
+from .principal import STAFF_ROLES, bump_center_staff, invalidate_principal
+
+
+@receiver([post_save, post_delete], sender=Employee)
+def employee_changed(sender, instance, **kwargs):
+    invalidate_principal(instance.user_id)
+    bump_center_staff(instance.service_center_id)
+
+
+@receiver(pre_save, sender=Employee)
+def employee_moving(sender, instance, **kwargs):
+    # The center they leave drops them from its worker list too
+    if instance.pk:
+        old_center_id = Employee.objects.filter(pk=instance.pk).values_list('service_center_id', flat=True).first()
+        if old_center_id != instance.service_center_id:
+            bump_center_staff(old_center_id)
+
+
+@receiver(post_save, sender=User)
+def staff_user_changed(sender, instance, update_fields=None, **kwargs):
+    # Worker lists show names; logins only touch last_login
+    if instance.role not in STAFF_ROLES or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    for center_id in Employee.objects.filter(user=instance).values_list('service_center_id', flat=True):
+        bump_center_staff(center_id)
+
+
+@receiver(post_save, sender=ServiceCenter)
+def service_center_changed(sender, instance, **kwargs):
+    # Cached principals carry the center row; drop the ones that point at it
+    for user_id in Employee.objects.filter(service_center=instance).values_list('user_id', flat=True):
+        invalidate_principal(user_id)
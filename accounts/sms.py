@@ -0,0 +1,75 @@
+"""
+Pluggable SMS delivery. settings.SMS_BACKEND names the class to use:
+
+  accounts.sms.ConsoleBackend  — print messages to the console (development default)
+  accounts.sms.DummyBackend    — discard them; for load tests, which read OTPs from the database
+  accounts.sms.LocmemBackend   — keep them in `LocmemBackend.outbox`; for scripted checks
+
+A production gateway (Fast2SMS, MSG91, Twilio) is one more class with a `send` method,
+and optionally an `asend` coroutine that async views use instead of a worker thread.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class ConsoleBackend:
+    def send(self, mobile_number, message):
+        print(f"[SMS] → {mobile_number}: {message}")
+
+
+class DummyBackend:
+    def send(self, mobile_number, message):
+        pass
+
+
+class LocmemBackend:
+    outbox = []
+
+    def send(self, mobile_number, message):
+        self.outbox.append((mobile_number, message))
+
+
+_backend = None
+_backend_path = None
+
+
+def get_backend():
+    global _backend, _backend_path
+    path = getattr(settings, 'SMS_BACKEND', 'accounts.sms.ConsoleBackend')
+    if _backend is None or path != _backend_path:
+        _backend, _backend_path = import_string(path)(), path
+    return _backend
+
+
+def send_sms(mobile_number, message):
+    get_backend().send(mobile_number, message)
+
+
+async def asend_sms(mobile_number, message):
+    backend = get_backend()
+    if hasattr(backend, 'asend'):
+        await backend.asend(mobile_number, message)
+    else:
+        # Gateway calls touch no Django state, so any thread will do
+        await sync_to_async(backend.send, thread_sensitive=False)(mobile_number, message)
+
+
+# ── OTP ──────────────────────────────────────────────────────────────
+
+def send_otp(mobile_number, otp, purpose='login'):
+    """
+    Send OTP via the configured SMS backend.
+    For development the console backend prints it.
+    """
+    send_sms(mobile_number, _otp_message(otp, purpose))
+    return True
+
+
+async def asend_otp(mobile_number, otp, purpose='login'):
+    await asend_sms(mobile_number, _otp_message(otp, purpose))
+    return True
+
+
+def _otp_message(otp, purpose):
+    return f'Your Smart Repair OTP is {otp} ({purpose}). Valid for 10 minutes.'
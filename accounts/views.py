@@ -1,37 +1,28 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login, logout, authenticate
+import logging
+
+from django.shortcuts import render, redirect
+from django.contrib.auth import login, logout
 from django.contrib import messages
 from django.utils import timezone
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.http import JsonResponse
-import json
-from django.utils import timezone
-from django.db.models import Count
-from bookings.models import Booking
-import csv
-from django.http import HttpResponse
-from bookings.models import Booking # Adjust import based on your structure
+from django.http import HttpResponse, JsonResponse
 
 from .models import User, Employee, OTPVerification, Notification
+from .decorators import employee_required
+from .sms import asend_otp, send_otp
+from core.async_utils import session_get
+from core.ratelimit import ratelimit
+from smart_repair import shards
+from smart_repair.routers import read_replica
 
-
-def send_otp(mobile_number, otp, purpose='login'):
-    """
-    Send OTP via SMS. Integrate with Fast2SMS, Twilio, or MSG91.
-    For development, OTP is printed to console.
-    """
-    print(f"[DEV] OTP for {mobile_number} ({purpose}): {otp}")
-    # Production: Use Fast2SMS API
-    # import requests
-    # url = "https://www.fast2sms.com/dev/bulkV2"
-    # payload = {"route":"v3","sender_id":"SMTRPR","message":f"Your Smart Repair OTP is {otp}. Valid for 10 minutes.","language":"english","flash":0,"numbers":mobile_number}
-    # headers = {"authorization": settings.SMS_API_KEY, "Content-Type": "application/json"}
-    # requests.post(url, json=payload, headers=headers)
-    return True
+logger = logging.getLogger(__name__)
 
 
 @ensure_csrf_cookie
+@ratelimit('otp_send', 'login',
+           mobile=lambda request: request.POST.get('mobile_number'),
+           when=lambda request: request.POST.get('action') == 'send_otp')
 def customer_login(request):
     if request.user.is_authenticated:
         return redirect('home')
@@ -122,7 +113,10 @@ def employee_login(request):
 
     return render(request, 'accounts/employee_login.html')
 
+@read_replica
 def export_bookings_excel(request):
+    import csv
+    from bookings.models import Booking
     # Get filters from request if any
     status = request.GET.get('status')
     
@@ -132,11 +126,11 @@ def export_bookings_excel(request):
     writer = csv.writer(response)
     writer.writerow(['Booking ID', 'Customer', 'Vehicle', 'Status', 'Date'])
     
-    bookings = Booking.objects.all()
+    bookings = Booking.objects.select_related('customer', 'vehicle')
     if status:
         bookings = bookings.filter(status=status)
         
-    for b in bookings:
+    for b in shards.fan_out(lambda: bookings):
         writer.writerow([b.booking_id, b.customer.get_full_name() or b.customer.mobile_number, b.vehicle.vehicle_number, b.booking_date.strftime('%d %b %Y'), b.get_booking_type_display().upper(), b.get_status_display().upper(), b.estimated_total])
         
     return response
@@ -145,6 +139,7 @@ def export_bookings_excel(request):
 
 
 @ensure_csrf_cookie
+@ratelimit('otp_send', 'register', mobile=lambda request: request.POST.get('mobile_number'))
 def customer_register(request):
     if request.user.is_authenticated:
         return redirect('home')
@@ -254,20 +249,21 @@ def notifications_view(request):
     return render(request, 'accounts/notifications.html', {'notifications': notifs})
 
 
-@login_required
+@employee_required(denied_message='Access denied.')
+@read_replica
 def employee_dashboard(request):
-    if request.user.role not in ['employee', 'admin']:
-        messages.error(request, 'Access denied.')
-        return redirect('home')
-
+    from bookings.models import Booking
+    employee = request.principal.employee
+    center = request.principal.center
     try:
-        employee = request.user.employee_profile
-        center = employee.service_center
+        if employee is None:
+            raise Employee.DoesNotExist('No employee profile for this user')
         today = timezone.now().date()
         first_day_of_month = today.replace(day=1)
 
         # 1. Fetch exactly what you need for the table (Recent 20)
-        recent_bookings = Booking.objects.filter(service_center=center).order_by('-created_at')[:20]
+        recent_bookings = (Booking.objects.filter(service_center=center)
+                           .select_related('customer', 'vehicle').order_by('-created_at')[:20])
 
         # 2. Global counts for the center (Not limited to the top 20)
         pending = Booking.objects.filter(service_center=center, status='pending').count()
@@ -286,9 +282,8 @@ def employee_dashboard(request):
             created_at__date__gte=first_day_of_month
         ).count()
 
-    except Exception as e:
-        # It's better to log the error than a bare except
-        print(f"Dashboard Error: {e}")
+    except Exception:
+        logger.exception('Employee dashboard failed for user %s', request.user.pk)
         employee = None
         recent_bookings = []
         pending = in_progress = completed_today = total_this_month = 0
@@ -302,12 +297,15 @@ def employee_dashboard(request):
         'total_this_month': total_this_month,
     })
 
-def resend_otp(request):
+@ratelimit('otp_send', lambda request: request.POST.get('purpose', 'login'),
+           mobile=lambda request: request.session.get('login_mobile') or request.POST.get('mobile'),
+           json=True)
+async def resend_otp(request):
     if request.method == 'POST':
-        mobile = request.session.get('login_mobile') or request.POST.get('mobile')
+        mobile = await session_get(request, 'login_mobile') or request.POST.get('mobile')
         purpose = request.POST.get('purpose', 'login')
         if mobile:
-            otp_obj = OTPVerification.generate_otp(mobile, purpose=purpose)
-            send_otp(mobile, otp_obj.otp, purpose)
+            otp_obj = await OTPVerification.agenerate_otp(mobile, purpose=purpose)
+            await asend_otp(mobile, otp_obj.otp, purpose)
             return JsonResponse({'success': True, 'message': 'OTP resent successfully!'})
     return JsonResponse({'success': False, 'message': 'Failed to resend OTP.'})
@@ -1,4 +1,9 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.template.response import TemplateResponse
+
+from core.admin_tools import LargeTableMixin
+from . import bulk
 from .models import RepairIssue, Vehicle, TimeSlot, Booking, RepairCharge, ServiceRecord, WorkAssignment
 
 
@@ -12,41 +17,108 @@ class RepairIssueAdmin(admin.ModelAdmin):
 
 
 @admin.register(Vehicle)
-class VehicleAdmin(admin.ModelAdmin):
+class VehicleAdmin(LargeTableMixin, admin.ModelAdmin):
     list_display = ['vehicle_number', 'owner', 'vehicle_type', 'make', 'model', 'year']
-    search_fields = ['vehicle_number', 'owner__mobile_number', 'make', 'model']
+    list_select_related = ['owner']
+    search_fields = ['vehicle_number', 'owner__mobile_number']
     list_filter = ['vehicle_type', 'fuel_type']
+    autocomplete_fields = ['owner']
+
+
+class ResizeSlotsForm(forms.Form):
+    max_bookings = forms.IntegerField(min_value=1, max_value=100)
 
 
 @admin.register(TimeSlot)
-class TimeSlotAdmin(admin.ModelAdmin):
+class TimeSlotAdmin(LargeTableMixin, admin.ModelAdmin):
     list_display = ['service_center', 'date', 'start_time', 'end_time', 'max_bookings', 'current_bookings', 'is_available']
+    list_select_related = ['service_center']
     list_filter = ['service_center', 'date', 'is_available']
     list_editable = ['is_available', 'max_bookings']
+    search_fields = ['service_center__name']
+    autocomplete_fields = ['service_center']
+    actions = ['open_slots', 'close_slots', 'resize_slots']
+
+    @admin.action(description='Open selected slots (full slots stay closed)')
+    def open_slots(self, request, queryset):
+        self.message_user(request, f'{bulk.set_slots_open(queryset, True)} slots opened.')
+
+    @admin.action(description='Close selected slots')
+    def close_slots(self, request, queryset):
+        self.message_user(request, f'{bulk.set_slots_open(queryset, False)} slots closed.')
+
+    @admin.action(description='Change max bookings of selected slots')
+    def resize_slots(self, request, queryset):
+        form = ResizeSlotsForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            resized = bulk.resize_slots(queryset, form.cleaned_data['max_bookings'])
+            self.message_user(request, f'{resized} slots now take {form.cleaned_data["max_bookings"]} bookings.')
+            return None
+        return TemplateResponse(request, 'admin/bookings/timeslot/resize_slots.html', {
+            **self.admin_site.each_context(request),
+            'title': 'Change max bookings', 'opts': self.model._meta, 'form': form,
+            'selected': request.POST.getlist(admin.helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'count': queryset.count(),
+        })
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(LargeTableMixin, admin.ModelAdmin):
     list_display = ['booking_id', 'customer', 'vehicle', 'service_center', 'booking_date', 'status', 'booking_type', 'estimated_total']
-    list_filter = ['status', 'booking_type', 'service_center']
+    list_select_related = ['customer', 'vehicle', 'service_center']
+    list_filter = ['status', 'booking_type', 'service_center', 'booking_date']
     search_fields = ['booking_id', 'customer__mobile_number', 'vehicle__vehicle_number']
-    date_hierarchy = 'booking_date'
-    filter_horizontal = ['selected_issues', 'service_types', 'assigned_workers']
+    autocomplete_fields = ['customer', 'vehicle', 'service_center', 'time_slot', 'assigned_employee',
+                           'selected_issues', 'service_types', 'assigned_workers']
+    actions = ['mark_confirmed', 'mark_in_progress', 'mark_completed', 'mark_cancelled']
+
+    def _change_status(self, request, queryset, status):
+        selected = queryset.count()
+        changed = bulk.change_status(queryset, status, request.user)
+        label = dict(Booking.STATUS_CHOICES)[status].lower()
+        self.message_user(request, f'{changed} bookings marked {label}.')
+        if changed < selected:
+            allowed = ' or '.join(bulk.TRANSITIONS[status]).replace('_', ' ')
+            self.message_user(request, f'{selected - changed} skipped: only {allowed} bookings can be marked {label}.',
+                              messages.WARNING)
+
+    @admin.action(description='Mark selected bookings confirmed')
+    def mark_confirmed(self, request, queryset):
+        self._change_status(request, queryset, 'confirmed')
+
+    @admin.action(description='Mark selected bookings in progress')
+    def mark_in_progress(self, request, queryset):
+        self._change_status(request, queryset, 'in_progress')
+
+    @admin.action(description='Mark selected bookings completed (notifies customers)')
+    def mark_completed(self, request, queryset):
+        self._change_status(request, queryset, 'completed')
+
+    @admin.action(description='Cancel selected bookings (notifies customers)')
+    def mark_cancelled(self, request, queryset):
+        self._change_status(request, queryset, 'cancelled')
 
 
 @admin.register(RepairCharge)
-class RepairChargeAdmin(admin.ModelAdmin):
+class RepairChargeAdmin(LargeTableMixin, admin.ModelAdmin):
     list_display = ['booking', 'description', 'charge_type', 'quantity', 'unit_price', 'total', 'is_extra', 'added_by']
+    list_select_related = ['booking__customer', 'added_by__user']
     list_filter = ['charge_type', 'is_extra']
-    search_fields = ['description', 'booking__booking_id']
+    search_fields = ['booking__booking_id']
+    autocomplete_fields = ['booking', 'repair_issue', 'added_by']
 
 
 @admin.register(ServiceRecord)
-class ServiceRecordAdmin(admin.ModelAdmin):
+class ServiceRecordAdmin(LargeTableMixin, admin.ModelAdmin):
     list_display = ['booking', 'vehicle', 'employee', 'completed_at']
+    list_select_related = ['booking__customer', 'vehicle', 'employee__user']
+    autocomplete_fields = ['booking', 'vehicle', 'employee']
 
 
 @admin.register(WorkAssignment)
-class WorkAssignmentAdmin(admin.ModelAdmin):
+class WorkAssignmentAdmin(LargeTableMixin, admin.ModelAdmin):
     list_display = ['booking', 'worker', 'status', 'assigned_at']
+    list_select_related = ['booking__customer', 'worker__user']
     list_filter = ['status']
+    autocomplete_fields = ['booking', 'worker', 'assigned_issues']
@@ -0,0 +1,243 @@
+"""
+Archival tiering for closed bookings.
+
+Completed or cancelled bookings older than BOOKING_ARCHIVE_AFTER_DAYS are moved, a
+batch per transaction, into ArchivedBooking: one row per booking carrying a snapshot
+of the booking, its repair charges, work assignments, service record and payment.
+The live Booking / RepairCharge / WorkAssignment / ServiceRecord / Payment tables then
+hold only the working set the counter screens query.
+
+Views read history through the accessors at the bottom (`get_booking`, `get_payment`,
+`vehicle_history`, `archived_payments`). Archived rows come back as unsaved model
+instances with `archived = True`, related charges and records attached, so receipt
+and booking templates render them unchanged.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from smart_repair import shards
+
+from .models import ArchivedBooking, Booking, RepairCharge, ServiceRecord, WorkAssignment
+
+CLOSED_STATUSES = ('completed', 'cancelled')
+OPEN_PAYMENT_STATUSES = ('pending', 'failed')   # still being settled: leave them live
+ARCHIVE_AFTER_DAYS = getattr(settings, 'BOOKING_ARCHIVE_AFTER_DAYS', 365)
+
+
+def _models():
+    from payments.models import Payment, ServiceCharge
+    return Payment, ServiceCharge
+
+
+def archivable(older_than_days=None):
+    """Live bookings that are closed and untouched for `older_than_days`."""
+    days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    return (Booking.objects
+            .filter(status__in=CLOSED_STATUSES, booking_date__lt=cutoff.date(), updated_at__lt=cutoff)
+            .exclude(payment__payment_status__in=OPEN_PAYMENT_STATUSES))
+
+
+# ── Snapshot ─────────────────────────────────────────────────────────
+
+def _row(obj):
+    return {f.attname: f.value_from_object(obj) for f in obj._meta.concrete_fields}
+
+
+def _m2m(field, ids):
+    """{owner pk: [target pks]} for a many-to-many field, in one query."""
+    through = field.remote_field.through
+    source, target = field.m2m_field_name() + '_id', field.m2m_reverse_field_name() + '_id'
+    links = {}
+    for owner, other in through.objects.filter(**{source + '__in': ids}).values_list(source, target):
+        links.setdefault(owner, []).append(other)
+    return links
+
+
+def _group(queryset, ids):
+    grouped = {}
+    for obj in queryset.filter(booking_id__in=ids).order_by('pk'):
+        grouped.setdefault(obj.booking_id, []).append(obj)
+    return grouped
+
+
+def archive_batch(pks, older_than_days=None):
+    """Move the still-eligible bookings among `pks` into the archive. Returns how many moved."""
+    Payment, ServiceCharge = _models()
+    with transaction.atomic(using=router.db_for_write(Booking)):
+        bookings = list(archivable(older_than_days).filter(pk__in=pks).order_by('pk'))
+        if not bookings:
+            return 0
+        ids = [b.pk for b in bookings]
+        booking_m2m = {f.name: _m2m(f, ids) for f in Booking._meta.many_to_many}
+        charges = _group(RepairCharge.objects, ids)
+        legacy_charges = _group(ServiceCharge.objects, ids)
+        assignments = _group(WorkAssignment.objects, ids)
+        assigned_issues = _m2m(WorkAssignment._meta.get_field('assigned_issues'),
+                               [a.pk for rows in assignments.values() for a in rows])
+        records = {r.booking_id: r for r in ServiceRecord.objects.filter(booking_id__in=ids)}
+        payments = {p.booking_id: p for p in Payment.objects.filter(booking_id__in=ids)}
+
+        archived = []
+        for booking in bookings:
+            payment = payments.get(booking.pk)
+            record = records.get(booking.pk)
+            archived.append(ArchivedBooking(
+                id=booking.pk, booking_id=booking.booking_id, customer_id=booking.customer_id,
+                vehicle_id=booking.vehicle_id, service_center_id=booking.service_center_id,
+                status=booking.status, booking_date=booking.booking_date,
+                payment_id=payment.pk if payment else None,
+                receipt_number=payment.receipt_number if payment else '',
+                total_amount=payment.total_amount if payment else None,
+                snapshot=ArchivedBooking.pack({
+                    'booking': {**_row(booking), 'm2m': {name: links.get(booking.pk, []) for name, links in booking_m2m.items()}},
+                    'charges': [_row(c) for c in charges.get(booking.pk, [])],
+                    'legacy_charges': [_row(c) for c in legacy_charges.get(booking.pk, [])],
+                    'work_assignments': [
+                        {**_row(a), 'm2m': {'assigned_issues': assigned_issues.get(a.pk, [])}}
+                        for a in assignments.get(booking.pk, [])
+                    ],
+                    'service_record': _row(record) if record else None,
+                    'payment': _row(payment) if payment else None,
+                }),
+            ))
+        ArchivedBooking.objects.bulk_create(archived)
+        # Cascades to charges, assignments, service record, payment and the m2m link rows
+        Booking.objects.filter(pk__in=ids).delete()
+    return len(archived)
+
+
+# ── Restore for reading ──────────────────────────────────────────────
+
+def _instance(model, row):
+    fields = {f.attname: f for f in model._meta.concrete_fields}
+    obj = model(**{name: fields[name].to_python(value) for name, value in row.items() if name in fields})
+    obj._state.adding = False
+    obj.archived = True
+    return obj
+
+
+def _prefetched(model, objs):
+    """A queryset whose results are `objs`, as prefetch_related would cache it."""
+    queryset = model.objects.all()
+    queryset._result_cache = list(objs)
+    queryset._prefetch_done = True
+    return queryset
+
+
+def _attach_m2m(obj, m2m):
+    for name, pks in m2m.items():
+        field = obj._meta.get_field(name)
+        related = field.related_model.objects.filter(pk__in=pks)
+        obj._prefetched_objects_cache[name] = related
+
+
+def restore(archived):
+    """The archived booking as a read-only Booking with its related rows attached."""
+    Payment, ServiceCharge = _models()
+    data = archived.data
+    booking = _instance(Booking, data['booking'])
+    for name in ('customer', 'vehicle', 'service_center'):
+        if ArchivedBooking._meta.get_field(name).is_cached(archived):
+            setattr(booking, name, getattr(archived, name))
+    booking._prefetched_objects_cache = {}
+    _attach_m2m(booking, data['booking'].get('m2m', {}))
+
+    assignments = []
+    for row in data['work_assignments']:
+        assignment = _instance(WorkAssignment, row)
+        assignment._prefetched_objects_cache = {}
+        _attach_m2m(assignment, row.get('m2m', {}))
+        assignment.booking = booking
+        assignments.append(assignment)
+    charges = [_instance(RepairCharge, row) for row in data['charges']]
+    for charge in charges:
+        charge.booking = booking
+    booking._prefetched_objects_cache.update({
+        'repair_charges': _prefetched(RepairCharge, sorted(charges, key=lambda c: (c.charge_type, c.added_at))),
+        'legacy_charges': _prefetched(ServiceCharge, [_instance(ServiceCharge, row) for row in data['legacy_charges']]),
+        'work_assignments': _prefetched(WorkAssignment, assignments),
+    })
+
+    record = _instance(ServiceRecord, data['service_record']) if data['service_record'] else None
+    payment = _instance(Payment, data['payment']) if data['payment'] else None
+    for descriptor, value in ((Booking.service_record, record), (Booking.payment, payment)):
+        descriptor.related.set_cached_value(booking, value)
+        if value is not None:
+            value.booking = booking
+    return booking
+
+
+def _detailed(archived):
+    """restore() plus the charges' issues and the billing employee a detail page shows."""
+    booking = restore(archived)
+    prefetch_related_objects(list(booking.repair_charges.all()), 'repair_issue')
+    if archived.payment_id:
+        prefetch_related_objects([booking.payment], 'billed_by__user')
+    return booking
+
+
+# ── Unified accessors ────────────────────────────────────────────────
+
+_JOINED = ('customer', 'vehicle', 'service_center')
+
+
+def get_booking(pk, **filters):
+    """A live Booking, else the restored archived one, else None. `filters` apply to both
+    (use field names common to Booking and ArchivedBooking, e.g. customer=user)."""
+    booking = Booking.objects.filter(pk=pk, **filters).first()
+    if booking is not None:
+        return booking
+    archived = ArchivedBooking.objects.filter(pk=pk, **filters).select_related(*_JOINED).first()
+    return _detailed(archived) if archived else None
+
+
+def get_payment(pk):
+    """A live Payment (booking, customer, vehicle and center joined), else an archived one."""
+    Payment, _ = _models()
+    payment = (Payment.objects
+               .select_related('booking__customer', 'booking__vehicle', 'booking__service_center', 'billed_by__user')
+               .filter(pk=pk).first())
+    if payment is not None:
+        return payment
+    archived = ArchivedBooking.objects.filter(payment_id=pk).select_related(*_JOINED).first()
+    return _detailed(archived).payment if archived else None
+
+
+def vehicle_history(vehicle):
+    """Every booking of `vehicle`, live and archived, newest first."""
+    live = shards.fan_out(lambda: Booking.objects.filter(vehicle=vehicle)
+                          .select_related('service_center', 'service_record', 'payment'))
+    archived = [restore(row) for row in shards.fan_out(
+        lambda: ArchivedBooking.objects.filter(vehicle=vehicle).select_related('service_center'))]
+    return sorted(live + archived, key=lambda b: (b.booking_date, b.pk), reverse=True)
+
+
+def archived_payments(customer):
+    """Restored payments of `customer`'s archived bookings, newest first."""
+    rows = shards.fan_out(lambda: ArchivedBooking.objects.filter(customer=customer, payment_id__isnull=False))
+    return [restore(a).payment for a in rows]
+
+
+def table_sizes(using='default'):
+    """{table: (rows, bytes)} for the hot tables archival shrinks (bytes need SQLite's dbstat)."""
+    Payment, ServiceCharge = _models()
+    tables = [m._meta.db_table for m in (Booking, RepairCharge, WorkAssignment, ServiceRecord, Payment, ServiceCharge)]
+    tables += [f.remote_field.through._meta.db_table for f in Booking._meta.many_to_many]
+    tables.append(ArchivedBooking._meta.db_table)
+    sizes = {}
+    with connections[using].cursor() as cursor:
+        for table in tables:
+            cursor.execute(f'SELECT COUNT(*) FROM "{table}"')
+            rows = cursor.fetchone()[0]
+            try:
+                cursor.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = %s', [table])
+                size = cursor.fetchone()[0] or 0
+            except Exception:  # dbstat is a compile-time option
+                size = None
+            sizes[table] = (rows, size)
+    return sizes
@@ -0,0 +1,138 @@
+"""
+Set-based status and slot changes for the admin and the staff screens.
+
+Each operation is a handful of UPDATEs in one transaction rather than a save() per
+row, so no per-row post_save receivers run. What has to react to the change — the
+customers' notifications here, caches and listeners elsewhere — runs once per batch,
+after the transaction commits: receivers of `bookings_changed` and `slots_changed`
+get every affected pk in one call.
+"""
+from django.db import transaction
+from django.db.models import BooleanField, Case, F, Value, When
+from django.utils import timezone
+
+from accounts.models import Notification
+from accounts.sms import send_sms
+from smart_repair import shards
+
+from .models import Booking, TimeSlot
+from .signals import bookings_changed, slots_changed
+
+# The statuses a booking may move to in bulk, and from which
+TRANSITIONS = {
+    'confirmed':   ('pending',),
+    'in_progress': ('pending', 'confirmed'),
+    'completed':   ('confirmed', 'in_progress'),
+    'cancelled':   ('pending', 'confirmed'),
+}
+
+# (title, message, notification type) sent to the customer, as the single-booking views do
+NOTIFICATIONS = {
+    'completed': ('🎉 Service Completed!',
+                  'Vehicle {vehicle} service done at {center}. Booking: {booking_id}', 'service_complete'),
+    'cancelled': ('Booking Cancelled',
+                  'Booking {booking_id} on {date} at {center} was cancelled by the service center.', 'general'),
+}
+
+# Rows per UPDATE … WHERE pk IN (…), well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+
+def _chunks(pks):
+    for i in range(0, len(pks), CHUNK_SIZE):
+        yield pks[i:i + CHUNK_SIZE]
+
+
+# ── Bookings ─────────────────────────────────────────────────────────
+
+def change_status(queryset, status, actor=None, notify=True):
+    """
+    Move every booking in `queryset` that TRANSITIONS allows to `status`, logging an
+    event for each. Returns the number changed; bookings in any other status are left alone.
+    """
+    # Here rather than at the top: the admin imports this module at django.setup()
+    from . import changes, events
+    using = queryset.db
+    now = timezone.now()
+    updates = {'status': status, 'updated_at': now}
+    if status == 'completed':
+        updates['completed_at'] = now
+    with transaction.atomic(using=using):
+        rows = list(queryset.filter(status__in=TRANSITIONS[status]).order_by().values_list(
+            'pk', 'booking_id', 'booking_date', 'customer_id', 'customer__mobile_number',
+            'vehicle__vehicle_number', 'service_center__name', 'service_center_id',
+        ))
+        pks = [row[0] for row in rows]
+        for chunk in _chunks(pks):
+            Booking.objects.using(using).filter(pk__in=chunk).update(**updates)
+        events.record_many([events.event_for(row[0], row[-1], status, actor, at=now, bulk=True) for row in rows],
+                           using=using)
+        changes.record_many('booking', [(row[-1], row[0]) for row in rows], using)
+
+        def changed():
+            if notify and status in NOTIFICATIONS:
+                _notify(rows, *NOTIFICATIONS[status])
+            bookings_changed.send(sender=Booking, using=using, pks=pks, fields=list(updates))
+        if pks:
+            transaction.on_commit(changed, using=using)
+    return len(pks)
+
+
+def _notify(rows, title, template, notification_type):
+    messages = [
+        (customer_id, mobile, template.format(booking_id=booking_id, date=date.strftime('%d %b %Y'),
+                                              vehicle=vehicle, center=center))
+        for _, booking_id, date, customer_id, mobile, vehicle, center, _ in rows
+    ]
+    Notification.objects.bulk_create([
+        Notification(user_id=customer_id, title=title, message=message, notification_type=notification_type)
+        for customer_id, _, message in messages
+    ], batch_size=CHUNK_SIZE)
+    for _, mobile, message in messages:
+        send_sms(mobile, message[:100])
+
+
+# ── Time slots ───────────────────────────────────────────────────────
+
+def center_slots(center_id, start, end):
+    """A center's slots from `start` to `end` inclusive, on its shard."""
+    alias = shards.for_center(center_id)
+    return TimeSlot.objects.using(alias).filter(service_center_id=center_id, date__range=(start, end))
+
+
+def set_slots_open(queryset, is_open):
+    """
+    Open or close every slot in `queryset`. Full slots stay closed when opening.
+    Returns the number of slots changed.
+    """
+    queryset = queryset.filter(is_available=not is_open)
+    if is_open:
+        queryset = queryset.filter(current_bookings__lt=F('max_bookings'))
+    return _update_slots(queryset, is_available=is_open)
+
+
+def resize_slots(queryset, max_bookings):
+    """
+    Set `max_bookings` on every slot in `queryset`. Slots the new size fills are closed,
+    slots that were only closed for being full reopen, and closed slots with room stay
+    closed. Returns the number of slots changed.
+    """
+    return _update_slots(queryset, max_bookings=max_bookings, is_available=Case(
+        # Every right-hand side sees the row as it was before the UPDATE
+        When(current_bookings__gte=max_bookings, then=Value(False)),
+        When(current_bookings__gte=F('max_bookings'), then=Value(True)),
+        default=F('is_available'), output_field=BooleanField(),
+    ))
+
+
+def _update_slots(queryset, **fields):
+    using = queryset.db
+    with transaction.atomic(using=using):
+        pks = list(queryset.order_by().values_list('pk', flat=True))
+        for chunk in _chunks(pks):
+            TimeSlot.objects.using(using).filter(pk__in=chunk).update(**fields)
+        if pks:
+            transaction.on_commit(
+                lambda: slots_changed.send(sender=TimeSlot, using=using, pks=pks, fields=list(fields)), using=using
+            )
+    return len(pks)
@@ -0,0 +1,223 @@
+"""
+Delta sync for the employee counter screens and the mobile app.
+
+Every save or delete of a Booking, RepairCharge or WorkAssignment appends a SyncChange
+row in the same transaction (bookings/signals.py; bulk.change_status and the charges
+picked at booking time record theirs directly, as they bypass save()). Its
+AUTOINCREMENT pk is the sequence: SQLite lets one writer commit at a time, so rows
+become visible in pk order and a client that has read up to pk N never misses a later
+commit with a smaller pk.
+
+`feed(center_id, cursor)` answers one poll of `employee_changes`:
+
+  no cursor         — start a local copy: the center's live bookings a page at a time,
+                      with their charges and assignments, then everything changed since
+                      the copy began
+  "<seq>:<after>"   — the next page of that copy
+  "<seq>"           — what changed after seq: a range scan of (service_center, id), so
+                      a poll costs in proportion to the changes, not to the center's
+                      bookings
+
+Clients call again while `more` is true. Each object comes back once, as it is now,
+however often it changed; deleted ones come back as ids under `deleted`. A booking's
+tombstone stands for its charges and assignments too. A cursor from before rows that
+`prune()` removed gets `reset: true` and the first page of a fresh copy.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, QuerySet, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from smart_repair import shards
+
+from .models import Booking, RepairCharge, SyncChange, WorkAssignment
+
+PAGE_SIZE = getattr(settings, 'SYNC_PAGE_SIZE', 500)
+RETENTION_DAYS = getattr(settings, 'SYNC_RETENTION_DAYS', 30)
+
+KINDS = {'booking': Booking, 'charge': RepairCharge, 'assignment': WorkAssignment}
+DELETED_KEYS = {'booking': 'bookings', 'charge': 'charges', 'assignment': 'assignments'}
+
+# What a client gets for each object, as .values() arguments
+FIELDS = {
+    'booking': (
+        ['id', 'booking_id', 'status', 'booking_type', 'booking_date', 'booking_time', 'time_slot_id',
+         'vehicle_id', 'customer_id', 'assigned_employee_id', 'otp_verified', 'estimated_total',
+         'problem_description', 'check_in_time', 'completed_at', 'created_at', 'updated_at'],
+        {'customer_name': Concat(F('customer__first_name'), Value(' '), F('customer__last_name')),
+         'customer_mobile': F('customer__mobile_number'), 'vehicle_number': F('vehicle__vehicle_number'),
+         'vehicle_make': F('vehicle__make'), 'vehicle_model': F('vehicle__model')},
+    ),
+    'charge': (
+        ['id', 'booking_id', 'charge_type', 'description', 'quantity', 'unit_price', 'is_extra',
+         'repair_issue_id', 'added_at'],
+        {},
+    ),
+    'assignment': (
+        ['id', 'booking_id', 'worker_id', 'status', 'task_description', 'assigned_at', 'completed_at'],
+        {'worker_name': Concat(F('worker__user__first_name'), Value(' '), F('worker__user__last_name'))},
+    ),
+}
+
+
+class BadCursor(ValueError):
+    pass
+
+
+# ── Recording ────────────────────────────────────────────────────────
+
+# booking pk → center pk; a booking never changes center, so entries never go stale
+_centers = {}
+
+
+def _remember(booking_id, center_id):
+    if len(_centers) >= 100_000:
+        _centers.clear()
+    _centers[booking_id] = center_id
+
+
+def _center_of(obj, using):
+    if isinstance(obj, Booking):
+        _remember(obj.pk, obj.service_center_id)
+        return obj.service_center_id
+    booking = type(obj).booking.field.get_cached_value(obj, None)
+    if booking is not None:
+        return booking.service_center_id
+    if obj.booking_id not in _centers:
+        center_id = (Booking.objects.using(using).filter(pk=obj.booking_id)
+                     .values_list('service_center_id', flat=True).first())
+        if center_id is None:
+            return None
+        _remember(obj.booking_id, center_id)
+    return _centers[obj.booking_id]
+
+
+def kind_of(model):
+    return next(kind for kind, kind_model in KINDS.items() if kind_model is model)
+
+
+def record(obj, using, deleted=False, origin=None):
+    """Append the change to one booking, charge or assignment (from post_save/post_delete)."""
+    if deleted and not isinstance(obj, Booking) and (
+            isinstance(origin, Booking) or (isinstance(origin, QuerySet) and origin.model is Booking)):
+        return  # deleted with its booking, whose tombstone covers it
+    center_id = _center_of(obj, using)
+    if center_id is not None:
+        SyncChange.objects.using(using).create(
+            service_center_id=center_id, kind=kind_of(type(obj)), object_id=obj.pk, deleted=deleted,
+        )
+
+
+def record_many(kind, rows, using):
+    """Append saves made without save(): `rows` are (center pk, object pk) pairs."""
+    now = timezone.now()
+    SyncChange.objects.using(using).bulk_create([
+        SyncChange(service_center_id=center_id, kind=kind, object_id=pk, at=now) for center_id, pk in rows
+    ], batch_size=500)
+
+
+# ── Reading ──────────────────────────────────────────────────────────
+
+def _parse(cursor):
+    """(seq, after) from a cursor; after is None outside a copy."""
+    if not cursor:
+        return None, None
+    try:
+        seq, _, after = cursor.partition(':')
+        return int(seq), (int(after) if after else None)
+    except ValueError:
+        raise BadCursor(cursor) from None
+
+
+def _high_water(using):
+    """The newest feed row in `using`, or where its ids start."""
+    newest = SyncChange.objects.using(using).order_by('-pk').values_list('pk', flat=True).first()
+    return shards.pk_base(using) if newest is None else newest
+
+
+def _pruned_since(seq, using):
+    oldest = SyncChange.objects.using(using).order_by('pk').values_list('pk', flat=True).first()
+    # Ids are contiguous until pruned, so a gap after seq means rows the client never saw
+    return oldest is not None and oldest > seq + 1
+
+
+def _objects(kind, queryset, limit=None):
+    fields, expressions = FIELDS[kind]
+    return list(queryset.order_by('pk').values(*fields, **expressions)[:limit])
+
+
+def _response(cursor, more, reset=False, objects=None, deleted=None):
+    objects, deleted = objects or {}, deleted or {}
+    return {
+        'cursor': cursor, 'more': more, 'reset': reset,
+        **{DELETED_KEYS[kind]: objects.get(kind, []) for kind in KINDS},
+        'deleted': {DELETED_KEYS[kind]: sorted(deleted.get(kind, ())) for kind in KINDS},
+    }
+
+
+def feed(center_id, cursor=None, page_size=None):
+    """One poll's worth of the center's bookings, charges and assignments (see the module docstring)."""
+    page_size = page_size or PAGE_SIZE
+    using = shards.for_center(center_id)
+    seq, after = _parse(cursor)
+    reset = seq is not None and after is None and _pruned_since(seq, using)
+    if seq is None or reset:
+        seq, after = _high_water(using), 0
+    if after is not None:
+        return _copy_page(center_id, seq, after, page_size, using, reset)
+    return _changes(center_id, seq, page_size, using)
+
+
+def _copy_page(center_id, seq, after, page_size, using, reset):
+    bookings = _objects('booking', Booking.objects.using(using).filter(service_center_id=center_id, pk__gt=after), page_size)
+    ids = [b['id'] for b in bookings]
+    objects = {
+        'booking': bookings,
+        'charge': _objects('charge', RepairCharge.objects.using(using).filter(booking_id__in=ids)),
+        'assignment': _objects('assignment', WorkAssignment.objects.using(using).filter(booking_id__in=ids)),
+    }
+    # After the last page, the changes made while copying
+    cursor = f'{seq}:{ids[-1]}' if len(ids) == page_size else str(seq)
+    return _response(cursor, True, reset, objects)
+
+
+def _changes(center_id, seq, page_size, using):
+    high_water = _high_water(using)  # read first: every row up to it has committed
+    rows = list(SyncChange.objects.using(using).filter(service_center_id=center_id, pk__gt=seq)
+                .order_by('pk').values_list('pk', 'kind', 'object_id', 'deleted')[:page_size])
+    more = len(rows) == page_size
+    if more:
+        cursor = rows[-1][0]
+    else:
+        # Caught up: move past other centers' rows too, so a quiet center's cursor stays fresh
+        cursor = max(rows[-1][0] if rows else seq, high_water)
+
+    latest = {}
+    for _, kind, object_id, deleted in rows:
+        latest[kind, object_id] = deleted
+    objects, gone = {}, {}
+    for kind, model in KINDS.items():
+        saved = [object_id for (k, object_id), deleted in latest.items() if k == kind and not deleted]
+        gone[kind] = {object_id for (k, object_id), deleted in latest.items() if k == kind and deleted}
+        objects[kind] = _objects(kind, model.objects.using(using).filter(pk__in=saved)) if saved else []
+        # Deleted after this page's last row: the tombstone is on a later page too
+        gone[kind] |= set(saved) - {obj['id'] for obj in objects[kind]}
+    return _response(str(cursor), more, objects=objects, deleted=gone)
+
+
+# ── Retention ────────────────────────────────────────────────────────
+
+def prune(using, older_than_days=None):
+    """Delete feed rows older than the retention, always keeping the newest. Returns how many."""
+    days = RETENTION_DAYS if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    newest = _high_water(using)
+    # Rows are appended in time order, so this walks back from the newest only as far as the cutoff
+    last_old = (SyncChange.objects.using(using).filter(at__lt=cutoff, pk__lt=newest)
+                .order_by('-pk').values_list('pk', flat=True).first())
+    if last_old is None:
+        return 0
+    deleted, _ = SyncChange.objects.using(using).filter(pk__lte=last_old).delete()
+    return deleted
@@ -0,0 +1,194 @@
+"""
+Append-only booking event log, and the timeline projected from it.
+
+Views call `record(booking, 'completed', actor=request.user, …)` where they change a
+booking. The event waits until the view's transaction commits, then joins a
+process-wide buffer that is written with one bulk INSERT per database:
+
+  at the end of every request   — request_finished, after the response has gone out
+  when FLUSH_SIZE events wait   — a bulk status change, a long-running command
+  at interpreter exit           — management commands and scripts
+
+The flush also folds the events into BookingTimeline — current status, stage
+timestamps and durations — in the same transaction, so the projection never lags the
+log it was built from; `rebuild()` replays the log from scratch. A process that dies
+between a commit and the end of its request loses the events of that request. Events
+a database refuses go back into the buffer for the next flush; after FLUSH_RETRIES
+failed flushes in a row that database's events are dropped and counted in the log.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from smart_repair import shards
+from smart_repair.routers import PRIMARY_ALIAS
+
+from .models import Booking, BookingEvent, BookingTimeline
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE = getattr(settings, 'BOOKING_EVENT_FLUSH_SIZE', 200)
+FLUSH_RETRIES = getattr(settings, 'BOOKING_EVENT_FLUSH_RETRIES', 3)
+
+# Event type → (timeline timestamp it sets, the earliest wins; status it moves the booking to)
+STAGES = {
+    'created':          ('created_at', None),  # status from the payload
+    'confirmed':        (None, 'confirmed'),
+    'checked_in':       ('checked_in_at', 'in_progress'),
+    'workers_assigned': ('work_started_at', None),
+    'in_progress':      ('work_started_at', 'in_progress'),
+    'completed':        ('completed_at', 'completed'),
+    'cancelled':        ('cancelled_at', 'cancelled'),
+    'paid':             ('paid_at', None),
+}
+DURATIONS = {
+    'wait_seconds':       ('created_at', 'checked_in_at'),
+    'repair_seconds':     ('checked_in_at', 'completed_at'),
+    'turnaround_seconds': ('created_at', 'completed_at'),
+    'billing_seconds':    ('completed_at', 'paid_at'),
+}
+TIMELINE_FIELDS = ['status', 'last_event_at', 'events', *{f for f, _ in STAGES.values() if f}, *DURATIONS]
+
+_lock = threading.Lock()
+_pending = []
+_failed_flushes = defaultdict(int)  # database alias → failed flushes in a row
+
+
+# ── Writing ──────────────────────────────────────────────────────────
+
+def event_for(booking_id, center_id, type, actor=None, at=None, **payload):
+    """An unsaved event; `actor` is a user or a user id."""
+    return BookingEvent(
+        booking_id=booking_id, service_center_id=center_id, type=type,
+        actor_id=getattr(actor, 'pk', actor), at=at or timezone.now(), payload=payload,
+    )
+
+
+def record(booking, type, actor=None, **payload):
+    """Log an event for `booking` once the current transaction commits."""
+    event = event_for(booking.pk, booking.service_center_id, type, actor, **payload)
+    record_many([event], using=router.db_for_write(Booking, instance=booking))
+
+
+def record_many(events, using=PRIMARY_ALIAS):
+    """Queue events built with event_for(), after `using`'s transaction commits."""
+    transaction.on_commit(lambda: _enqueue(events), using=using)
+
+
+def _enqueue(events):
+    with _lock:
+        _pending.extend(events)
+        full = len(_pending) >= FLUSH_SIZE
+    if full:
+        flush()
+
+
+def flush():
+    """Write every buffered event, and fold them into the timelines. Returns how many."""
+    with _lock:
+        events = _pending[:]
+        del _pending[:]
+    if not events:
+        return 0
+    by_database = defaultdict(list)
+    for event in events:
+        by_database[shards.for_center(event.service_center_id) or PRIMARY_ALIAS].append(event)
+    written = 0
+    for using, batch in by_database.items():
+        try:
+            with transaction.atomic(using=using):
+                BookingEvent.objects.using(using).bulk_create(batch, batch_size=500)
+                project(batch, using)
+            written += len(batch)
+            _failed_flushes.pop(using, None)
+        except Exception:
+            # Keep them for the next flush rather than fail the request that happened to flush,
+            # but not forever: a database that keeps failing would grow the buffer without bound
+            _failed_flushes[using] += 1
+            failures = _failed_flushes[using]
+            if failures >= FLUSH_RETRIES:
+                del _failed_flushes[using]
+                logger.exception('Dropped %d booking events for %s after %d failed flushes',
+                                 len(batch), using, failures)
+                continue
+            if failures == 1:
+                logger.exception('Writing %d booking events to %s failed; will retry', len(batch), using)
+            with _lock:
+                _pending[:0] = batch
+    return written
+
+
+atexit.register(flush)
+
+
+# ── Projection ───────────────────────────────────────────────────────
+
+def apply(timeline, event):
+    """Fold one event into a timeline (in place)."""
+    field, status = STAGES.get(event.type, (None, None))
+    if field and (getattr(timeline, field) is None or event.at < getattr(timeline, field)):
+        setattr(timeline, field, event.at)
+    if event.type == 'created':
+        status = event.payload.get('status', 'pending')
+    # An event older than what the timeline has already seen can't be the current status
+    if status and (timeline.last_event_at is None or event.at >= timeline.last_event_at):
+        timeline.status = status
+    for duration, (start, end) in DURATIONS.items():
+        start, end = getattr(timeline, start), getattr(timeline, end)
+        setattr(timeline, duration, int((end - start).total_seconds()) if start and end else None)
+    timeline.last_event_at = max(filter(None, [timeline.last_event_at, event.at]))
+    timeline.events += 1
+
+
+def project(events, using):
+    """Fold a batch of new events into their bookings' timelines in `using`."""
+    timelines = BookingTimeline.objects.using(using).in_bulk({event.booking_id for event in events})
+    new = {}
+    for event in sorted(events, key=lambda e: e.at):
+        timeline = timelines.get(event.booking_id) or new.get(event.booking_id)
+        if timeline is None:
+            timeline = new[event.booking_id] = BookingTimeline(
+                id=event.booking_id, service_center_id=event.service_center_id, events=0,
+            )
+        apply(timeline, event)
+    BookingTimeline.objects.using(using).bulk_create(new.values(), batch_size=500)
+    BookingTimeline.objects.using(using).bulk_update(timelines.values(), TIMELINE_FIELDS, batch_size=500)
+
+
+def rebuild(using, chunk_size=2000):
+    """Throw the timelines in `using` away and replay its whole event log. Returns events replayed."""
+    replayed = 0
+    with transaction.atomic(using=using):
+        BookingTimeline.objects.using(using).all().delete()
+        chunk = []
+        # Append order is close enough to time order for apply(), and needs no sort
+        for event in BookingEvent.objects.using(using).order_by('pk').iterator(chunk_size=chunk_size):
+            chunk.append(event)
+            if len(chunk) == chunk_size:
+                project(chunk, using)
+                replayed, chunk = replayed + len(chunk), []
+        project(chunk, using)
+    return replayed + len(chunk)
+
+
+# ── Reading ──────────────────────────────────────────────────────────
+
+def turnaround(since=None, center_id=None):
+    """Per center: bookings completed since `since` and their mean stage durations in seconds."""
+    def build():
+        timelines = BookingTimeline.objects.filter(completed_at__isnull=False)
+        if since is not None:
+            timelines = timelines.filter(completed_at__gte=since)
+        if center_id is not None:
+            timelines = timelines.filter(service_center_id=center_id)
+        return timelines.order_by().values('service_center_id').annotate(
+            completed=Count('pk'), **{name: Avg(name) for name in DURATIONS},
+        )
+    # A center lives in one shard, so rows from different shards never need merging
+    return shards.fan_out(build, key=lambda row: row['service_center_id'])
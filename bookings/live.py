@@ -0,0 +1,298 @@
+"""
+Live booking updates for the customer's tracking pages, as server-sent events.
+
+booking_detail and track_service open one EventSource on `booking_live`; it pushes a
+snapshot of the booking — status, charges, technicians, payment — whenever it changes,
+instead of the customer reloading the page to find out.
+
+Each process has one Hub. Streams subscribe to it by booking pk; a single pump thread
+loads snapshots for every booking that needs one in a few batched queries and hands
+them to the streams, so an open stream costs no queries of its own. Two things mark a
+booking for the pump:
+
+  model signals in this process  — Booking, RepairCharge, WorkAssignment and Payment
+                                   saves and deletes, and bulk.bookings_changed, once
+                                   the change commits (bookings/signals.py)
+  polling every POLL_SECONDS     — catches changes made by other workers; one round
+                                   re-reads every watched booking and only streams whose
+                                   snapshot differs hear about it (0 turns it off)
+
+Under ASGI a stream is a coroutine; under WSGI it holds a worker thread for as long as
+it is open, so a few open tabs would tie up a fixed thread pool. Pages therefore only
+offer a stream when served under ASGI, or with LIVE_WSGI_STREAMS on; otherwise they stay
+plain page loads. Either way a stream ends after STREAM_SECONDS and the browser
+reconnects, which also re-checks the link and drops streams whose client went away
+unnoticed.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+
+from accounts.models import Employee
+from smart_repair import shards
+from smart_repair.routers import PRIMARY_ALIAS
+
+from .models import Booking, RepairCharge, WorkAssignment
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = getattr(settings, 'LIVE_POLL_SECONDS', 5)
+STREAM_SECONDS = getattr(settings, 'LIVE_STREAM_SECONDS', 600)
+HEARTBEAT_SECONDS = getattr(settings, 'LIVE_HEARTBEAT_SECONDS', 20)
+# Offer streams on pages served under WSGI too, where each one holds a worker thread
+WSGI_STREAMS = getattr(settings, 'LIVE_WSGI_STREAMS', False)
+# How long a link handed out with a page stays usable
+TOKEN_MAX_AGE = getattr(settings, 'LIVE_TOKEN_MAX_AGE', 24 * 3600)
+TOKEN_SALT = 'bookings.live'
+
+# Bookings per snapshot query, well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+# Sent for a booking that is no longer in the live tables (archived or deleted)
+GONE = {'status': 'gone', 'final': True}
+
+STATUS_LABELS = dict(Booking.STATUS_CHOICES)
+CHARGE_LABELS = dict(RepairCharge.CHARGE_TYPE_CHOICES)
+DESIGNATION_LABELS = dict(Employee.DESIGNATION_CHOICES)
+
+
+# ── Links ────────────────────────────────────────────────────────────
+
+def token_for(booking):
+    """The signed, expiring path segment of a booking's stream; no login needed to use it."""
+    return signing.dumps(booking.pk, salt=TOKEN_SALT)
+
+
+def page_token(request, booking):
+    """token_for(booking) if the page served by `request` should open a stream, else None."""
+    if isinstance(request, ASGIRequest) or WSGI_STREAMS:
+        return token_for(booking)
+    return None
+
+
+def booking_for(token):
+    """The booking pk a token was made for, or None if it is forged or expired."""
+    try:
+        return int(signing.loads(token, salt=TOKEN_SALT, max_age=TOKEN_MAX_AGE))
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+# ── Snapshots ────────────────────────────────────────────────────────
+
+def snapshots(booking_ids, using):
+    """{pk: snapshot} for the bookings in `using` that are still live. Three queries."""
+    found = {}
+    bookings = (Booking.objects.using(using).filter(pk__in=booking_ids).order_by()
+                .values_list('pk', 'status', 'check_in_time', 'completed_at', 'payment__payment_status'))
+    for pk, status, checked_in, completed, payment in bookings:
+        found[pk] = {
+            'status': status, 'status_label': STATUS_LABELS.get(status, status),
+            'checked_in_at': checked_in, 'completed_at': completed, 'payment': payment,
+            'charges': [], 'charges_total': Decimal('0.00'), 'workers': [],
+            # Nothing on the page changes after this, so the browser may stop listening
+            'final': status == 'cancelled' or payment == 'paid',
+        }
+    if not found:
+        return found
+    charges = (RepairCharge.objects.using(using).filter(booking_id__in=found).order_by('charge_type', 'added_at', 'pk')
+               .values_list('booking_id', 'pk', 'description', 'charge_type', 'quantity', 'unit_price', 'is_extra'))
+    for booking_id, pk, description, charge_type, quantity, unit_price, is_extra in charges:
+        snapshot = found[booking_id]
+        total = (quantity * unit_price).quantize(Decimal('0.01'))
+        snapshot['charges'].append({
+            'id': pk, 'description': description, 'type': charge_type,
+            'type_label': CHARGE_LABELS.get(charge_type, charge_type), 'quantity': quantity,
+            'unit_price': unit_price, 'total': total, 'is_extra': is_extra,
+        })
+        snapshot['charges_total'] += total
+    assignments = (WorkAssignment.objects.using(using).filter(booking_id__in=found).order_by('pk')
+                   .values_list('booking_id', 'worker__user__first_name', 'worker__user__last_name',
+                                'worker__designation', 'status'))
+    for booking_id, first_name, last_name, designation, status in assignments:
+        found[booking_id]['workers'].append({
+            'name': f'{first_name} {last_name}'.strip(),
+            'designation': DESIGNATION_LABELS.get(designation, designation), 'status': status,
+        })
+    return found
+
+
+def _frame(snapshot):
+    return f'event: update\ndata: {json.dumps(snapshot, cls=DjangoJSONEncoder, separators=(",", ":"))}\n\n'.encode()
+
+
+# ── Hub ──────────────────────────────────────────────────────────────
+
+class Subscription:
+    """One open stream's view of one booking: the latest snapshot, and a flag the pump raises."""
+
+    def __init__(self, booking_id, loop=None):
+        self.booking_id = booking_id
+        self.snapshot = None
+        self._loop = loop
+        self.changed = asyncio.Event() if loop else threading.Event()
+
+    def offer(self, snapshot):
+        """Called by the pump thread."""
+        if snapshot == self.snapshot:
+            return
+        self.snapshot = snapshot
+        if self._loop is None:
+            self.changed.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self.changed.set)
+        except RuntimeError:
+            pass  # the stream's event loop has closed; it unsubscribes as it unwinds
+
+
+class Hub:
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)  # booking pk → Subscription
+        self._dirty = set()
+        self._wake = threading.Event()
+        self._thread = None
+        self.rounds = 0
+
+    def subscribe(self, booking_id, loop=None):
+        subscription = Subscription(booking_id, loop)
+        with self._lock:
+            self._subscriptions[booking_id].add(subscription)
+            self._dirty.add(booking_id)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='booking-live', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            watchers = self._subscriptions.get(subscription.booking_id)
+            if watchers is not None:
+                watchers.discard(subscription)
+                if not watchers:
+                    del self._subscriptions[subscription.booking_id]
+
+    def watching(self, booking_ids):
+        """The ones among `booking_ids` that some stream in this process is following."""
+        return [pk for pk in booking_ids if pk in self._subscriptions]
+
+    def touch(self, booking_ids):
+        """Have the pump re-read these bookings (the ones anyone is watching) now."""
+        with self._lock:
+            watched = [pk for pk in booking_ids if pk in self._subscriptions]
+            self._dirty.update(watched)
+        if watched:
+            self._wake.set()
+
+    def streams(self):
+        with self._lock:
+            return sum(len(watchers) for watchers in self._subscriptions.values())
+
+    def _run(self):
+        next_poll = time.monotonic() + self.poll_seconds
+        while True:
+            self._wake.wait(max(0, next_poll - time.monotonic()) if self.poll_seconds else None)
+            self._wake.clear()
+            with self._lock:
+                if self.poll_seconds and time.monotonic() >= next_poll:
+                    self._dirty.update(self._subscriptions)
+                    next_poll = time.monotonic() + self.poll_seconds
+                due, self._dirty = self._dirty & self._subscriptions.keys(), set()
+            if not due:
+                continue
+            try:
+                self.publish(due)
+            except Exception:
+                logger.exception('Loading live snapshots for %d bookings failed', len(due))
+            finally:
+                close_old_connections()
+
+    def publish(self, booking_ids):
+        """Load fresh snapshots of `booking_ids` and offer them to their streams."""
+        by_database = defaultdict(list)
+        for pk in booking_ids:
+            by_database[shards.for_pk(pk) or PRIMARY_ALIAS].append(pk)
+        for using, pks in by_database.items():
+            for i in range(0, len(pks), CHUNK_SIZE):
+                chunk = pks[i:i + CHUNK_SIZE]
+                found = snapshots(chunk, using)
+                for pk in chunk:
+                    with self._lock:
+                        watchers = list(self._subscriptions.get(pk, ()))
+                    for subscription in watchers:
+                        subscription.offer(found.get(pk, GONE))
+        self.rounds += 1
+
+
+hub = Hub()
+
+
+def changed(booking_ids, using):
+    """Signal receivers call this: push the bookings to their streams once `using` commits."""
+    if hub.watching(booking_ids):
+        transaction.on_commit(lambda: hub.touch(booking_ids), using=using)
+
+
+# ── Streams ──────────────────────────────────────────────────────────
+
+# Browsers reconnect this many ms after a stream ends
+RETRY = b'retry: 3000\n\n'
+KEEPALIVE = b': keepalive\n\n'
+
+
+def stream(booking_id):
+    """The event stream as a sync iterator, for WSGI: blocks its thread between events."""
+    subscription = hub.subscribe(booking_id)
+    deadline = time.monotonic() + STREAM_SECONDS
+    try:
+        yield RETRY
+        sent = None
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not subscription.changed.wait(min(HEARTBEAT_SECONDS, remaining)):
+                yield KEEPALIVE
+                continue
+            subscription.changed.clear()
+            snapshot = subscription.snapshot
+            if snapshot != sent:
+                yield _frame(snapshot)
+                sent = snapshot
+                if snapshot['final']:
+                    return
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def astream(booking_id):
+    """The event stream as an async iterator, for ASGI: costs a coroutine, not a thread."""
+    subscription = hub.subscribe(booking_id, loop=asyncio.get_running_loop())
+    deadline = time.monotonic() + STREAM_SECONDS
+    try:
+        yield RETRY
+        sent = None
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                await asyncio.wait_for(subscription.changed.wait(), min(HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield KEEPALIVE
+                continue
+            subscription.changed.clear()
+            snapshot = subscription.snapshot
+            if snapshot != sent:
+                yield _frame(snapshot)
+                sent = snapshot
+                if snapshot['final']:
+                    return
+    finally:
+        hub.unsubscribe(subscription)
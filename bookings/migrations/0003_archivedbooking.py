@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0003_imageasset'),
+        ('bookings', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('booking_id', models.CharField(max_length=20, unique=True)),
+                ('status', models.CharField(max_length=20)),
+                ('booking_date', models.DateField()),
+                ('payment_id', models.IntegerField(blank=True, null=True, unique=True)),
+                ('receipt_number', models.CharField(blank=True, max_length=20)),
+                ('total_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('snapshot', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to=settings.AUTH_USER_MODEL)),
+                ('service_center', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.servicecenter')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='bookings.vehicle')),
+            ],
+            options={
+                'ordering': ['-booking_date'],
+                'indexes': [models.Index(fields=['vehicle', 'booking_date'], name='archived_vehicle_date_idx'), models.Index(fields=['customer', 'booking_date'], name='archived_customer_date_idx')],
+            },
+        ),
+    ]
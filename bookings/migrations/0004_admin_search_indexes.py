@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:25
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_archivedbooking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(django.db.models.functions.comparison.Collate('booking_id', 'NOCASE'), name='booking_id_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(django.db.models.functions.comparison.Collate('vehicle_number', 'NOCASE'), name='vehicle_number_nocase_idx'),
+        ),
+    ]
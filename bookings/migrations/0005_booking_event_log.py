@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:43
+
+import bookings.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0003_imageasset'),
+        ('bookings', '0004_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingTimeline',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+                ('checked_in_at', models.DateTimeField(blank=True, null=True)),
+                ('work_started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('cancelled_at', models.DateTimeField(blank=True, null=True)),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('wait_seconds', models.IntegerField(blank=True, null=True)),
+                ('repair_seconds', models.IntegerField(blank=True, null=True)),
+                ('turnaround_seconds', models.IntegerField(blank=True, null=True)),
+                ('billing_seconds', models.IntegerField(blank=True, null=True)),
+                ('last_event_at', models.DateTimeField()),
+                ('events', models.PositiveIntegerField(default=0)),
+                ('service_center', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.servicecenter')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['completed_at', 'service_center'], name='timeline_completed_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BookingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('created', 'Created'), ('confirmed', 'Confirmed'), ('checked_in', 'Checked in (OTP)'), ('workers_assigned', 'Workers assigned'), ('in_progress', 'In progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('paid', 'Paid')], max_length=20)),
+                ('at', models.DateTimeField()),
+                ('payload', models.JSONField(blank=True, default=dict, encoder=bookings.models.CompactJSONEncoder)),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('booking', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='bookings.booking')),
+                ('service_center', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.servicecenter')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['booking', 'at'], name='event_booking_at_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_imageasset'),
+        ('bookings', '0005_booking_event_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('booking', 'Booking'), ('charge', 'Repair charge'), ('assignment', 'Work assignment')], max_length=10)),
+                ('object_id', models.IntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('service_center', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.servicecenter')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['service_center', 'id'], name='syncchange_center_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,9 @@
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Collate
 from django.utils import timezone
 import uuid
 
@@ -69,6 +74,12 @@ class Vehicle(models.Model):
     current_km = models.IntegerField(default=0)
     registered_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Admin search: LIKE 'prefix%' can only use an index in SQLite's NOCASE collation
+            models.Index(Collate('vehicle_number', 'NOCASE'), name='vehicle_number_nocase_idx'),
+        ]
+
     def __str__(self):
         return f"{self.vehicle_number} - {self.make} {self.model}"
 
@@ -84,6 +95,9 @@ class TimeSlot(models.Model):
 
     class Meta:
         ordering = ['date', 'start_time']
+        # The unique index on (service_center, date, start_time) already serves the slot
+        # picker's center+day lookup in start-time order; a day has too few slots for
+        # is_available to be worth another index
         unique_together = ['service_center', 'date', 'start_time']
 
     def __str__(self):
@@ -133,6 +147,16 @@ class Booking(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Employee queue and dashboard counters filter by center + status, newest first
+            models.Index(fields=['service_center', 'status', 'created_at'], name='booking_center_status_idx'),
+            # Dashboard recent list and month-to-date count
+            models.Index(fields=['service_center', 'created_at'], name='booking_center_created_idx'),
+            # My bookings
+            models.Index(fields=['customer', 'created_at'], name='booking_customer_created_idx'),
+            # Admin search by booking id prefix (see core.admin_tools)
+            models.Index(Collate('booking_id', 'NOCASE'), name='booking_id_nocase_idx'),
+        ]
 
     def __str__(self):
         return f"{self.booking_id} - {self.customer.get_full_name()} - {self.status}"
@@ -210,3 +234,137 @@ class WorkAssignment(models.Model):
 
     def __str__(self):
         return f"Work: {self.worker.user.get_full_name()} - {self.booking.booking_id}"
+
+
+class ArchivedBooking(models.Model):
+    """
+    A closed booking moved out of the live tables by `manage.py archive_bookings`.
+    Keeps the booking's own pk; its charges, work assignments, service record and
+    payment are stored as one snapshot. Read it through bookings/archive.py.
+    """
+    id = models.IntegerField(primary_key=True)  # the original Booking pk
+    booking_id = models.CharField(max_length=20, unique=True)
+    customer = models.ForeignKey('accounts.User', on_delete=models.CASCADE, related_name='archived_bookings')
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='archived_bookings')
+    service_center = models.ForeignKey('core.ServiceCenter', on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20)
+    booking_date = models.DateField()
+    # Original Payment pk and receipt number, so old receipt links keep working
+    payment_id = models.IntegerField(null=True, blank=True, unique=True)
+    receipt_number = models.CharField(max_length=20, blank=True)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    # zlib-compressed JSON: cold rows are read one at a time, so pack several per page
+    snapshot = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-booking_date']
+        indexes = [
+            models.Index(fields=['vehicle', 'booking_date'], name='archived_vehicle_date_idx'),
+            models.Index(fields=['customer', 'booking_date'], name='archived_customer_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.booking_id} (archived)"
+
+    @property
+    def data(self):
+        return json.loads(zlib.decompress(self.snapshot))
+
+    @staticmethod
+    def pack(data):
+        return zlib.compress(json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode())
+
+
+class CompactJSONEncoder(DjangoJSONEncoder):
+    item_separator, key_separator = ',', ':'
+
+
+class BookingEvent(models.Model):
+    """
+    One thing that happened to a booking, who did it and when. Append-only: rows are
+    never updated or deleted, and outlive the booking when it is archived, so
+    `booking` may point at an ArchivedBooking pk. Written in batches by bookings/events.py.
+    """
+    TYPE_CHOICES = [
+        ('created', 'Created'), ('confirmed', 'Confirmed'), ('checked_in', 'Checked in (OTP)'),
+        ('workers_assigned', 'Workers assigned'), ('in_progress', 'In progress'),
+        ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('paid', 'Paid'),
+    ]
+
+    booking = models.ForeignKey(Booking, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+                                related_name='events')
+    service_center = models.ForeignKey('core.ServiceCenter', on_delete=models.DO_NOTHING, db_constraint=False,
+                                       db_index=False, related_name='+')
+    type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    actor = models.ForeignKey('accounts.User', on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+                              null=True, blank=True, related_name='+')
+    at = models.DateTimeField()
+    payload = models.JSONField(default=dict, blank=True, encoder=CompactJSONEncoder)
+
+    class Meta:
+        indexes = [
+            # A booking's history, in order; the only index, to keep appends cheap
+            models.Index(fields=['booking', 'at'], name='event_booking_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.booking_id} {self.type} at {self.at:%Y-%m-%d %H:%M}"
+
+
+class BookingTimeline(models.Model):
+    """
+    Where a booking is now and how long each stage took, folded from its BookingEvents
+    as they are written (see bookings/events.py). Turnaround reports read only this table.
+    """
+    id = models.IntegerField(primary_key=True)  # the Booking pk
+    service_center = models.ForeignKey('core.ServiceCenter', on_delete=models.DO_NOTHING, db_constraint=False,
+                                       db_index=False, related_name='+')
+    status = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(null=True, blank=True)
+    checked_in_at = models.DateTimeField(null=True, blank=True)
+    work_started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    # Stage durations in seconds, set once both ends are known
+    wait_seconds = models.IntegerField(null=True, blank=True)        # created → checked in
+    repair_seconds = models.IntegerField(null=True, blank=True)      # checked in → completed
+    turnaround_seconds = models.IntegerField(null=True, blank=True)  # created → completed
+    billing_seconds = models.IntegerField(null=True, blank=True)     # completed → paid
+    last_event_at = models.DateTimeField()
+    events = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Turnaround reports: completed in a date range, optionally per center
+            models.Index(fields=['completed_at', 'service_center'], name='timeline_completed_idx'),
+        ]
+
+    def __str__(self):
+        return f"Timeline {self.pk} ({self.status})"
+
+
+class SyncChange(models.Model):
+    """
+    A booking, repair charge or work assignment that was saved or deleted, appended in
+    the same transaction as the change. The pk orders the feed and is the cursor the
+    delta-sync API hands out (see bookings/changes.py); old rows are pruned.
+    """
+    KIND_CHOICES = [('booking', 'Booking'), ('charge', 'Repair charge'), ('assignment', 'Work assignment')]
+
+    service_center = models.ForeignKey('core.ServiceCenter', on_delete=models.DO_NOTHING, db_constraint=False,
+                                       db_index=False, related_name='+')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.IntegerField()
+    deleted = models.BooleanField(default=False)
+    at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # A center's changes after a cursor: one range scan, however big the center is
+            models.Index(fields=['service_center', 'id'], name='syncchange_center_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.object_id}{' deleted' if self.deleted else ''}"
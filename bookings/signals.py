@@ -0,0 +1,46 @@
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Booking, RepairCharge, WorkAssignment
+
+# Sent by bulk with using=, pks= and fields= (the names updated) after each batch commits
+bookings_changed = Signal()
+slots_changed = Signal()
+
+# Every process loads this module at django.setup() and most never save a booking, so the
+# receivers import the change feed, event log and live streams when they first run.
+
+
+@receiver(request_finished)
+def flush_booking_events(sender, **kwargs):
+    # The response is out; write whatever booking events this process has buffered
+    from . import events
+    events.flush()
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def booking_saved(sender, instance, using, signal, **kwargs):
+    from . import changes, live
+    changes.record(instance, using, deleted=signal is post_delete)
+    live.changed([instance.pk], using)
+
+
+@receiver([post_save, post_delete], sender=RepairCharge)
+@receiver([post_save, post_delete], sender=WorkAssignment)
+def booking_part_saved(sender, instance, using, signal, origin=None, **kwargs):
+    from . import changes, live
+    changes.record(instance, using, deleted=signal is post_delete, origin=origin)
+    live.changed([instance.booking_id], using)
+
+
+@receiver([post_save, post_delete], sender='payments.Payment')
+def payment_saved(sender, instance, using, **kwargs):
+    from . import live
+    live.changed([instance.booking_id], using)
+
+
+@receiver(bookings_changed)
+def bookings_changed_in_bulk(sender, using, pks, **kwargs):
+    from . import live
+    live.changed(pks, using)
@@ -8,9 +8,13 @@ urlpatterns = [
     path('book/confirm/', views.confirm_booking, name='confirm_booking'),
     path('my-bookings/', views.my_bookings, name='my_bookings'),
     path('booking/<int:pk>/', views.booking_detail, name='booking_detail'),
+    path('booking/live/<str:token>/', views.booking_live, name='booking_live'),
     path('booking/<int:pk>/cancel/', views.cancel_booking, name='cancel_booking'),
+    path('vehicle/<int:pk>/history/', views.vehicle_history, name='vehicle_history'),
     # Employee
     path('employee/bookings/', views.employee_bookings, name='employee_bookings'),
+    path('employee/bookings/bulk/', views.employee_bookings_bulk, name='employee_bookings_bulk'),
+    path('employee/slots/', views.employee_slots, name='employee_slots'),
     path('employee/booking/<int:pk>/', views.employee_booking_detail, name='employee_booking_detail'),
     path('employee/booking/<int:pk>/verify-otp/', views.verify_customer_otp, name='verify_customer_otp'),
     path('employee/booking/<int:pk>/assign-workers/', views.assign_workers, name='assign_workers'),
@@ -19,5 +23,6 @@ urlpatterns = [
     path('employee/charge/<int:charge_pk>/remove/', views.remove_charge, name='remove_charge'),
     path('employee/charge/<int:charge_pk>/update-price/', views.update_charge_price, name='update_charge_price'),
     path('employee/add-vehicle/', views.add_customer_vehicle, name='add_customer_vehicle'),
+    path('employee/api/changes/', views.employee_changes, name='employee_changes'),
     path('api/slots/', views.get_available_slots, name='available_slots_api'),
 ]
@@ -1,19 +1,53 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.http import urlencode
+from django.db.models import F, Prefetch
 from decimal import Decimal
 
+from . import archive, bulk, changes, events, live
 from .models import Booking, Vehicle, TimeSlot, ServiceRecord, WorkAssignment, RepairIssue, RepairCharge
-from core.models import ServiceCenter, ServiceType
+from core.catalog import get_catalog
 from accounts.models import OTPVerification, Employee, Notification
-from accounts.views import send_otp
+from accounts.sms import send_otp, send_sms
+from accounts.decorators import employee_required
+from accounts.principal import center_staff_version
+from smart_repair import shards
+
+FRAGMENT_CACHE_TIMEOUT = getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 300)
 
 
 def send_notification(user, title, message, notif_type='general'):
     Notification.objects.create(user=user, title=title, message=message, notification_type=notif_type)
-    print(f"[SMS] → {user.mobile_number}: {message[:100]}")
+    send_sms(user.mobile_number, message[:100])
+
+
+def _add_selected_charges(booking, issues, services):
+    """RepairCharge rows + estimate for the catalog issues/services picked at booking time."""
+    charges = [
+        RepairCharge(
+            booking=booking, repair_issue_id=issue.pk, charge_type='selected',
+            description=issue.name, quantity=1,
+            unit_price=issue.estimated_cost_max, is_extra=False,
+        )
+        for issue in issues
+    ] + [
+        RepairCharge(
+            booking=booking, charge_type='service',
+            description=stype.name, quantity=1, unit_price=stype.base_price,
+        )
+        for stype in services
+    ]
+    RepairCharge.objects.bulk_create(charges)
+    changes.record_many('charge', [(booking.service_center_id, c.pk) for c in charges], booking._state.db)
+    booking.estimated_total = (sum(i.estimated_cost_max for i in issues)
+                               + sum(s.base_price for s in services))
+    booking.save(update_fields=['estimated_total'])
 
 
 # ─────────────────────────────────────────────────────────────────────
@@ -22,8 +56,7 @@ def send_notification(user, title, message, notif_type='general'):
 
 @login_required
 def book_slot_step1(request):
-    centers = ServiceCenter.objects.filter(is_active=True).order_by('city')
-    return render(request, 'bookings/book_step1.html', {'centers': centers})
+    return render(request, 'bookings/book_step1.html', {'centers': get_catalog().centers})
 
 
 @login_required
@@ -32,7 +65,7 @@ def book_slot_step2(request):
         center_id    = request.POST.get('service_center')
         date_str     = request.POST.get('date')
         booking_type = request.POST.get('booking_type', 'online')
-        vehicle_type = request.POST.get('vehicle_type_filter', 'all')
+        vehicle_type = request.POST.get('vehicle_type_filter') or request.POST.get('vehicle_type', 'all')
 
         request.session['bk_center'] = center_id
         request.session['bk_date']   = date_str
@@ -40,18 +73,20 @@ def book_slot_step2(request):
         request.session['bk_vtype']  = vehicle_type
 
         from datetime import datetime
-        center = get_object_or_404(ServiceCenter, pk=center_id)
+        catalog = get_catalog()
+        center = catalog.get_center_or_404(center_id)
+        shards.select(shards.for_center(center.pk))
         selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
 
-        slots    = TimeSlot.objects.filter(service_center=center, date=selected_date, is_available=True).order_by('start_time')
-        services = ServiceType.objects.filter(is_active=True)
+        slots    = TimeSlot.objects.filter(service_center_id=center.pk, date=selected_date, is_available=True).order_by('start_time')
         vehicles = Vehicle.objects.filter(owner=request.user)
-        repair_issues = RepairIssue.objects.filter(is_active=True).order_by('vehicle_type', 'category', 'display_order')
 
         return render(request, 'bookings/book_step2.html', {
             'center': center, 'date': date_str, 'slots': slots,
-            'services': services, 'vehicles': vehicles,
-            'repair_issues': repair_issues, 'booking_type': booking_type,
+            'services': catalog.services, 'vehicles': vehicles,
+            'repair_issues': catalog.issues, 'booking_type': booking_type,
+            'vehicle_type': vehicle_type,
+            'categories': catalog.issue_categories.get(vehicle_type, catalog.issue_categories['all']),
         })
     return redirect('book_step1')
 
@@ -75,10 +110,12 @@ def book_slot_step3(request):
     request.session['bk_new_vnum'] = new_vnum
     request.session['bk_problem']  = problem
 
-    center   = get_object_or_404(ServiceCenter, pk=request.session['bk_center'])
+    catalog  = get_catalog()
+    center   = catalog.get_center_or_404(request.session['bk_center'])
+    shards.select(shards.for_center(center.pk))
     slot     = TimeSlot.objects.filter(pk=slot_id).first() if slot_id else None
-    issues   = RepairIssue.objects.filter(pk__in=issue_ids)
-    services = ServiceType.objects.filter(pk__in=service_ids)
+    issues   = catalog.issues_for(issue_ids)
+    services = catalog.services_for(service_ids)
 
     issue_estimate   = sum(i.estimated_cost_max for i in issues)
     service_estimate = sum(s.base_price for s in services)
@@ -118,7 +155,9 @@ def confirm_booking(request):
     bk_type     = request.session.get('bk_type', 'online')
 
     selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-    center = get_object_or_404(ServiceCenter, pk=center_id)
+    catalog = get_catalog()
+    center = catalog.get_center_or_404(center_id)
+    shards.select(shards.for_center(center.pk))
 
     # Resolve vehicle
     if vehicle_id:
@@ -136,30 +175,21 @@ def confirm_booking(request):
     slot         = TimeSlot.objects.filter(pk=slot_id).first() if slot_id else None
     booking_time = slot.start_time if slot else timezone.now().time()
 
+    issues   = catalog.issues_for(issue_ids)
+    services = catalog.services_for(service_ids)
+
     booking = Booking.objects.create(
-        customer=request.user, vehicle=vehicle, service_center=center,
+        customer=request.user, vehicle=vehicle, service_center_id=center.pk,
         time_slot=slot, booking_type=bk_type,
         booking_date=selected_date, booking_time=booking_time,
         problem_description=problem, status='confirmed',
     )
-    booking.service_types.set(service_ids)
-    booking.selected_issues.set(issue_ids)
-
-    # Create RepairCharge rows from selected issues
-    for issue in RepairIssue.objects.filter(pk__in=issue_ids):
-        RepairCharge.objects.create(
-            booking=booking, repair_issue=issue, charge_type='selected',
-            description=issue.name, quantity=1,
-            unit_price=issue.estimated_cost_max, is_extra=False,
-        )
-    # Create RepairCharge rows from service types
-    for stype in ServiceType.objects.filter(pk__in=service_ids):
-        RepairCharge.objects.create(
-            booking=booking, charge_type='service',
-            description=stype.name, quantity=1, unit_price=stype.base_price,
-        )
+    booking.service_types.set([s.pk for s in services])
+    booking.selected_issues.set([i.pk for i in issues])
 
-    booking.calculate_estimate()
+    # RepairCharge rows from selected issues and service types
+    _add_selected_charges(booking, issues, services)
+    events.record(booking, 'created', request.user, status=booking.status, channel=bk_type)
 
     if slot:
         slot.current_bookings += 1
@@ -187,15 +217,42 @@ def confirm_booking(request):
 
 @login_required
 def my_bookings(request):
-    bookings = Booking.objects.filter(customer=request.user).order_by('-created_at')
+    # A customer may have booked in more than one state
+    bookings = shards.fan_out(
+        lambda: (Booking.objects.filter(customer=request.user)
+                 .select_related('service_center', 'vehicle').order_by('-created_at')),
+        key=lambda b: b.created_at, reverse=True,
+    )
     return render(request, 'bookings/my_bookings.html', {'bookings': bookings})
 
 
 @login_required
 def booking_detail(request, pk):
-    booking = get_object_or_404(Booking, pk=pk, customer=request.user)
-    charges = RepairCharge.objects.filter(booking=booking)
-    return render(request, 'bookings/booking_detail.html', {'booking': booking, 'charges': charges})
+    booking = (Booking.objects.select_related('service_center', 'vehicle', 'time_slot', 'service_record', 'payment')
+               .prefetch_related('selected_issues').filter(pk=pk, customer=request.user).first())
+    live_token = None
+    if booking is not None:
+        charges = RepairCharge.objects.filter(booking=booking)
+        live_token = live.page_token(request, booking)
+    else:
+        booking = archive.get_booking(pk, customer=request.user)
+        if booking is None:
+            raise Http404('No Booking matches the given query.')
+        charges = booking.repair_charges.all()
+    return render(request, 'bookings/booking_detail.html', {
+        'booking': booking, 'charges': charges, 'live_token': live_token,
+    })
+
+
+@login_required
+def vehicle_history(request, pk):
+    """Every service of one vehicle, including bookings moved to the archive."""
+    vehicle = get_object_or_404(Vehicle, pk=pk)
+    if vehicle.owner_id != request.user.pk and not request.principal.is_staff_member:
+        raise Http404('No Vehicle matches the given query.')
+    return render(request, 'bookings/vehicle_history.html', {
+        'vehicle': vehicle, 'bookings': archive.vehicle_history(vehicle),
+    })
 
 
 @login_required
@@ -204,6 +261,7 @@ def cancel_booking(request, pk):
     if booking.status in ['pending', 'confirmed']:
         booking.status = 'cancelled'
         booking.save()
+        events.record(booking, 'cancelled', request.user)
         messages.success(request, 'Booking cancelled.')
     else:
         messages.error(request, 'Cannot cancel this booking.')
@@ -214,43 +272,146 @@ def cancel_booking(request, pk):
 # EMPLOYEE — manage bookings
 # ─────────────────────────────────────────────────────────────────────
 
-@login_required
+@employee_required
 def employee_bookings(request):
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
-    try:
-        emp = request.user.employee_profile
-        qs  = Booking.objects.filter(service_center=emp.service_center)
-    except Exception:
-        qs  = Booking.objects.all() if request.user.role == 'admin' else Booking.objects.none()
+    principal = request.principal
+    if principal.employee:
+        qs  = Booking.objects.filter(service_center=principal.center)
+    else:
+        qs  = Booking.objects.all() if principal.role == 'admin' else Booking.objects.none()
 
     status_filter = request.GET.get('status', '')
     if status_filter:
         qs = qs.filter(status=status_filter)
+    qs = qs.select_related('customer', 'vehicle', 'service_center').order_by('-created_at')
+    if principal.employee:
+        bookings = qs
+    else:  # admins see every state's bookings
+        bookings = shards.fan_out(lambda: qs, key=lambda b: b.created_at, reverse=True)
     return render(request, 'bookings/employee_bookings.html', {
-        'bookings': qs.order_by('-created_at'), 'status_filter': status_filter,
+        'bookings': bookings,
+        'status_filter': status_filter,
+        # Bulk changes are per center, so only center staff get the checkboxes
+        'bulk_statuses': [(s, label) for s, label in Booking.STATUS_CHOICES if s in bulk.TRANSITIONS]
+                         if principal.employee else None,
     })
 
 
-@login_required
+@employee_required
+def employee_bookings_bulk(request):
+    """Change the status of the ticked bookings at the employee's center in one go."""
+    principal   = request.principal
+    status      = request.POST.get('bulk_status', '')
+    booking_ids = request.POST.getlist('bookings')
+    back        = redirect('employee_bookings')
+    if request.POST.get('status_filter'):
+        back['Location'] += '?' + urlencode({'status': request.POST['status_filter']})
+    if request.method != 'POST' or not principal.employee:
+        return back
+    if status not in bulk.TRANSITIONS or not booking_ids:
+        messages.error(request, 'Pick the bookings and the status to move them to.')
+        return back
+    changed = bulk.change_status(Booking.objects.filter(service_center=principal.center, pk__in=booking_ids),
+                                 status, request.user)
+    label = dict(Booking.STATUS_CHOICES)[status]
+    messages.success(request, f'{changed} booking(s) marked {label}.')
+    if changed < len(booking_ids):
+        messages.warning(request, f'{len(booking_ids) - changed} skipped — not in a status that can become {label}.')
+    return back
+
+
+@employee_required
+def employee_changes(request):
+    """
+    Delta sync for the counter screens and the app: the center's bookings, charges and
+    assignments changed since ?cursor= (see bookings/changes.py). Admins pick ?center=.
+    """
+    principal = request.principal
+    if principal.employee and principal.center is None:
+        return JsonResponse({'error': 'Your account is not linked to a service center.'}, status=400)
+    center_id = principal.center.pk if principal.employee else request.GET.get('center', '')
+    try:
+        center_id = int(center_id)
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'Pass the service center as ?center=.'}, status=400)
+    if center_id not in get_catalog().center_by_id:
+        return JsonResponse({'error': 'No such service center.'}, status=400)
+    try:
+        feed = changes.feed(center_id, request.GET.get('cursor'))
+    except changes.BadCursor:
+        return JsonResponse({'error': 'Bad cursor; start again without one.'}, status=400)
+    return JsonResponse(feed)
+
+
+@employee_required
+def employee_slots(request):
+    """Open, close or resize a center's time slots over a date range."""
+    from datetime import datetime, timedelta
+    principal = request.principal
+    catalog   = get_catalog()
+    today     = timezone.localdate()
+    if request.method == 'POST':
+        if principal.employee and principal.center is None:
+            messages.error(request, 'Your account is not linked to a service center; ask an admin to assign one.')
+            return redirect('employee_slots')
+        center_id = principal.center.pk if principal.employee else request.POST.get('service_center')
+        center    = catalog.get_center_or_404(center_id)
+        action    = request.POST.get('action')
+        try:
+            start = datetime.strptime(request.POST.get('start', ''), '%Y-%m-%d').date()
+            end   = datetime.strptime(request.POST.get('end', '') or request.POST.get('start', ''), '%Y-%m-%d').date()
+            max_bookings = int(request.POST.get('max_bookings') or 0)
+        except ValueError:
+            messages.error(request, 'Enter valid dates.')
+            return redirect('employee_slots')
+        if end < start or end - start > timedelta(days=90):
+            messages.error(request, 'The date range must run forwards and span at most 90 days.')
+            return redirect('employee_slots')
+
+        slots = bulk.center_slots(center.pk, start, end)
+        if action in ('open', 'close'):
+            changed = bulk.set_slots_open(slots, action == 'open')
+            done    = 'opened' if action == 'open' else 'closed'
+            messages.success(request, f'{changed} slot(s) {done} at {center.name}, {start:%d %b} – {end:%d %b}.')
+        elif action == 'resize' and 1 <= max_bookings <= 100:
+            changed = bulk.resize_slots(slots, max_bookings)
+            messages.success(request, f'{changed} slot(s) at {center.name} now take {max_bookings} bookings each.')
+        else:
+            messages.error(request, 'Choose open, close, or a max bookings between 1 and 100.')
+        return redirect('employee_slots')
+    return render(request, 'bookings/employee_slots.html', {
+        'centers': None if principal.employee else catalog.centers,
+        'center': principal.center, 'today': today,
+    })
+
+
+@employee_required
 def employee_booking_detail(request, pk):
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
-    booking    = get_object_or_404(Booking, pk=pk)
+    booking    = get_object_or_404(
+        Booking.objects.select_related('customer', 'vehicle', 'service_center', 'service_record', 'payment')
+        .prefetch_related(
+            'selected_issues',
+            Prefetch('work_assignments', queryset=WorkAssignment.objects.select_related('worker__user')),
+        ),
+        pk=pk,
+    )
     charges    = RepairCharge.objects.filter(booking=booking)
-    workers    = Employee.objects.filter(service_center=booking.service_center, is_active=True)
-    all_issues = RepairIssue.objects.filter(is_active=True)
+    # Lazy: with a warm fragment cache the worker list is never queried
+    workers    = Employee.objects.filter(service_center_id=booking.service_center_id, is_active=True).select_related('user')
+    catalog    = get_catalog()
     return render(request, 'bookings/employee_booking_detail.html', {
         'booking': booking, 'charges': charges,
-        'workers': workers, 'all_issues': all_issues,
+        'workers': workers, 'all_issues': catalog.issues,
+        'fragment_cache_timeout': FRAGMENT_CACHE_TIMEOUT,
+        'fragment_version': catalog.version,
+        'issue_key': ','.join(str(issue.pk) for issue in booking.selected_issues.all()),
+        'staff_version': center_staff_version(booking.service_center_id),
     })
 
 
-@login_required
+@employee_required
 def add_extra_charge(request, pk):
     """Employee adds an extra/diagnosed/parts/labour charge."""
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
     booking = get_object_or_404(Booking, pk=pk)
 
     if request.method == 'POST':
@@ -261,7 +422,7 @@ def add_extra_charge(request, pk):
         issue_id    = request.POST.get('repair_issue', '')
 
         if desc and unit_price > 0:
-            emp      = getattr(request.user, 'employee_profile', None)
+            emp      = request.principal.employee
             issue_obj = RepairIssue.objects.filter(pk=issue_id).first() if issue_id else None
             RepairCharge.objects.create(
                 booking=booking, repair_issue=issue_obj,
@@ -276,10 +437,8 @@ def add_extra_charge(request, pk):
     return redirect('employee_booking_detail', pk=pk)
 
 
-@login_required
+@employee_required
 def remove_charge(request, charge_pk):
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
     charge = get_object_or_404(RepairCharge, pk=charge_pk)
     booking_pk = charge.booking.pk
     charge.delete()
@@ -287,10 +446,8 @@ def remove_charge(request, charge_pk):
     return redirect('employee_booking_detail', pk=booking_pk)
 
 
-@login_required
+@employee_required
 def verify_customer_otp(request, pk):
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
     booking = get_object_or_404(Booking, pk=pk)
 
     if request.method == 'POST':
@@ -312,6 +469,7 @@ def verify_customer_otp(request, pk):
                 booking.status       = 'in_progress'
                 booking.check_in_time = timezone.now()
                 booking.save()
+                events.record(booking, 'checked_in', request.user)
                 messages.success(request, 'OTP verified! Service started.')
                 return redirect('employee_booking_detail', pk=pk)
             else:
@@ -320,12 +478,9 @@ def verify_customer_otp(request, pk):
     return render(request, 'bookings/verify_customer_otp.html', {'booking': booking})
 
 
-@login_required
+@employee_required
 def add_customer_vehicle(request):
     """Employee creates a walk-in booking with issue selection."""
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
-
     if request.method == 'POST':
         mobile      = request.POST.get('customer_mobile', '').strip()
         cname       = request.POST.get('customer_name', 'Customer').strip()
@@ -354,44 +509,33 @@ def add_customer_vehicle(request):
                       'year': year, 'vehicle_type': v_type,
                       'fuel_type': fuel, 'current_km': km}
         )
-        center  = get_object_or_404(ServiceCenter, pk=center_id)
+        catalog  = get_catalog()
+        center   = catalog.get_center_or_404(center_id)
+        issues   = catalog.issues_for(issue_ids)
+        services = catalog.services_for(service_ids)
+        shards.select(shards.for_center(center.pk))
         booking = Booking.objects.create(
-            customer=customer, vehicle=vehicle, service_center=center,
+            customer=customer, vehicle=vehicle, service_center_id=center.pk,
             booking_type='offline', booking_date=timezone.now().date(),
             booking_time=timezone.now().time(), problem_description=problem,
             status='confirmed',
         )
-        booking.service_types.set(service_ids)
-        booking.selected_issues.set(issue_ids)
-
-        for issue in RepairIssue.objects.filter(pk__in=issue_ids):
-            RepairCharge.objects.create(
-                booking=booking, repair_issue=issue, charge_type='selected',
-                description=issue.name, quantity=1,
-                unit_price=issue.estimated_cost_max, is_extra=False,
-            )
-        for stype in ServiceType.objects.filter(pk__in=service_ids):
-            RepairCharge.objects.create(
-                booking=booking, charge_type='service',
-                description=stype.name, quantity=1, unit_price=stype.base_price,
-            )
-        booking.calculate_estimate()
+        booking.service_types.set([s.pk for s in services])
+        booking.selected_issues.set([i.pk for i in issues])
+        _add_selected_charges(booking, issues, services)
+        events.record(booking, 'created', request.user, status=booking.status, channel='offline')
 
         messages.success(request, f'Walk-in booking {booking.booking_id} created.')
         return redirect('employee_booking_detail', pk=booking.pk)
 
-    centers       = ServiceCenter.objects.filter(is_active=True)
-    services      = ServiceType.objects.filter(is_active=True)
-    repair_issues = RepairIssue.objects.filter(is_active=True).order_by('vehicle_type','category','display_order')
+    catalog = get_catalog()
     return render(request, 'bookings/add_customer_vehicle.html', {
-        'centers': centers, 'services': services, 'repair_issues': repair_issues,
+        'centers': catalog.centers, 'services': catalog.services, 'repair_issues': catalog.issues,
     })
 
 
-@login_required
+@employee_required
 def assign_workers(request, pk):
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
     booking = get_object_or_404(Booking, pk=pk)
     if request.method == 'POST':
         worker_ids = request.POST.getlist('workers')
@@ -400,28 +544,25 @@ def assign_workers(request, pk):
         WorkAssignment.objects.filter(booking=booking).delete()
         for wid in worker_ids:
             WorkAssignment.objects.create(booking=booking, worker_id=wid, task_description=task)
-        try:
-            booking.assigned_employee = request.user.employee_profile
+        if request.principal.employee:
+            booking.assigned_employee = request.principal.employee
             booking.save()
-        except Exception:
-            pass
+        events.record(booking, 'workers_assigned', request.user, workers=[int(w) for w in worker_ids])
         messages.success(request, 'Workers assigned.')
         return redirect('employee_booking_detail', pk=pk)
-    workers = Employee.objects.filter(service_center=booking.service_center, is_active=True)
+    workers = Employee.objects.filter(service_center_id=booking.service_center_id, is_active=True).select_related('user')
     return render(request, 'bookings/assign_workers.html', {'booking': booking, 'workers': workers})
 
 
-@login_required
+@employee_required
 def complete_service(request, pk):
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
     booking = get_object_or_404(Booking, pk=pk)
     if request.method == 'POST':
         ServiceRecord.objects.update_or_create(
             booking=booking,
             defaults={
                 'vehicle': booking.vehicle,
-                'employee': getattr(request.user, 'employee_profile', None),
+                'employee': request.principal.employee,
                 'work_done':      request.POST.get('work_done', ''),
                 'parts_replaced': request.POST.get('parts_replaced', ''),
                 'next_service_km': request.POST.get('next_service_km') or None,
@@ -432,6 +573,7 @@ def complete_service(request, pk):
         booking.status       = 'completed'
         booking.completed_at = timezone.now()
         booking.save()
+        events.record(booking, 'completed', request.user)
         send_notification(
             booking.customer, '🎉 Service Completed!',
             f'Vehicle {booking.vehicle.vehicle_number} service done at {booking.service_center.name}. '
@@ -443,22 +585,38 @@ def complete_service(request, pk):
     return render(request, 'bookings/complete_service.html', {'booking': booking})
 
 
-def get_available_slots(request):
+async def get_available_slots(request):
     cid   = request.GET.get('center_id')
     date  = request.GET.get('date')
     if cid and date:
+        if shards.enabled():
+            alias = await sync_to_async(shards.for_center)(cid)
+            if alias is None:  # no such center, so no slots
+                return JsonResponse({'slots': []})
+            shards.select(alias)
         slots = TimeSlot.objects.filter(
             service_center_id=cid, date=date, is_available=True
-        ).values('id', 'start_time', 'end_time', 'slots_remaining')
-        return JsonResponse({'slots': list(slots)})
+        ).values('id', 'start_time', 'end_time', slots_remaining=F('max_bookings') - F('current_bookings'))
+        return JsonResponse({'slots': [slot async for slot in slots]})
     return JsonResponse({'slots': []})
 
 
-@login_required
+async def booking_live(request, token):
+    """Server-sent events for booking_detail and track_service (see bookings/live.py)."""
+    booking_id = live.booking_for(token)
+    if booking_id is None:
+        raise Http404('No Booking matches the given query.')
+    # An async iterator would be drained to a list under WSGI, a sync one under ASGI
+    stream = live.astream(booking_id) if isinstance(request, ASGIRequest) else live.stream(booking_id)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx would otherwise hold events back
+    return response
+
+
+@employee_required
 def update_charge_price(request, charge_pk):
     """Employee updates the unit price of an existing charge."""
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
     charge = get_object_or_404(RepairCharge, pk=charge_pk)
     if request.method == 'POST':
         try:
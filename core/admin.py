@@ -22,6 +22,7 @@ class ServiceTypeAdmin(admin.ModelAdmin):
     list_display = ['name', 'vehicle_type', 'base_price', 'estimated_duration', 'is_active']
     list_filter = ['vehicle_type', 'is_active']
     list_editable = ['is_active', 'base_price']
+    search_fields = ['name']
 
 
 @admin.register(ContactMessage)
@@ -0,0 +1,54 @@
+"""
+Helpers for the async views served under smart_repair/asgi.py.
+
+Django 4.2's login_required, require_POST and the lazy request.user / request.session
+are sync-only: touching them on the event loop raises SynchronousOnlyOperation, and
+wrapping an async view in a sync decorator turns it back into a sync view. These are
+the async equivalents the JSON/polling endpoints use.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponseNotAllowed
+from django.shortcuts import render
+
+
+def _load_user(request):
+    user = request.user
+    user.is_authenticated  # forces the SimpleLazyObject while we are off the event loop
+    return user
+
+
+async def get_user(request):
+    """request.user, resolved (session + user query) in a worker thread."""
+    return await sync_to_async(_load_user)(request)
+
+
+async def session_get(request, key, default=None):
+    return await sync_to_async(request.session.get)(key, default)
+
+
+async def arender(request, template_name, context=None, **kwargs):
+    """render() off the event loop: context processors read the user, session and messages."""
+    return await sync_to_async(render)(request, template_name, context, **kwargs)
+
+
+def alogin_required(view_func):
+    @wraps(view_func)
+    async def _wrapped(request, *args, **kwargs):
+        user = await get_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path(), settings.LOGIN_URL)
+        return await view_func(request, *args, **kwargs)
+    return _wrapped
+
+
+def arequire_POST(view_func):
+    @wraps(view_func)
+    async def _wrapped(request, *args, **kwargs):
+        if request.method != 'POST':
+            return HttpResponseNotAllowed(['POST'])
+        return await view_func(request, *args, **kwargs)
+    return _wrapped
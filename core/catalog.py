@@ -0,0 +1,217 @@
+"""
+In-process catalog of service types, repair issues and service centers.
+
+These rows change a few times a month but are read on every booking page, so each
+worker keeps an immutable snapshot — pre-grouped by vehicle type and category, with
+display strings already computed — and rebuilds it only when the CatalogVersion row
+moves. The version itself is read from the shared cache (refreshed from the database
+at most every CATALOG_VERSION_TTL seconds), so a warm catalog read costs no queries.
+"""
+import threading
+from collections import namedtuple
+from functools import cached_property
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404
+from django.utils import timezone
+
+from smart_repair.routers import primary_reads
+
+VERSION_CACHE_KEY = 'catalog:version'
+CATALOG_VERSION_TTL = getattr(settings, 'CATALOG_VERSION_TTL', 5)
+
+ServiceEntry = namedtuple('ServiceEntry', [
+    'pk', 'id', 'name', 'description', 'vehicle_type', 'get_vehicle_type_display',
+    'base_price', 'estimated_duration', 'icon', 'image_url', 'is_active', 'display_order',
+])
+
+IssueEntry = namedtuple('IssueEntry', [
+    'pk', 'id', 'name', 'category', 'get_category_display', 'vehicle_type',
+    'get_vehicle_type_display', 'estimated_cost_min', 'estimated_cost_max', 'cost_range',
+    'avg_cost', 'description', 'is_active', 'display_order',
+])
+
+CenterEntry = namedtuple('CenterEntry', [
+    'pk', 'id', 'name', 'address', 'city', 'district', 'state', 'get_state_display',
+    'pincode', 'phone', 'email', 'latitude', 'longitude', 'coordinates', 'google_maps_link',
+    'working_days', 'working_hours', 'is_active', 'image_url', 'manager_name', 'total_bays',
+    'established_year', 'upi_id',
+])
+
+
+class CatalogSnapshot:
+    """Read-only view of the catalog at one version. Never mutate what it hands out."""
+
+    def __init__(self, version, services, issues, centers):
+        self.version = version
+        self.services = tuple(s for s in services if s.is_active)
+        self.issues = tuple(i for i in issues if i.is_active)
+        self.centers = tuple(c for c in centers if c.is_active)
+
+        # Lookups by pk cover inactive rows too — old bookings still reference them
+        self.service_by_id = MappingProxyType({s.pk: s for s in services})
+        self.issue_by_id = MappingProxyType({i.pk: i for i in issues})
+        self.center_by_id = MappingProxyType({c.pk: c for c in centers})
+
+        self.services_by_vehicle_type = MappingProxyType(_group_by_vehicle_type(self.services))
+        self.issues_by_vehicle_type = MappingProxyType(_group_by_vehicle_type(self.issues))
+        self.issue_categories = MappingProxyType({
+            vtype: MappingProxyType(_group_by_category(issues))
+            for vtype, issues in self.issues_by_vehicle_type.items()
+        })
+        self.api_centers = tuple(
+            {
+                'id': c.pk, 'name': c.name, 'city': c.city, 'address': c.address,
+                'phone': c.phone, 'latitude': c.latitude, 'longitude': c.longitude,
+                'working_hours': c.working_hours, 'working_days': c.working_days,
+            }
+            for c in self.centers
+        )
+
+    @cached_property
+    def locality(self):
+        """City/district/pincode/state index with facet counts over active centers."""
+        from .locality import LocalityIndex
+        return LocalityIndex(self.centers)
+
+    def services_for(self, ids):
+        return _pick(self.service_by_id, ids)
+
+    def issues_for(self, ids):
+        return _pick(self.issue_by_id, ids)
+
+    def get_center_or_404(self, pk):
+        try:
+            return self.center_by_id[int(pk)]
+        except (KeyError, TypeError, ValueError):
+            raise Http404('No ServiceCenter matches the given query.')
+
+
+def _group_by_vehicle_type(entries):
+    """{'2w': (...), ..., 'all': everything}; each type also lists the 'all'-vehicle rows."""
+    from .models import ServiceType
+    groups = {'all': tuple(entries)}
+    for vtype, _ in ServiceType.VEHICLE_TYPE_CHOICES:
+        if vtype != 'all':
+            groups[vtype] = tuple(e for e in entries if e.vehicle_type in (vtype, 'all'))
+    return groups
+
+
+def _group_by_category(issues):
+    groups = {}
+    for issue in issues:
+        groups.setdefault(issue.get_category_display, []).append(issue)
+    return {name: tuple(items) for name, items in groups.items()}
+
+
+def _pick(index, ids):
+    picked = []
+    for pk in ids:
+        try:
+            entry = index.get(int(pk))
+        except (TypeError, ValueError):
+            entry = None
+        if entry is not None and entry not in picked:
+            picked.append(entry)
+    return tuple(picked)
+
+
+def _image_url(field):
+    return field.url if field else ''
+
+
+def build_snapshot(version):
+    from bookings.models import RepairIssue
+    from .models import ServiceCenter, ServiceType
+
+    services = [
+        ServiceEntry(
+            s.pk, s.pk, s.name, s.description, s.vehicle_type, s.get_vehicle_type_display(),
+            s.base_price, s.estimated_duration, s.icon, _image_url(s.image), s.is_active, s.display_order,
+        )
+        for s in ServiceType.objects.order_by('display_order', 'name')
+    ]
+    issues = [
+        IssueEntry(
+            i.pk, i.pk, i.name, i.category, i.get_category_display(), i.vehicle_type,
+            i.get_vehicle_type_display(), i.estimated_cost_min, i.estimated_cost_max, i.cost_range,
+            i.avg_cost, i.description, i.is_active, i.display_order,
+        )
+        for i in RepairIssue.objects.order_by('vehicle_type', 'category', 'display_order', 'name')
+    ]
+    centers = [
+        CenterEntry(
+            c.pk, c.pk, c.name, c.address, c.city, c.district, c.state, c.get_state_display(),
+            c.pincode, c.phone, c.email, c.latitude, c.longitude, c.coordinates, c.google_maps_link,
+            c.working_days, c.working_hours, c.is_active, _image_url(c.image), c.manager_name,
+            c.total_bays, c.established_year, c.upi_id,
+        )
+        for c in ServiceCenter.objects.order_by('city', 'name')
+    ]
+    return CatalogSnapshot(version, services, issues, centers)
+
+
+def current_version_info():
+    """(version, updated_at) of the catalog, from the shared cache when possible."""
+    info = cache.get(VERSION_CACHE_KEY)
+    if info is None:
+        from .models import CatalogVersion
+        # Plain read first: get_or_create routes as a write and would pin the request to the primary
+        row = CatalogVersion.objects.filter(pk=1).first()
+        if row is None:
+            row, _ = CatalogVersion.objects.get_or_create(pk=1)
+        info = (row.version, row.updated_at)
+        cache.set(VERSION_CACHE_KEY, info, CATALOG_VERSION_TTL)
+    return info
+
+
+async def acurrent_version_info():
+    """current_version_info() for async views: the warm path is one async cache read."""
+    info = await cache.aget(VERSION_CACHE_KEY)
+    if info is None:
+        info = await sync_to_async(current_version_info)()
+    return info
+
+
+def current_version():
+    return current_version_info()[0]
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def get_catalog():
+    global _snapshot
+    version = current_version()
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version:
+        with _lock:
+            if _snapshot is None or _snapshot.version != version:
+                # Never from the replica: a lagging copy would be cached under the new version
+                with primary_reads():
+                    _snapshot = build_snapshot(version)
+            snapshot = _snapshot
+    return snapshot
+
+
+async def aget_catalog():
+    version, _ = await acurrent_version_info()
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version:
+        snapshot = await sync_to_async(get_catalog)()
+    return snapshot
+
+
+def bump_catalog_version():
+    """Move the catalog version on; every worker rebuilds its snapshot on next read."""
+    from .models import CatalogVersion
+    updated = CatalogVersion.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+    if not updated:
+        CatalogVersion.objects.create(pk=1, version=1)
+    transaction.on_commit(lambda: cache.delete(VERSION_CACHE_KEY))
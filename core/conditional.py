@@ -0,0 +1,105 @@
+"""
+Conditional GET for public catalog pages and APIs.
+
+ETags and Last-Modified come from the catalog version (see core/catalog.py), which is
+a cache read, so a revalidation that matches is answered with 304 before the view
+queries anything or renders a template.
+"""
+import hashlib
+from datetime import datetime, time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import messages
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+
+from .catalog import acurrent_version_info, current_version_info
+
+
+def _personalised(request):
+    """Pages embed the navbar, so logged-in users get their own validators."""
+    return request.user.is_authenticated
+
+
+def catalog_conditional(name, max_age=300, daily=False, html=True):
+    """
+    Decorate a GET view whose body depends only on the catalog (plus, for HTML pages,
+    who is logged in). `daily` folds today's date into the validators for pages that
+    highlight or filter by date.
+    """
+    def _etag(request, version):
+        parts = [name, str(version), request.get_full_path()]
+        if html:
+            parts.append(str(request.user.pk) if _personalised(request) else 'anon')
+        if daily:
+            parts.append(timezone.localdate().isoformat())
+        return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+    def _last_modified(updated_at):
+        if daily:
+            midnight = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+            updated_at = max(updated_at, midnight)
+        return updated_at
+
+    def etag_func(request, *args, **kwargs):
+        if _has_messages(request):
+            return None
+        return _etag(request, current_version_info()[0])
+
+    def last_modified_func(request, *args, **kwargs):
+        if _has_messages(request):
+            return None
+        return _last_modified(current_version_info()[1])
+
+    def _has_messages(request):
+        # A flash message is one-off content; always send the full page
+        return html and len(messages.get_messages(request)) > 0
+
+    def _patch(request, response):
+        if html and _personalised(request):
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            # Shared caches may keep it, but must revalidate once it goes stale
+            patch_cache_control(response, public=True, max_age=max_age, must_revalidate=True)
+        if html:
+            patch_vary_headers(response, ['Cookie'])
+        return response
+
+    async def _avalidators(request):
+        if html:
+            # Needs the session user and flash messages, which are sync-only
+            return await sync_to_async(lambda: (etag_func(request), last_modified_func(request)))()
+        version, updated_at = await acurrent_version_info()
+        return _etag(request, version), _last_modified(updated_at)
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            # django.views.decorators.http.condition() is sync-only in Django 4.2
+            @wraps(view_func)
+            async def _awrapped(request, *args, **kwargs):
+                etag, last_modified = await _avalidators(request)
+                etag = quote_etag(etag) if etag else None
+                last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+                response = None
+                if request.method in ('GET', 'HEAD'):
+                    response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    if request.method in ('GET', 'HEAD') and response.status_code == 200:
+                        if etag and not response.has_header('ETag'):
+                            response.headers['ETag'] = etag
+                        if last_modified_ts and not response.has_header('Last-Modified'):
+                            response.headers['Last-Modified'] = http_date(last_modified_ts)
+                return _patch(request, response)
+            return _awrapped
+
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            return _patch(request, conditional_view(request, *args, **kwargs))
+        return _wrapped
+    return decorator
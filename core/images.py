@@ -0,0 +1,185 @@
+"""
+Resized derivatives for uploaded images: the centers' payment QR codes, which the
+online payment and QR upload pages draw with {% picture %}.
+
+Saving a model with an image field queues its upload once the transaction commits; a
+background thread (or `manage.py build_image_derivatives`) reads it, hashes the bytes
+and writes WebP plus JPEG/PNG copies at each preset width under
+`derivatives/<sha256>/`. Identical uploads share one set of files. The ImageAsset row
+that templates look for is created only after every file is written, so a page shows
+either the original upload or complete derivatives, never half a set.
+"""
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+Preset = namedtuple('Preset', ['widths', 'formats', 'lossless'])
+
+# Widths are 1x and 2x of the CSS box the templates draw the image in. Add a preset
+# (and its field below) together with the template that shows it.
+PRESETS = {
+    'qr': Preset((240, 480), ('webp', 'png'), True),        # payment QR: 200–220px frames
+}
+
+FIELD_PRESETS = {
+    'core.servicecenter': {'payment_qr_code': ('qr',)},
+}
+
+CONTENT_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+PENDING_TIMEOUT = 10
+READY_TIMEOUT = 86400
+
+
+def derivative_name(digest, preset, width, fmt):
+    return f'derivatives/{digest[:2]}/{digest}/{preset}-{width}.{EXTENSIONS[fmt]}'
+
+
+def _cache_key(source):
+    return 'image-asset:' + hashlib.md5(source.encode()).hexdigest()
+
+
+def asset_digest(source):
+    """Digest of the ready derivatives for an upload, or None while they are pending."""
+    if not source:
+        return None
+    key = _cache_key(source)
+    digest = cache.get(key)
+    if digest is None:
+        from .models import ImageAsset
+        digest = ImageAsset.objects.filter(source=source).values_list('digest', flat=True).first() or ''
+        cache.set(key, digest, READY_TIMEOUT if digest else PENDING_TIMEOUT)
+    return digest or None
+
+
+# ── Background worker ────────────────────────────────────────────────
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _run(source, presets):
+    try:
+        build_derivatives(source, presets)
+    except Exception:
+        logger.exception('Image derivatives failed for %s', source)
+    finally:
+        connections.close_all()
+
+
+def enqueue(source, presets):
+    """Build derivatives for `source` off the request thread. With IMAGE_WORKER_THREADS = 0
+    nothing runs in-process and `manage.py build_image_derivatives` picks it up instead."""
+    global _executor
+    threads = getattr(settings, 'IMAGE_WORKER_THREADS', 1)
+    if not threads:
+        return
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='image-derivatives')
+    _executor.submit(_run, source, tuple(presets))
+
+
+def schedule_for(instance, update_fields=None):
+    """Queue every image field of `instance` that has presets, once the save commits."""
+    fields = FIELD_PRESETS.get(instance._meta.label_lower, {})
+    for field, presets in fields.items():
+        if update_fields is not None and field not in update_fields:
+            continue
+        source = getattr(instance, field).name
+        if source:
+            transaction.on_commit(lambda source=source, presets=presets: enqueue(source, presets))
+
+
+def build_derivatives(source, presets, force=False):
+    """Write missing derivative files for `source`, then publish its ImageAsset row."""
+    from PIL import Image, ImageOps
+    from .models import ImageAsset
+
+    if not force and ImageAsset.objects.filter(source=source).exists():
+        return False
+    with default_storage.open(source, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+
+    for preset_name in presets:
+        preset = PRESETS[preset_name]
+        for width in preset.widths:
+            resized = None
+            for fmt in preset.formats:
+                name = derivative_name(digest, preset_name, width, fmt)
+                if default_storage.exists(name):
+                    continue  # same bytes were uploaded before
+                if resized is None:
+                    resized = image.copy()
+                    resized.thumbnail((width, width * 4), Image.LANCZOS)
+                default_storage.save(name, ContentFile(_encode(resized, fmt, preset.lossless)))
+
+    ImageAsset.objects.update_or_create(
+        source=source, defaults={'digest': digest, 'width': image.width, 'height': image.height},
+    )
+    cache.delete(_cache_key(source))
+    return True
+
+
+def _encode(image, fmt, lossless):
+    buffer = BytesIO()
+    if fmt == 'jpeg':
+        if image.mode != 'RGB':
+            from PIL import Image
+            flat = Image.new('RGB', image.size, 'white')
+            flat.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+            image = flat
+        image.save(buffer, 'JPEG', quality=82, optimize=True, progressive=True)
+    elif fmt == 'webp':
+        image.save(buffer, 'WEBP', lossless=lossless, quality=80, method=4)
+    else:
+        image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def discard(source):
+    """Forget a replaced upload: its file, its ImageAsset row and, when no other upload
+    shares the same content, its derivatives. Call after the replacing save commits."""
+    from .models import ImageAsset
+
+    asset = ImageAsset.objects.filter(source=source).first()
+    if asset is not None:
+        asset.delete()
+        if not ImageAsset.objects.filter(digest=asset.digest).exists():
+            directory = f'derivatives/{asset.digest[:2]}/{asset.digest}'
+            try:
+                for name in default_storage.listdir(directory)[1]:
+                    default_storage.delete(f'{directory}/{name}')
+            except FileNotFoundError:
+                pass
+    cache.delete(_cache_key(source))
+    default_storage.delete(source)
+
+
+# ── Template helpers ─────────────────────────────────────────────────
+
+def variants(field, preset_name):
+    """[(format, [(width, url), ...]), ...] for a ready upload, else None."""
+    source = getattr(field, 'name', field)
+    digest = asset_digest(source)
+    if digest is None:
+        return None
+    preset = PRESETS[preset_name]
+    return [
+        (fmt, [(w, default_storage.url(derivative_name(digest, preset_name, w, fmt))) for w in preset.widths])
+        for fmt in preset.formats
+    ]
@@ -0,0 +1,76 @@
+"""
+Locality index over active service centers: city, district, pincode and state.
+
+Terms are normalised (lower-case, punctuation dropped) and kept in sorted arrays per
+field, so a prefix lookup is a bisect plus a short scan instead of a LIKE over the
+table. Built once per catalog version from the in-memory snapshot.
+"""
+import re
+from bisect import bisect_left
+from collections import Counter
+
+FIELDS = ('city', 'district', 'pincode', 'state')
+_NON_WORD = re.compile(r'[^a-z0-9 ]+')
+
+
+def normalize(value):
+    return ' '.join(_NON_WORD.sub(' ', str(value).lower()).split())
+
+
+def _terms(value):
+    """The whole value plus each word, so 'East Godavari' matches 'east g…' and 'godav…'."""
+    text = normalize(value)
+    if not text:
+        return set()
+    return {text, *text.split()}
+
+
+class LocalityIndex:
+
+    def __init__(self, centers):
+        self.centers = tuple(centers)
+        self._position = {c.pk: i for i, c in enumerate(self.centers)}
+        self._fields = {}
+        for field in FIELDS:
+            entries = sorted(
+                (term, c.pk)
+                for c in self.centers
+                for term in _terms(self._value(c, field))
+            )
+            self._fields[field] = ([t for t, _ in entries], [pk for _, pk in entries])
+
+        self.city_facets = tuple(sorted(Counter(c.city for c in self.centers).items()))
+        self.district_facets = tuple(sorted(Counter(c.district for c in self.centers).items()))
+
+    @staticmethod
+    def _value(center, field):
+        if field == 'state':
+            return f'{center.state} {center.get_state_display}'
+        return getattr(center, field)
+
+    def prefix(self, query, fields=FIELDS):
+        """pks of centers with any term in `fields` starting with `query`."""
+        query = normalize(query)
+        found = set()
+        if not query:
+            return found
+        for field in fields:
+            keys, ids = self._fields[field]
+            i = bisect_left(keys, query)
+            while i < len(keys) and keys[i].startswith(query):
+                found.add(ids[i])
+                i += 1
+        return found
+
+    def search(self, q='', city='', district='', pincode='', state=''):
+        """Centers matching every given filter, in catalog (city, name) order."""
+        selected = None
+        for value, fields in ((q, FIELDS), (city, ('city',)), (district, ('district',)),
+                              (pincode, ('pincode',)), (state, ('state',))):
+            if not value.strip():
+                continue
+            matches = self.prefix(value, fields)
+            selected = matches if selected is None else selected & matches
+        if selected is None:
+            return self.centers
+        return tuple(self.centers[i] for i in sorted(self._position[pk] for pk in selected))
@@ -0,0 +1,77 @@
+"""
+SMART REPAIR — Move closed bookings out of the live tables
+Run: python manage.py archive_bookings                       (BOOKING_ARCHIVE_AFTER_DAYS)
+     python manage.py archive_bookings --older-than 180 --dry-run
+
+Completed/cancelled bookings untouched for the given age move into ArchivedBooking with
+their charges, assignments, service record and payment, one transaction per batch so
+the counter screens never wait long for the write lock. Prints the hot tables' rows and
+size before and after; --vacuum hands the freed pages back to the filesystem. Also
+prunes delta-sync feed rows older than SYNC_RETENTION_DAYS.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from bookings import archive, changes
+from smart_repair import shards
+
+
+class Command(BaseCommand):
+    help = 'Archive closed bookings older than a given age, in batched transactions'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=None, metavar='DAYS',
+                            help=f'Age in days (default BOOKING_ARCHIVE_AFTER_DAYS = {archive.ARCHIVE_AFTER_DAYS})')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many bookings')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would move')
+        parser.add_argument('--vacuum', action='store_true',
+                            help='VACUUM afterwards (locks the database while it runs)')
+
+    def handle(self, *args, **options):
+        days = archive.ARCHIVE_AFTER_DAYS if options['older_than'] is None else options['older_than']
+        # Each state shard archives its own bookings into its own archive table
+        for alias in shards.each():
+            with shards.use_shard(alias):
+                self._archive(alias, days, options)
+            if not options['dry_run']:
+                pruned = changes.prune(alias)
+                self.stdout.write(self.style.SUCCESS(
+                    f'✂️  {pruned} sync feed rows older than {changes.RETENTION_DAYS} days pruned'
+                ))
+
+    def _archive(self, alias, days, options):
+        label = f' in {alias}' if shards.enabled() else ''
+        pks = list(archive.archivable(days).order_by('pk').values_list('pk', flat=True)[:options['limit']])
+        self.stdout.write(self.style.SUCCESS(f'🗄️  {len(pks)} closed bookings older than {days} days{label}'))
+        if options['dry_run'] or not pks:
+            return
+
+        before = archive.table_sizes(alias)
+        start = time.perf_counter()
+        moved = 0
+        size = options['batch_size']
+        for i in range(0, len(pks), size):
+            moved += archive.archive_batch(pks[i:i + size], days)
+            if (i // size) % 20 == 19:
+                self.stdout.write(f'  … {moved} archived')
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'  Archived {moved} bookings in {elapsed:.1f}s ({moved / elapsed:.0f}/s)'
+        ))
+        if options['vacuum']:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('VACUUM')
+        self._report(before, archive.table_sizes(alias))
+
+    def _report(self, before, after):
+        self.stdout.write(f'\n  {"table":<32} {"rows before":>12} {"rows after":>11} {"KiB before":>11} {"KiB after":>10}')
+        for table, (rows, size) in before.items():
+            rows_after, size_after = after[table]
+            kib = lambda value: '—' if value is None else f'{value / 1024:.0f}'
+            self.stdout.write(f'  {table:<32} {rows:>12} {rows_after:>11} {kib(size):>11} {kib(size_after):>10}')
+        if not any(size is None for _, size in after.values()):
+            self.stdout.write('  (sizes are pages in use per table; the database file keeps its size until --vacuum)')
@@ -0,0 +1,211 @@
+"""
+SMART REPAIR — Sync vs async worker count for the polling endpoints
+Run: python manage.py bench_asgi --clients 200 --duration 5 --cache-latency-ms 2
+
+Drives smart_repair.asgi and smart_repair.wsgi in-process (no sockets) with
+closed-loop clients polling /api/centers/ and /bookings/api/slots/. The async side
+holds --clients concurrent requests on one event loop; the sync side gets 1, 2, 4, …
+threads, each one a WSGI worker, until it matches the async throughput. That thread
+count is how many sync workers the same polling load needs.
+
+--cache-latency-ms adds a round trip to every cache read, as a Redis cache would:
+an async view awaits it, a sync worker sits blocked in it. Database calls run in a
+thread under both handlers (Django 4.2's async ORM wraps the sync one), so DB-bound
+endpoints gain far less than cache-bound ones.
+"""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.models import TimeSlot
+from core.catalog import get_catalog
+from core.management.stats import percentile
+
+
+@contextmanager
+def cache_latency(seconds):
+    """Make every read of the default cache backend take `seconds` longer."""
+    backend = type(caches['default'])
+    get, aget = backend.get, backend.aget
+
+    def slow_get(self, *args, **kwargs):
+        time.sleep(seconds)
+        return get(self, *args, **kwargs)
+
+    async def slow_aget(self, *args, **kwargs):
+        await asyncio.sleep(seconds)
+        return get(self, *args, **kwargs)
+
+    if seconds:
+        backend.get, backend.aget = slow_get, slow_aget
+    try:
+        yield
+    finally:
+        backend.get, backend.aget = get, aget
+
+
+class Run:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self):
+        return len(self.latencies) / self.elapsed if self.elapsed else 0
+
+    def p95(self):
+        return percentile(self.latencies, 95)
+
+
+def _asgi_call(application, path, query):
+    """One GET through the ASGI application; returns the status code."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    status = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    async def call():
+        await application(scope, receive, send)
+        return status[0] if status else 0
+    return call()
+
+
+def _wsgi_call(application, path, query):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'REMOTE_ADDR': '127.0.0.1', 'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(), 'wsgi.errors': BytesIO(), 'wsgi.multithread': True,
+        'wsgi.multiprocess': False, 'wsgi.run_once': False, 'wsgi.version': (1, 0),
+    }
+    status = []
+    body = application(environ, lambda s, headers, exc_info=None: status.append(int(s.split()[0])))
+    for _ in body:
+        pass
+    if hasattr(body, 'close'):
+        body.close()
+    return status[0] if status else 0
+
+
+class Command(BaseCommand):
+    help = 'Compare how many sync workers match one async process on the polling endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200, help='Concurrent polling clients on the async side')
+        parser.add_argument('--duration', type=float, default=5, help='Seconds per run')
+        parser.add_argument('--max-workers', type=int, default=256, help='Stop doubling sync threads here')
+        parser.add_argument('--cache-latency-ms', type=float, default=2, help='Simulated cache round trip (0 = local memory)')
+        parser.add_argument('--endpoint', choices=['centers', 'slots', 'both'], default='both')
+
+    def handle(self, *args, **options):
+        from django.core.asgi import get_asgi_application
+        from django.core.wsgi import get_wsgi_application
+
+        slot = TimeSlot.objects.filter(is_available=True).order_by('-date').values('service_center_id', 'date').first()
+        if not get_catalog().centers or slot is None:
+            raise CommandError('No service centers or time slots — run seed_data first.')
+        targets = {
+            'centers': [('/api/centers/', '')],
+            'slots': [('/bookings/api/slots/', urlencode({'center_id': slot['service_center_id'], 'date': slot['date']}))],
+        }
+        targets['both'] = targets['centers'] + targets['slots']
+        self.targets = targets[options['endpoint']]
+        self.duration = options['duration']
+        asgi, wsgi = get_asgi_application(), get_wsgi_application()
+        latency = options['cache_latency_ms'] / 1000
+
+        self.stdout.write(self.style.SUCCESS(
+            f'⚡ {options["endpoint"]} endpoint(s), {self.duration:g}s per run, '
+            f'cache round trip {options["cache_latency_ms"]:g} ms'
+        ))
+        self.stdout.write(f'  {"handler":<18} {"concurrency":>11} {"req/s":>8} {"p95 ms":>8} {"errors":>7}')
+        with cache_latency(latency):
+            reference = self._report('async (1 thread)', options['clients'], asyncio.run(self._async_run(asgi, options['clients'])))
+            workers, matched = 1, None
+            while workers <= options['max_workers']:
+                run = self._report('sync threads', workers, self._sync_run(wsgi, workers))
+                if run.throughput >= reference.throughput * 0.95:
+                    matched = workers
+                    break
+                workers *= 2
+
+        if matched:
+            self.stdout.write(self.style.SUCCESS(
+                f'\n  {matched} sync worker(s) match one async process at {options["clients"]} polling clients.'
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'\n  {options["max_workers"]} sync workers still fall short of the async throughput.'
+            ))
+
+    async def _async_run(self, application, clients):
+        run = Run()
+        deadline = time.perf_counter() + self.duration
+
+        async def client(index):
+            i = index
+            while time.perf_counter() < deadline:
+                path, query = self.targets[i % len(self.targets)]
+                start = time.perf_counter()
+                status = await _asgi_call(application, path, query)
+                run.latencies.append(time.perf_counter() - start)
+                run.errors += status != 200
+                i += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(clients)))
+        run.elapsed = time.perf_counter() - start
+        return run
+
+    def _sync_run(self, application, workers):
+        run = Run()
+        lock = threading.Lock()
+        deadline = time.perf_counter() + self.duration
+
+        def worker(index):
+            from django.db import connections
+            i = index
+            latencies, errors = [], 0
+            while time.perf_counter() < deadline:
+                path, query = self.targets[i % len(self.targets)]
+                start = time.perf_counter()
+                status = _wsgi_call(application, path, query)
+                latencies.append(time.perf_counter() - start)
+                errors += status != 200
+                i += 1
+            connections.close_all()
+            with lock:
+                run.latencies += latencies
+                run.errors += errors
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        run.elapsed = time.perf_counter() - start
+        return run
+
+    def _report(self, label, concurrency, run):
+        error_rate = run.errors / len(run.latencies) if run.latencies else 0
+        line = f'  {label:<18} {concurrency:>11} {run.throughput:>8.0f} {run.p95() * 1000:>8.1f} {error_rate:>7.1%}'
+        self.stdout.write(self.style.ERROR(line) if run.errors else line)
+        return run
@@ -0,0 +1,63 @@
+"""
+SMART REPAIR — Conditional GET savings on public catalog pages
+Run: python manage.py bench_conditional_get --rounds 50
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from core.catalog import get_catalog
+
+
+class Command(BaseCommand):
+    help = 'Compare full responses with ETag revalidations (bytes sent and server time)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=50)
+
+    def handle(self, *args, **options):
+        rounds = options['rounds']
+        catalog = get_catalog()
+        urls = [
+            reverse('services_list'),
+            reverse('services_list') + '?type=4w',
+            reverse('service_centers'),
+            reverse('holidays'),
+            reverse('centers_api'),
+        ]
+        if catalog.centers:
+            urls.append(reverse('center_detail', args=[catalog.centers[0].pk]))
+
+        client = Client()
+        self.stdout.write(self.style.SUCCESS(f'📡 Conditional GET over {rounds} rounds per URL'))
+        self.stdout.write(f'  {"URL":<32} {"full":>10} {"304":>6} {"full ms":>9} {"304 ms":>8}')
+        total_full = total_304 = 0
+        for url in urls:
+            first = client.get(url)
+            etag = first.get('ETag')
+            if not etag:
+                self.stdout.write(self.style.WARNING(f'  {url}: no ETag (status {first.status_code})'))
+                continue
+
+            full_bytes, full_time = self._measure(client, url, rounds)
+            rev_bytes, rev_time = self._measure(client, url, rounds, HTTP_IF_NONE_MATCH=etag)
+            total_full += full_bytes
+            total_304 += rev_bytes
+            self.stdout.write(
+                f'  {url:<32} {full_bytes // rounds:>9}B {rev_bytes // rounds:>5}B '
+                f'{full_time * 1000 / rounds:>9.2f} {rev_time * 1000 / rounds:>8.2f}'
+            )
+        if total_full:
+            self.stdout.write(self.style.SUCCESS(
+                f'  Revalidations sent {100 - total_304 * 100 / total_full:.1f}% fewer body bytes'
+            ))
+
+    def _measure(self, client, url, rounds, **headers):
+        sent = 0
+        start = time.perf_counter()
+        for _ in range(rounds):
+            response = client.get(url, **headers)
+            sent += len(response.content)
+        return sent, time.perf_counter() - start
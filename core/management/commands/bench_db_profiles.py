@@ -0,0 +1,126 @@
+"""
+SMART REPAIR — Database profile benchmark (mixed read/write load)
+Run: python manage.py bench_db_profiles --threads 8 --seconds 10 --write-ratio 0.2
+
+Copies the current database once per profile, then runs the same workload against
+each copy: worker threads act as requests, each either reading a center's booking
+list or writing a notification inside a transaction, and release their connection
+the way Django does at the end of a request.
+"""
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from accounts.models import Notification
+from bookings.models import Booking
+from core.management.stats import percentile
+from smart_repair.db_profiles import PROFILES, sqlite_database
+
+
+class Command(BaseCommand):
+    help = 'Compare SQLite database profiles under a concurrent read/write workload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+        parser.add_argument('--profiles', nargs='+', default=list(PROFILES))
+
+    def handle(self, *args, **options):
+        source = settings.DATABASES['default']['NAME']
+        user_ids = list(Notification._meta.get_field('user').related_model.objects.values_list('pk', flat=True)[:200])
+        center_ids = list(Booking.objects.values_list('service_center_id', flat=True).distinct()) or [1]
+        if not user_ids:
+            self.stderr.write('No users in the database — run seed_data first.')
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🗄️  {options["threads"]} threads × {options["seconds"]}s, {options["write_ratio"]:.0%} writes'
+        ))
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile in options['profiles']:
+                path = Path(tmp) / f'{profile}.sqlite3'
+                self._copy(source, path)
+                alias = f'bench_{profile}'
+                config = connections.configure_settings({
+                    'default': settings.DATABASES['default'],
+                    alias: sqlite_database(path, profile),
+                })[alias]
+                connections.settings[alias] = config
+                try:
+                    stats = self._run(alias, options, user_ids, center_ids)
+                finally:
+                    connections.settings.pop(alias)
+                self._report(profile, stats, options['seconds'])
+
+    def _copy(self, source, target):
+        # The backup API gives a consistent copy even if the live file is in WAL mode
+        src, dst = sqlite3.connect(source), sqlite3.connect(target)
+        with dst:
+            src.backup(dst)
+        src.close()
+        dst.execute('PRAGMA journal_mode = DELETE')
+        dst.close()
+
+    def _run(self, alias, options, user_ids, center_ids):
+        deadline = time.perf_counter() + options['seconds']
+        lock = threading.Lock()
+        stats = {'read': [], 'write': [], 'errors': 0}
+
+        def worker(seed):
+            rng = random.Random(seed)
+            reads, writes, errors = [], [], 0
+            while time.perf_counter() < deadline:
+                is_write = rng.random() < options['write_ratio']
+                start = time.perf_counter()
+                try:
+                    if is_write:
+                        with transaction.atomic(using=alias):
+                            Notification.objects.using(alias).create(
+                                user_id=rng.choice(user_ids), title='Benchmark', message='bench',
+                            )
+                    else:
+                        list(
+                            Booking.objects.using(alias)
+                            .filter(service_center_id=rng.choice(center_ids))
+                            .select_related('customer', 'vehicle')
+                            .order_by('-created_at')[:20]
+                        )
+                except OperationalError:
+                    errors += 1
+                else:
+                    (writes if is_write else reads).append(time.perf_counter() - start)
+                # End of "request": stock closes here, persistent profiles keep the connection
+                connections[alias].close_if_unusable_or_obsolete()
+            connections[alias].close()
+            with lock:
+                stats['read'] += reads
+                stats['write'] += writes
+                stats['errors'] += errors
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options['threads'])]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return stats
+
+    def _report(self, profile, stats, seconds):
+        def pct(values, q):
+            return percentile(values, q) * 1000
+
+        total = len(stats['read']) + len(stats['write'])
+        self.stdout.write(f'\n  {profile}')
+        self.stdout.write(f'    throughput   {total / seconds:8.0f} req/s  ({total} ok, {stats["errors"]} "database is locked")')
+        for kind in ('read', 'write'):
+            values = stats[kind]
+            self.stdout.write(
+                f'    {kind:<6}       p50 {pct(values, 50):7.2f} ms   p95 {pct(values, 95):7.2f} ms   p99 {pct(values, 99):7.2f} ms'
+            )
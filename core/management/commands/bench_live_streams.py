@@ -0,0 +1,250 @@
+"""
+SMART REPAIR — Concurrent live tracking streams per worker
+Run: python manage.py bench_live_streams --streams 1000 --bookings 100 --changes 10
+
+Opens --streams server-sent event streams on booking_live through smart_repair.asgi,
+in-process (no sockets), spread evenly over --bookings bookings and all on one event
+loop — one ASGI worker. Then it changes bookings the way the employee screens do, a
+charge added and removed again (so the data ends as it started), and times how long
+every stream following the changed booking takes to receive the update. Last, it
+times one polling round over every watched booking: what each worker pays every
+LIVE_POLL_SECONDS to see changes made by the others.
+
+--wsgi-threads repeats the fan-out with that many streams through smart_repair.wsgi,
+one thread each, which is what a stream costs a sync worker.
+"""
+import asyncio
+import os
+import threading
+import time
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from bookings import live
+from bookings.models import Booking, RepairCharge
+from core.management.stats import percentile
+from smart_repair import shards
+
+WAIT_SECONDS = 10
+
+
+class Stream:
+    """One client's end of a stream: how many updates it has had, and when the last came."""
+
+    def __init__(self, booking_id):
+        self.booking_id = booking_id
+        self.updates = 0
+        self.last = None
+
+    def feed(self, chunk):
+        updates = chunk.count(b'event: update')
+        if updates:
+            self.updates += updates
+            self.last = time.perf_counter()
+
+
+async def _asgi_stream(application, path, stream):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    requested = asyncio.Event()
+
+    async def receive():
+        if not requested.is_set():
+            requested.set()
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.Event().wait()  # the client never hangs up; the benchmark cancels it
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            stream.feed(message.get('body', b''))
+
+    await application(scope, receive, send)
+
+
+def _wsgi_stream(application, path, stream):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'REMOTE_ADDR': '127.0.0.1', 'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(), 'wsgi.errors': BytesIO(), 'wsgi.multithread': True,
+        'wsgi.multiprocess': False, 'wsgi.run_once': False, 'wsgi.version': (1, 0),
+    }
+    body = application(environ, lambda status, headers, exc_info=None: None)
+    try:
+        for chunk in body:
+            stream.feed(chunk)
+    finally:
+        body.close()
+        connections.close_all()
+
+
+def _add_charge(booking):
+    return RepairCharge.objects.create(
+        booking=booking, description='Live stream benchmark', charge_type='extra', unit_price=1,
+    )
+
+
+def _rss():
+    """Resident memory of this process in bytes (Linux)."""
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class Command(BaseCommand):
+    help = 'How many live tracking streams one worker holds, and how fast changes reach them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--streams', type=int, default=1000, help='Open streams on the ASGI worker')
+        parser.add_argument('--bookings', type=int, default=100, help='Bookings the streams follow')
+        parser.add_argument('--changes', type=int, default=10, help='Charges added and removed again')
+        parser.add_argument('--wsgi-threads', type=int, default=0, help='Also hold this many streams on WSGI threads')
+
+    def handle(self, *args, **options):
+        from django.core.asgi import get_asgi_application
+        from django.core.wsgi import get_wsgi_application
+
+        bookings = shards.fan_out(
+            lambda: Booking.objects.filter(status__in=['confirmed', 'in_progress']).order_by('-pk')[:options['bookings']]
+        )
+        if not bookings:
+            raise CommandError('No confirmed or in-progress bookings — run seed_data first.')
+        self.bookings = bookings
+        self.paths = {b.pk: f'/bookings/booking/live/{live.token_for(b)}/' for b in bookings}
+        self.changes = options['changes']
+
+        self.stdout.write(self.style.SUCCESS(
+            f'📡 {options["streams"]} streams over {len(bookings)} bookings on one ASGI worker, '
+            f'{self.changes} charges added and removed'
+        ))
+        asyncio.run(self._asgi(get_asgi_application(), options['streams']))
+        self._poll_round()
+        if options['wsgi_threads']:
+            self._wsgi(get_wsgi_application(), options['wsgi_threads'])
+
+    def _streams(self, count):
+        return [Stream(self.bookings[i % len(self.bookings)].pk) for i in range(count)]
+
+    def _report_open(self, label, streams, elapsed, memory):
+        opened = sum(1 for s in streams if s.updates)
+        self.stdout.write(
+            f'  {label}: {opened}/{len(streams)} streams had their first snapshot after {elapsed * 1000:.0f} ms, '
+            f'{memory / len(streams) / 1024:.1f} KiB more memory each'
+        )
+
+    def _report_fan_out(self, label, latencies, followers):
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f'  {label}: no change reached its streams within {WAIT_SECONDS}s'))
+            return
+        self.stdout.write(
+            f'  {label}: a change reached all {followers} streams of its booking in '
+            f'p50 {percentile(latencies, 50) * 1000:.1f} ms, p95 {percentile(latencies, 95) * 1000:.1f} ms '
+            f'({len(latencies)} changes)'
+        )
+
+    # ── ASGI ─────────────────────────────────────────────────────────
+
+    async def _asgi(self, application, count):
+        streams = self._streams(count)
+        rss = _rss()
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(_asgi_stream(application, self.paths[s.booking_id], s)) for s in streams]
+        # Django takes each request through its middleware in turn, so opening is serial
+        await self._until(lambda: all(s.updates for s in streams), WAIT_SECONDS + count * 0.01)
+        elapsed = time.perf_counter() - start
+        memory = _rss() - rss
+        self._report_open('async', streams, elapsed, memory)
+
+        latencies = []
+        for i in range(self.changes):
+            booking = self.bookings[i % len(self.bookings)]
+            charge = await self._measure(streams, booking, lambda: sync_to_async(_add_charge)(booking), latencies)
+            await self._measure(streams, booking, sync_to_async(charge.delete), latencies)
+        self._report_fan_out('async', latencies, sum(1 for s in streams if s.booking_id == self.bookings[0].pk))
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.stdout.write(f'  async: {live.hub.streams()} streams left subscribed after the clients went away')
+
+    async def _measure(self, streams, booking, change, latencies):
+        followers = [s for s in streams if s.booking_id == booking.pk]
+        before = {id(s): s.updates for s in followers}
+        start = time.perf_counter()
+        result = await change()
+        if await self._until(lambda: all(s.updates > before[id(s)] for s in followers)):
+            latencies.append(max(s.last for s in followers) - start)
+        return result
+
+    async def _until(self, done, timeout=WAIT_SECONDS):
+        deadline = time.perf_counter() + timeout
+        while not done():
+            if time.perf_counter() > deadline:
+                return False
+            await asyncio.sleep(0.001)
+        return True
+
+    # ── Polling ──────────────────────────────────────────────────────
+
+    def _poll_round(self):
+        """One fallback round over every booking, as the pump runs it every LIVE_POLL_SECONDS."""
+        pks = [b.pk for b in self.bookings]
+        using = shards.for_pk(pks[0]) or 'default'
+        with CaptureQueriesContext(connections[using]) as queries:
+            start = time.perf_counter()
+            live.hub.publish(pks)
+            elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'  poll round over {len(pks)} watched bookings: {elapsed * 1000:.1f} ms, {len(queries)} queries'
+        )
+
+    # ── WSGI ─────────────────────────────────────────────────────────
+
+    def _wsgi(self, application, count):
+        streams = self._streams(count)
+        threads = [threading.Thread(target=_wsgi_stream, args=(application, self.paths[s.booking_id], s), daemon=True)
+                   for s in streams]
+        # A sync stream can't be cancelled from outside; let each end once the fan-out is measured
+        stream_seconds, live.STREAM_SECONDS = live.STREAM_SECONDS, WAIT_SECONDS * (2 * self.changes + 1)
+        rss = _rss()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        self._wait(lambda: all(s.updates for s in streams), WAIT_SECONDS + count * 0.01)
+        elapsed = time.perf_counter() - start
+        memory = _rss() - rss
+        live.STREAM_SECONDS = stream_seconds
+        label = f'sync ({count} threads)'
+        self._report_open(label, streams, elapsed, memory)
+
+        latencies = []
+        for i in range(self.changes):
+            booking = self.bookings[i % len(self.bookings)]
+            charge = self._measure_sync(streams, booking, lambda: _add_charge(booking), latencies)
+            self._measure_sync(streams, booking, charge.delete, latencies)
+        self._report_fan_out(label, latencies, sum(1 for s in streams if s.booking_id == self.bookings[0].pk))
+        self.stdout.write(f'  sync: {sum(t.is_alive() for t in threads)} threads blocked holding streams')
+
+    def _measure_sync(self, streams, booking, change, latencies):
+        followers = [s for s in streams if s.booking_id == booking.pk]
+        before = {id(s): s.updates for s in followers}
+        start = time.perf_counter()
+        result = change()
+        if followers and self._wait(lambda: all(s.updates > before[id(s)] for s in followers)):
+            latencies.append(max(s.last for s in followers) - start)
+        return result
+
+    def _wait(self, done, timeout=WAIT_SECONDS):
+        deadline = time.perf_counter() + timeout
+        while not done():
+            if time.perf_counter() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
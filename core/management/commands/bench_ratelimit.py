@@ -0,0 +1,52 @@
+"""
+SMART REPAIR — Rate limiter overhead benchmark
+Run: python manage.py bench_ratelimit --requests 20000
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from core.ratelimit import ratelimit
+
+
+def _plain_view(request):
+    return HttpResponse('ok')
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request cost of the OTP rate limiter (allowed and rejected paths)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        n = options['requests']
+        factory = RequestFactory()
+        requests = [
+            factory.post('/bench/', {'mobile_number': f'9{i:09d}'}, REMOTE_ADDR=f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}')
+            for i in range(n)
+        ]
+        for request in requests:
+            request.POST  # parse form bodies up front so only the limiter is measured
+        limited = ratelimit('bench', 'login', mobile=lambda r: r.POST.get('mobile_number'))(_plain_view)
+
+        self.stdout.write(self.style.SUCCESS(f'🚦 Rate limiter overhead over {n} requests'))
+        # Generous rates: every request takes the "allowed" path (reads + increments)
+        with override_settings(RATELIMITS={'bench': {'ip': f'{n}/h', 'mobile': f'{n}/h'}}):
+            base = self._time(_plain_view, requests)
+            allowed = self._time(limited, requests)
+        # Zero budget: every request is rejected after the reads
+        with override_settings(RATELIMITS={'bench': {'ip': '0/h', 'mobile': '0/h'}}):
+            rejected = self._time(limited, requests)
+
+        self.stdout.write(f'  bare view          {base * 1e6 / n:8.2f} µs/request')
+        self.stdout.write(f'  limited (allowed)  {allowed * 1e6 / n:8.2f} µs/request  (+{(allowed - base) * 1e6 / n:.2f} µs)')
+        self.stdout.write(f'  limited (429)      {rejected * 1e6 / n:8.2f} µs/request')
+
+    def _time(self, view, requests):
+        start = time.perf_counter()
+        for request in requests:
+            view(request)
+        return time.perf_counter() - start
@@ -0,0 +1,126 @@
+"""
+SMART REPAIR — Booking write throughput on one database vs. per-state shards
+Run: DATABASE_SHARDS="AP=/tmp/ap.sqlite3,TS=/tmp/ts.sqlite3" python manage.py migrate --database shard_ap
+     (and shard_ts), then: python manage.py bench_shards --writers 4 --duration 5 [--synchronous FULL]
+
+Starts --writers processes per configured state. Each one books services at one of
+its state's centers as fast as it can, writing what confirm_booking writes: the
+booking, its selected issues and its repair charges, one transaction per booking.
+The same writers run twice — first all on 'default', sharing one write lock, then
+each on its state's shard — and the bookings written are deleted afterwards.
+"""
+import multiprocessing
+import time
+from datetime import time as clock
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from bookings.models import Booking, RepairCharge, RepairIssue, Vehicle
+from core.models import ServiceCenter
+from core.management.stats import percentile
+from smart_repair import shards
+
+MARK = 'bench_shards'
+
+
+def _writer(alias, center_id, vehicle, issues, start_at, duration, synchronous):
+    """One writer process: book at `center_id` on `alias` until the time is up."""
+    latencies, locked = [], 0
+    if synchronous:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f'PRAGMA synchronous = {synchronous}')
+    today = timezone.localdate()
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.perf_counter() + duration
+    with shards.use_shard(alias):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with transaction.atomic(using=alias):
+                    booking = Booking.objects.create(
+                        customer_id=vehicle[1], vehicle_id=vehicle[0], service_center_id=center_id,
+                        booking_date=today, booking_time=clock(10, 0), status='confirmed',
+                        problem_description=MARK,
+                    )
+                    booking.selected_issues.set([pk for pk, _, _ in issues])
+                    RepairCharge.objects.bulk_create([
+                        RepairCharge(booking=booking, repair_issue_id=pk, charge_type='selected',
+                                     description=name, unit_price=Decimal(price))
+                        for pk, name, price in issues
+                    ])
+            except OperationalError:  # "database is locked" past the busy timeout
+                locked += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+    connections.close_all()
+    return alias, latencies, locked
+
+
+class Command(BaseCommand):
+    help = 'Compare booking write throughput on one SQLite database and on per-state shards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help='Writer processes per state')
+        parser.add_argument('--duration', type=float, default=5, help='Seconds per run')
+        parser.add_argument('--synchronous', choices=['NORMAL', 'FULL'], default=None,
+                            help="Override the profile's synchronous pragma (FULL: fsync every commit)")
+
+    def handle(self, *args, **options):
+        if not shards.enabled():
+            raise CommandError('No shards configured — set DATABASE_SHARDS and migrate each shard database.')
+        vehicle = Vehicle.objects.values_list('pk', 'owner_id').first()
+        issues = list(RepairIssue.objects.filter(is_active=True).order_by('pk')
+                      .values_list('pk', 'name', 'estimated_cost_max')[:3])
+        centers = {}
+        for state, alias in shards.shard_map().items():
+            center = ServiceCenter.objects.filter(is_active=True, state=state).order_by('pk').first()
+            if center is None:
+                raise CommandError(f'No active center in {state} — run seed_data first.')
+            centers[alias] = center.pk
+        if vehicle is None or not issues:
+            raise CommandError('No vehicles or repair issues — run seed_data and seed_scale first.')
+
+        self.writers, self.duration, self.synchronous = options['writers'], options['duration'], options['synchronous']
+        total = self.writers * len(centers)
+        self.stdout.write(self.style.SUCCESS(
+            f'🗂️  {total} writer processes ({self.writers} per state), {self.duration:g}s per run'
+            + (f', synchronous={self.synchronous}' if self.synchronous else '')
+        ))
+        self.stdout.write(f'  {"placement":<20} {"database":<12} {"bookings/s":>11} {"p95 ms":>8} {"locked":>7}')
+        single = self._run('one database', {alias: shards.PRIMARY_ALIAS for alias in centers}, centers, vehicle, issues)
+        sharded = self._run('per-state shards', {alias: alias for alias in centers}, centers, vehicle, issues)
+        self.stdout.write(self.style.SUCCESS(f'\n  Shards write {sharded / single:.1f}× the bookings per second of one database.'))
+
+    def _run(self, label, placement, centers, vehicle, issues):
+        """Run every writer once with `placement` ({shard: database to write to}); returns bookings/s."""
+        connections.close_all()  # forked writers must open their own connections
+        start_at = time.time() + 0.5
+        jobs = [
+            (placement[alias], center_id, vehicle, issues, start_at, self.duration, self.synchronous)
+            for alias, center_id in centers.items() for _ in range(self.writers)
+        ]
+        with multiprocessing.get_context('fork').Pool(len(jobs)) as pool:
+            results = pool.starmap(_writer, jobs)
+
+        by_database = {}
+        for alias, latencies, locked in results:
+            done = by_database.setdefault(alias, ([], [0]))
+            done[0].extend(latencies)
+            done[1][0] += locked
+        total = 0
+        for alias, (latencies, locked) in by_database.items():
+            rate = len(latencies) / self.duration
+            total += rate
+            p95 = percentile(latencies, 95) * 1000
+            line = f'  {label:<20} {alias:<12} {rate:>11.0f} {p95:>8.1f} {locked[0]:>7}'
+            self.stdout.write(self.style.ERROR(line) if locked[0] else line)
+            label = ''
+        self.stdout.write(f'  {"":<20} {"total":<12} {total:>11.0f}')
+
+        for alias in set(placement.values()):
+            with shards.use_shard(alias):
+                Booking.objects.filter(problem_description=MARK).delete()
+        return total
@@ -0,0 +1,135 @@
+"""
+SMART REPAIR — Template render benchmark
+Run: python manage.py bench_templates --iterations 200
+
+Requests each page once (as a visitor, the booking's customer or an employee of its
+center) to capture the exact context its view builds from the seeded data, then
+re-renders that template with the context frozen. For every page it reports:
+
+  parse+render   a loader without caching, as when templates are re-read per request,
+                 with fragments cold
+  cached         the cached loader with every {% cache %} fragment cold
+  warm           the cached loader with fragments already in the cache
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.template import Context, Engine, engines
+from django.template.base import Template
+from django.test import Client
+from django.test.signals import template_rendered
+from django.test.utils import instrumented_test_render
+from django.urls import reverse
+
+from accounts.models import Employee
+from bookings.models import Booking, RepairCharge
+from payments.models import Payment
+
+
+def _capture(client, url, template_name):
+    """GET `url` and return the flattened context `template_name` was rendered with."""
+    captured = []
+
+    def on_render(sender, template, context, **kwargs):
+        if template.name == template_name and not captured:
+            captured.append(context.flatten())
+
+    original = Template._render
+    Template._render = instrumented_test_render
+    template_rendered.connect(on_render)
+    try:
+        cache.clear()  # whole-page caches would skip rendering altogether
+        response = client.get(url)
+    finally:
+        template_rendered.disconnect(on_render)
+        Template._render = original
+    if response.status_code != 200 or not captured:
+        raise CommandError(f'{url} did not render {template_name} (status {response.status_code}).')
+    return captured[0]
+
+
+def _uncached_engine(engine):
+    """The project engine with the same settings minus the cached loader."""
+    return Engine(
+        dirs=engine.dirs, app_dirs=False, debug=engine.debug,
+        loaders=settings.TEMPLATE_LOADERS,
+        string_if_invalid=engine.string_if_invalid, file_charset=engine.file_charset,
+        libraries=engine.libraries, autoescape=engine.autoescape,
+        builtins=[b for b in engine.builtins if b not in Engine.default_builtins],
+    )
+
+
+class Command(BaseCommand):
+    help = 'Time template rendering per page with seeded data: uncached loader, cached loader, warm fragments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--page', action='append', help='Only these pages (repeatable)')
+
+    def handle(self, *args, **options):
+        pages = self._pages()
+        if options['page']:
+            pages = [p for p in pages if p[0] in options['page']]
+        engine = engines['django'].engine
+        uncached = _uncached_engine(engine)
+        n = options['iterations']
+
+        self.stdout.write(self.style.SUCCESS(f'🧩 Rendering {len(pages)} pages × {n} iterations'))
+        self.stdout.write(f'  {"page":<26} {"parse+render":>13} {"cached":>9} {"warm":>9} {"speedup":>8}')
+        for name, client, url, template_name in pages:
+            context = _capture(client, url, template_name)
+            template = engine.get_template(template_name)
+            parse = self._time(n, lambda: uncached.get_template(template_name).render(Context(context)), before=cache.clear)
+            cold = self._time(n, lambda: template.render(Context(context)), before=cache.clear)
+            template.render(Context(context))
+            warm = self._time(n, lambda: template.render(Context(context)))
+            self.stdout.write(
+                f'  {name:<26} {parse:>10.2f} ms {cold:>6.2f} ms {warm:>6.2f} ms {parse / warm:>7.1f}×'
+            )
+        cache.clear()
+
+    def _time(self, n, render, before=None):
+        samples = []
+        for _ in range(n):
+            if before is not None:
+                before()
+            start = time.perf_counter()
+            render()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples) * 1000
+
+    def _pages(self):
+        busiest = (RepairCharge.objects.values('booking_id').annotate(n=Count('id'))
+                   .order_by('-n').values_list('booking_id', flat=True)[:50])
+        booking = employee = None
+        for booking in Booking.objects.filter(pk__in=list(busiest)).select_related('customer'):
+            employee = (Employee.objects.filter(service_center_id=booking.service_center_id, is_active=True)
+                        .select_related('user').first())
+            if employee:
+                break
+        if employee is None:
+            raise CommandError('No booking with charges at a staffed center — run seed_data and book a service first.')
+
+        visitor, customer, staff = Client(), Client(), Client()
+        customer.force_login(booking.customer)
+        staff.force_login(employee.user)
+        pages = [
+            ('home', visitor, reverse('home'), 'core/home.html'),
+            ('service_centers', visitor, reverse('service_centers'), 'core/service_centers.html'),
+            ('center_detail', visitor, reverse('center_detail', args=[booking.service_center_id]), 'core/center_detail.html'),
+            ('services_list', visitor, reverse('services_list'), 'core/services_list.html'),
+            ('my_bookings', customer, reverse('my_bookings'), 'bookings/my_bookings.html'),
+            ('booking_detail', customer, reverse('booking_detail', args=[booking.pk]), 'bookings/booking_detail.html'),
+            ('employee_dashboard', staff, reverse('employee_dashboard'), 'accounts/employee_dashboard.html'),
+            ('employee_booking_detail', staff, reverse('employee_booking_detail', args=[booking.pk]),
+             'bookings/employee_booking_detail.html'),
+            ('create_bill', staff, reverse('create_bill', args=[booking.pk]), 'payments/create_bill.html'),
+        ]
+        payment = Payment.objects.filter(booking=booking).first() or Payment.objects.first()
+        if payment:
+            pages.append(('view_receipt', staff, reverse('view_receipt', args=[payment.pk]), 'payments/receipt.html'))
+        return pages
@@ -0,0 +1,54 @@
+"""
+SMART REPAIR — Build resized derivatives for uploaded images
+Run: python manage.py build_image_derivatives             (once: backfill / catch up)
+     python manage.py build_image_derivatives --every 10  (as the worker, with IMAGE_WORKER_THREADS = 0)
+
+Finds uploads on the fields listed in core.images.FIELD_PRESETS that have no
+ImageAsset yet and generates their WebP/JPEG/PNG derivatives.
+"""
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core import images
+from core.models import ImageAsset
+
+
+class Command(BaseCommand):
+    help = 'Generate missing image derivatives for uploaded media'
+    requires_system_checks = []  # a worker: start without loading the URLconf and templates
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, default=0, help='Repeat every N seconds')
+        parser.add_argument('--force', action='store_true', help='Rebuild even when an ImageAsset exists')
+
+    def handle(self, *args, **options):
+        while True:
+            self._pass(options['force'])
+            if not options['every']:
+                break
+            time.sleep(options['every'])
+
+    def _pass(self, force):
+        done = set() if force else set(ImageAsset.objects.values_list('source', flat=True))
+        built = failed = 0
+        start = time.perf_counter()
+        for label, fields in images.FIELD_PRESETS.items():
+            model = apps.get_model(label)
+            for field, presets in fields.items():
+                sources = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                for source in sources.values_list(field, flat=True).distinct():
+                    if source in done:
+                        continue
+                    try:
+                        images.build_derivatives(source, presets, force=force)
+                        built += 1
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f'  ❌ {source}: {exc}')
+                    done.add(source)
+        if built or failed:
+            self.stdout.write(self.style.SUCCESS(
+                f'🖼️  {built} uploads processed, {failed} failed in {time.perf_counter() - start:.1f}s'
+            ))
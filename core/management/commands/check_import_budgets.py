@@ -0,0 +1,143 @@
+"""
+SMART REPAIR — Startup time and import budget check
+Run: python manage.py check_import_budgets [--runs 5] [--top 10] [--verbose]
+
+Starts fresh interpreters for each startup stage below and reports the wall time
+and, from `python -X importtime`, what the imports cost: all of them, the project's
+own, and the slowest project modules. Times are the median of --runs, which one
+slow start (another process waking up, a cold disk cache) doesn't move. Fails (exit
+code 1) when a stage pulls in a module it must not — a view module at django.setup(),
+say, which every command and worker would then pay for. Timings depend on the machine,
+so a stage whose project imports go over its budget only gets a warning.
+"""
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+VIEWS = ('accounts.views', 'bookings.views', 'core.views', 'payments.views')
+
+# (stage, who pays for it, code run in a fresh interpreter, budget for the project's own
+# imports in ms, modules the stage must not import). Budgets are twice the median of 25
+# runs on the development machine (setup 30, urls 55, checks 41 ms), rounded up to 5 ms:
+# single runs there reached 1.6 times the median, and a slower machine or CI runner needs
+# room on top. Going over one warns; it doesn't fail. Re-measure and keep that margin when
+# a budget has to move. The URLconf's share includes building the admin's URL patterns.
+STAGES = [
+    ('setup', 'every process; all seeders and workers pay',
+     'import django; django.setup()', 60, VIEWS + ('bookings.changes', 'bookings.events', 'bookings.live', 'csv', 'PIL')),
+    ('urls', 'web servers, before the first request',
+     'import django; django.setup()\n'
+     'from django.urls import get_resolver; get_resolver().url_patterns', 110, ('csv', 'PIL')),
+    ('checks', 'commands that run the system checks',
+     'import django; django.setup()\n'
+     'from django.core import checks; checks.run_checks()', 85, ()),
+]
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+# -X importtime only sees the import statement; Django loads models, admin modules and
+# URLconfs through importlib.import_module, so route that through __import__ first.
+TIMED_IMPORT_MODULE = """
+import importlib, importlib.util, sys
+def _import_module(name, package=None):
+    name = importlib.util.resolve_name(name, package) if name.startswith('.') else name
+    __import__(name)
+    return sys.modules[name]
+importlib.import_module = _import_module
+"""
+
+
+def import_times(code):
+    """[(module, self µs, cumulative µs, depth)] from `python -X importtime`, in report order."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', TIMED_IMPORT_MODULE + code],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def importer(rows, index):
+    """The module whose import pulled in rows[index] (importtime lists children first)."""
+    depth = rows[index][3]
+    for module, _, _, other_depth in rows[index + 1:]:
+        if other_depth < depth:
+            return module
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Report startup time and per-module import cost; fail on import budget regressions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Interpreters started per stage')
+        parser.add_argument('--top', type=int, default=10, help='Slowest project modules to list per stage')
+        parser.add_argument('--verbose', action='store_true', help='List every project module')
+
+    def handle(self, *args, **options):
+        base = Path(settings.BASE_DIR).resolve()
+        self.packages = {config.name.split('.')[0] for config in apps.get_app_configs()
+                         if Path(config.path).resolve().is_relative_to(base)}
+        self.packages.add(settings.ROOT_URLCONF.split('.')[0])
+
+        self.stdout.write(f'\n  {"stage":<8} {"paid by":<42} {"wall ms":>8} {"imports ms":>11} '
+                          f'{"project ms":>11} {"budget":>7}')
+        failures, warnings, reports = [], [], []
+        for stage, paid_by, code, budget, forbidden in STAGES:
+            wall = self._wall_ms(code, options['runs'])
+            runs = [import_times(code) for _ in range(options['runs'])]
+            rows = sorted(runs, key=lambda run: sum(r[1] for r in run))[len(runs) // 2]
+            total = sum(r[1] for r in rows) / 1000
+            project = statistics.median(sum(r[1] for r in run if self._is_project(r[0])) for run in runs) / 1000
+            line = f'  {stage:<8} {paid_by:<42} {wall:>8.0f} {total:>11.1f} {project:>11.1f} {budget:>7}'
+            if project > budget:
+                warnings.append(f'{stage}: project imports take {project:.1f} ms (budget {budget})')
+            problems = []
+            for index, (module, *_rest) in enumerate(rows):
+                if any(module == name or module.startswith(name + '.') for name in forbidden):
+                    via = importer(rows, index)
+                    problems.append(f'{stage}: imports {module}' + (f' (via {via})' if via else ''))
+            self.stdout.write(self.style.ERROR(line) if problems else
+                              self.style.WARNING(line) if project > budget else line)
+            failures += problems
+            reports.append((stage, rows))
+
+        for stage, rows in reports:
+            project = sorted((r for r in rows if self._is_project(r[0])), key=lambda r: r[2], reverse=True)
+            shown = project if options['verbose'] else project[:options['top']]
+            self.stdout.write(f'\n  {stage}: slowest project modules (cumulative / self ms)')
+            for module, self_us, cumulative_us, _ in shown:
+                self.stdout.write(f'    {cumulative_us / 1000:>7.1f} {self_us / 1000:>7.1f}  {module}')
+
+        if warnings or failures:
+            self.stdout.write('')
+        for warning in warnings:
+            self.stdout.write(self.style.WARNING(f'  ⚠ {warning}'))
+        if failures:
+            for problem in failures:
+                self.stdout.write(self.style.ERROR(f'  ✗ {problem}'))
+            raise CommandError(f'{len(failures)} forbidden imports at startup')
+        summary = (f'{len(warnings)} over their time budget' if warnings
+                   else f'all {len(STAGES)} within their import budgets')
+        self.stdout.write(self.style.SUCCESS(f'\n⏱️  No startup stage imports a module it must not; {summary}'))
+
+    def _is_project(self, module):
+        return module.split('.')[0] in self.packages
+
+    def _wall_ms(self, code, runs):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], capture_output=True, check=True)
+            times.append((time.perf_counter() - start) * 1000)
+        return statistics.median(times)
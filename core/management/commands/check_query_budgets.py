@@ -0,0 +1,374 @@
+"""
+SMART REPAIR — Query budget check for every view
+Run: python manage.py check_query_budgets [--small 2] [--large 12] [--verbose]
+
+Builds a throwaway test database, seeds it at a small and a large size (bookings,
+charges, workers, vehicles, notifications, slots and holidays all grow together),
+and requests every URL in core, accounts, bookings and payments as the right kind
+of user. Each request runs in a rolled-back transaction, so both sizes see the same
+state. Fails (exit code 1) when a view answers with another status than expected,
+exceeds its budget, or its query count grows with the data — printing the repeated
+SQL — or when a URL has no budget.
+Measures the single-database layout even when DATABASE_SHARDS is set.
+"""
+import datetime
+import io
+import re
+from collections import Counter
+from contextlib import redirect_stdout
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import (
+    CaptureQueriesContext, setup_databases, setup_test_environment,
+    teardown_databases, teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+import accounts.urls
+import bookings.urls
+import core.urls
+import payments.urls
+from bookings import archive, live
+from core import catalog
+
+# (url name, user, method, expected status, budget). Users: None (anonymous), 'customer',
+# 'employee', 'admin'. A view that answers with another status — a 403, a redirect to the
+# login page — fails however few queries it ran. Budgets are the size-independent query
+# counts measured with a warm catalog, plus one.
+CASES = [
+    # core
+    ('home', None, 'get', 200, 2),
+    ('about', None, 'get', 200, 1),
+    ('contact', None, 'get', 200, 1),
+    ('contact', None, 'post', 302, 6),
+    ('services_list', None, 'get', 200, 1),
+    ('service_centers', None, 'get', 200, 1),
+    ('center_detail', None, 'get', 200, 1),
+    ('track_service', None, 'get', 200, 1),
+    ('track_service', None, 'post', 200, 3),
+    ('holidays', None, 'get', 200, 2),
+    ('centers_api', None, 'get', 200, 1),
+    ('metrics', 'admin', 'get', 200, 3),
+    # accounts
+    ('customer_login', None, 'get', 200, 1),
+    ('customer_login', None, 'post', 200, 7),
+    ('employee_login', None, 'get', 200, 1),
+    ('employee_login', None, 'post', 302, 11),
+    ('customer_register', None, 'get', 200, 1),
+    ('verify_register', None, 'get', 200, 1),
+    ('logout', 'customer', 'get', 302, 9),
+    ('my_profile', 'customer', 'get', 200, 4),
+    ('complete_profile', 'customer', 'get', 200, 3),
+    ('notifications', 'customer', 'get', 200, 5),
+    ('employee_dashboard', 'employee', 'get', 200, 9),
+    ('export_bookings_excel', 'admin', 'get', 200, 2),
+    ('resend_otp', 'customer', 'post', 200, 4),
+    # bookings
+    ('book_step1', 'customer', 'get', 200, 4),
+    ('book_step2', 'customer', 'post', 200, 7),
+    ('book_step3', 'customer', 'post', 200, 6),
+    ('confirm_booking', 'customer', 'post', 302, 18),
+    ('my_bookings', 'customer', 'get', 200, 4),
+    ('booking_detail', 'customer', 'get', 200, 6),
+    ('booking_live', None, 'get', 200, 1),
+    ('cancel_booking', 'customer', 'get', 302, 8),
+    ('employee_bookings', 'employee', 'get', 200, 5),
+    ('employee_bookings_bulk', 'employee', 'post', 302, 12),
+    ('employee_changes', 'employee', 'get', 200, 10),
+    ('employee_slots', 'employee', 'get', 200, 4),
+    ('employee_slots', 'employee', 'post', 302, 11),
+    ('employee_booking_detail', 'employee', 'get', 200, 10),
+    ('verify_customer_otp', 'employee', 'get', 200, 7),
+    ('assign_workers', 'employee', 'get', 200, 7),
+    ('complete_service', 'employee', 'get', 200, 6),
+    ('add_extra_charge', 'employee', 'post', 302, 10),
+    ('remove_charge', 'employee', 'post', 302, 11),
+    ('update_charge_price', 'employee', 'post', 302, 11),
+    ('add_customer_vehicle', 'employee', 'get', 200, 4),
+    ('vehicle_history', 'customer', 'get', 200, 6),
+    ('available_slots_api', None, 'get', 200, 2),
+    # payments
+    ('create_bill', 'employee', 'get', 200, 6),
+    ('finalize_payment', 'employee', 'post', 302, 14),
+    ('online_payment', 'customer', 'get', 200, 5),
+    ('confirm_online_payment', 'customer', 'post', 200, 10),
+    ('view_receipt', 'customer', 'get', 200, 5),
+    ('my_payments', 'customer', 'get', 200, 5),
+    ('upload_qr_code', 'employee', 'get', 200, 4),
+]
+
+URLCONFS = (core.urls, accounts.urls, bookings.urls, payments.urls)
+_LITERALS = re.compile(r"'[^']*'|\b\d+\b")
+
+
+class Fixture:
+    """Seed data that can grow: every per-customer/per-booking collection reaches `size` rows."""
+
+    def __init__(self):
+        from accounts.models import Employee, User
+        from core.models import ServiceCenter, ServiceType
+
+        self.center = ServiceCenter.objects.create(
+            name='SMART REPAIR - Budget Center', address='1 Main Road', city='Vijayawada',
+            district='Krishna', pincode='520001', phone='9000000000',
+        )
+        ServiceCenter.objects.create(
+            name='SMART REPAIR - Other Center', address='2 Main Road', city='Guntur',
+            district='Guntur', pincode='522001', phone='9000000009',
+        )
+        for i in range(3):
+            ServiceType.objects.create(
+                name=f'Service {i}', description='Budget service', base_price=Decimal('500'), estimated_duration=2,
+            )
+        self.admin = User.objects.create_superuser('9100000000', first_name='Admin')
+        self.customer = User.objects.create_user('9200000000', first_name='Ravi', last_name='Kumar')
+        employee_user = User.objects.create_user('9300000000', first_name='Suresh', role='employee')
+        self.employee = Employee.objects.create(
+            user=employee_user, employee_id='EMPBUDGET', designation='manager',
+            service_center=self.center, joining_date=datetime.date(2024, 1, 1),
+        )
+        self.users = {'customer': self.customer, 'employee': employee_user, 'admin': self.admin}
+        self.tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+
+    def grow(self, size):
+        from accounts.models import Employee, Notification, User
+        from bookings.models import (
+            Booking, RepairCharge, RepairIssue, ServiceRecord, TimeSlot, Vehicle, WorkAssignment,
+        )
+        from core.models import Holiday, ServiceType
+        from payments.models import Payment
+
+        for i in range(RepairIssue.objects.count(), size):
+            RepairIssue.objects.create(
+                name=f'Issue {i}', category='engine', estimated_cost_min=100, estimated_cost_max=300,
+            )
+        for i in range(Employee.objects.filter(designation='mechanic').count(), size):
+            user = User.objects.create_user(f'94{i:08d}', first_name=f'Worker{i}', role='worker')
+            Employee.objects.create(
+                user=user, employee_id=f'WRK{i:04d}', designation='mechanic',
+                service_center=self.center, joining_date=datetime.date(2024, 1, 1),
+            )
+        for i in range(Vehicle.objects.filter(owner=self.customer).count(), size):
+            Vehicle.objects.create(
+                owner=self.customer, vehicle_number=f'AP16BG{i:04d}', vehicle_type='4w',
+                make='Maruti', model='Swift', year=2020,
+            )
+        for i in range(Notification.objects.filter(user=self.customer).count(), size):
+            Notification.objects.create(user=self.customer, title=f'Note {i}', message='Budget')
+        for i in range(Holiday.objects.count(), size):
+            Holiday.objects.create(name=f'Holiday {i}', date=timezone.localdate().replace(month=1, day=1 + i))
+        for i in range(TimeSlot.objects.filter(date=self.tomorrow).count(), size):
+            TimeSlot.objects.create(
+                service_center=self.center, date=self.tomorrow,
+                start_time=datetime.time(8 + i // 4, (i % 4) * 15), end_time=datetime.time(9 + i // 4, 0),
+            )
+
+        issues = list(RepairIssue.objects.all()[:size])
+        workers = list(Employee.objects.filter(designation='mechanic')[:size])
+        vehicles = list(Vehicle.objects.filter(owner=self.customer))
+        statuses = ['confirmed', 'in_progress', 'completed', 'pending']
+        for i in range(Booking.objects.filter(customer=self.customer).count(), size):
+            Booking.objects.create(
+                customer=self.customer, vehicle=vehicles[i % len(vehicles)], service_center=self.center,
+                status=statuses[i % len(statuses)], booking_date=timezone.localdate(),
+                booking_time=datetime.time(10, 0),
+            )
+        charge_types = ['selected', 'extra', 'parts', 'labour', 'diagnosed', 'service']
+        for booking in Booking.objects.filter(customer=self.customer):
+            booking.selected_issues.set(issues)
+            booking.service_types.set(ServiceType.objects.all())
+            booking.assigned_workers.set(workers)
+            for i in range(booking.repair_charges.count(), size):
+                kind = charge_types[i % len(charge_types)]
+                RepairCharge.objects.create(
+                    booking=booking, repair_issue=issues[i % len(issues)], charge_type=kind,
+                    description=f'Charge {i}', unit_price=Decimal('250'), is_extra=(kind == 'extra'),
+                    added_by=self.employee,
+                )
+            for worker in workers[booking.work_assignments.count():]:
+                WorkAssignment.objects.create(booking=booking, worker=worker, task_description='Budget task')
+            if booking.status == 'completed':
+                ServiceRecord.objects.get_or_create(
+                    booking=booking, defaults={'vehicle': booking.vehicle, 'employee': self.employee, 'work_done': 'Done'},
+                )
+            Payment.objects.get_or_create(
+                booking=booking, defaults={
+                    'customer': self.customer, 'total_amount': Decimal('1000'), 'payment_status': 'paid',
+                    'paid_at': timezone.now(), 'billed_by': self.employee,
+                },
+            )
+
+        booking = Booking.objects.filter(customer=self.customer).order_by('pk').first()
+        # Completed bookings of the first vehicle age past the archive cutoff and move to
+        # ArchivedBooking, so the history and payment views read both tiers
+        aged = timezone.now() - datetime.timedelta(days=archive.ARCHIVE_AFTER_DAYS + 1)
+        closed = list(Booking.objects.filter(customer=self.customer, status='completed').values_list('pk', flat=True))
+        Booking.objects.filter(pk__in=closed).update(
+            vehicle=booking.vehicle, booking_date=aged.date(), updated_at=aged,
+        )
+        archive.archive_batch(closed)
+        self.booking = booking
+        self.charge = booking.repair_charges.order_by('pk').first()
+        self.payment = booking.payment
+
+    def request_for(self, name, method):
+        """(url, data, session) for one case."""
+        b, date = self.booking, self.tomorrow.isoformat()
+        pk_args = {'pk': b.pk}
+        kwargs = {
+            'center_detail': {'pk': self.center.pk},
+            'view_receipt': {'pk': self.payment.pk},
+            'vehicle_history': {'pk': b.vehicle_id},
+            'remove_charge': {'charge_pk': self.charge.pk},
+            'update_charge_price': {'charge_pk': self.charge.pk},
+            'booking_live': {'token': live.token_for(b)},
+        }.get(name)
+        if kwargs is None and name in {
+            'booking_detail', 'cancel_booking', 'employee_booking_detail', 'verify_customer_otp',
+            'assign_workers', 'complete_service', 'add_extra_charge', 'create_bill',
+            'finalize_payment', 'online_payment', 'confirm_online_payment',
+        }:
+            kwargs = pk_args
+        url = reverse(name, kwargs=kwargs)
+
+        bk_session = {'bk_center': str(self.center.pk), 'bk_date': date}
+        data, session = {}, {}
+        if name == 'contact':
+            data = {'name': 'Budget', 'mobile': '9999999999', 'subject': 'Hi', 'message': 'Hello'}
+        elif name == 'track_service':
+            data = {'booking_id': b.booking_id, 'mobile': self.customer.mobile_number}
+        elif name == 'customer_login':
+            data = {'action': 'send_otp', 'mobile_number': '9876543210'}
+        elif name == 'employee_login':
+            data = {'employee_id': self.employee.employee_id, 'mobile_number': self.employee.user.mobile_number}
+        elif name == 'resend_otp':
+            data = {'purpose': 'login', 'mobile': self.customer.mobile_number}
+        elif name == 'book_step2':
+            data = {'service_center': self.center.pk, 'date': date, 'vehicle_type': '4w'}
+        elif name == 'book_step3':
+            data = {'time_slot': b.time_slot_id or '', 'selected_issues': [1, 2], 'services': [1], 'vehicle': b.vehicle_id}
+            session = bk_session
+        elif name == 'confirm_booking':
+            session = {**bk_session, 'bk_issues': ['1', '2'], 'bk_services': ['1'], 'bk_vehicle': str(b.vehicle_id)}
+        elif name == 'add_extra_charge':
+            data = {'description': 'Brake pads', 'quantity': '2', 'unit_price': '450', 'charge_type': 'parts'}
+        elif name == 'update_charge_price':
+            data = {'unit_price': '300'}
+        elif name == 'finalize_payment':
+            data = {'payment_method': 'cash', 'discount': '0'}
+        elif name == 'confirm_online_payment':
+            data = {'upi_reference': 'UTR123456'}
+        elif name == 'employee_bookings_bulk':
+            data = {'bulk_status': 'cancelled', 'bookings': [pk for pk, in self.booking.customer.bookings.values_list('pk')]}
+        elif name == 'employee_changes':
+            data = {'cursor': '0'}  # everything since the feed began, a page at most
+        elif name == 'employee_slots' and method == 'post':
+            data = {'action': 'resize', 'start': date, 'end': date, 'max_bookings': '3'}
+        elif name == 'available_slots_api':
+            data = {'center_id': self.center.pk, 'date': date}
+        return url, data, session
+
+
+class Command(BaseCommand):
+    help = 'Assert a fixed per-view query budget that does not grow with data size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--small', type=int, default=2)
+        parser.add_argument('--large', type=int, default=12)
+        parser.add_argument('--verbose', action='store_true', help='Print the SQL of every case')
+
+    def handle(self, *args, **options):
+        missing = self._uncovered_urls()
+        if missing:
+            raise CommandError(f'No query budget for: {", ".join(sorted(missing))}')
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'query-budgets'}},
+                RATELIMIT_ENABLE=False,
+                DATABASE_SHARDS={},  # one fixture, and the queries counted are 'default's
+            ):
+                catalog._snapshot = None
+                fixture = Fixture()
+                fixture.grow(options['small'])
+                small = self._measure(fixture)
+                fixture.grow(options['large'])
+                large = self._measure(fixture)
+        finally:
+            catalog._snapshot = None
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        failures = self._report(small, large, options)
+        if failures:
+            raise CommandError(f'{failures} views over budget, scaling with data size or answering the wrong status')
+        self.stdout.write(self.style.SUCCESS(f'📏 All {len(CASES)} view budgets hold at sizes {options["small"]} and {options["large"]}'))
+
+    def _uncovered_urls(self):
+        names = {p.name for conf in URLCONFS for p in conf.urlpatterns if p.name}
+        return names - {name for name, *_ in CASES}
+
+    def _measure(self, fixture):
+        results = {}
+        for name, who, method, _, _ in CASES:
+            url, data, session = fixture.request_for(name, method)
+            with transaction.atomic():
+                client = Client()
+                if who:
+                    client.force_login(fixture.users[who])
+                if session:
+                    s = client.session
+                    s.update(session)
+                    s.save()
+                from django.core.cache import cache
+                cache.clear()
+                catalog.get_catalog()
+                with CaptureQueriesContext(connection) as ctx, redirect_stdout(io.StringIO()):
+                    try:
+                        response = getattr(client, method)(url, data)
+                        status = response.status_code
+                    except Exception as exc:
+                        status = f'error: {exc.__class__.__name__}: {exc}'
+                transaction.set_rollback(True)
+            results[(name, method)] = (status, [q['sql'] for q in ctx.captured_queries])
+        return results
+
+    def _report(self, small, large, options):
+        failures = 0
+        self.stdout.write(f'  {"view":<28} {"method":<6} {"small":>5} {"large":>5} {"budget":>6}')
+        for name, who, method, expected, budget in CASES:
+            status, small_sql = small[(name, method)]
+            large_status, large_sql = large[(name, method)]
+            problems = []
+            if isinstance(large_status, str) or isinstance(status, str):
+                problems.append(large_status if isinstance(large_status, str) else status)
+            elif status != expected or large_status != expected:
+                problems.append(f'answered {status} / {large_status}, expected {expected}')
+            if len(large_sql) > len(small_sql):
+                problems.append(f'grows with data ({len(small_sql)} → {len(large_sql)})')
+            if len(large_sql) > budget:
+                problems.append(f'over budget by {len(large_sql) - budget}')
+
+            line = f'  {name:<28} {method:<6} {len(small_sql):>5} {len(large_sql):>5} {budget:>6}'
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'{line}  ✗ {"; ".join(problems)}'))
+                self._print_repeats(large_sql)
+            else:
+                self.stdout.write(line)
+            if options['verbose']:
+                for sql in large_sql:
+                    self.stdout.write(f'        {sql}')
+        return failures
+
+    def _print_repeats(self, queries):
+        shapes = Counter(_LITERALS.sub('?', sql) for sql in queries)
+        for shape, count in shapes.most_common():
+            if count > 1:
+                self.stdout.write(f'      ×{count}  {shape[:300]}')
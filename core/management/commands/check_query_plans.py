@@ -0,0 +1,132 @@
+"""
+SMART REPAIR — Query plan regression check
+Run: python manage.py check_query_plans [--verbose]
+
+Runs EXPLAIN QUERY PLAN on the hot querysets behind the booking, dashboard, OTP,
+notification and payment views, and the admin's searches, and fails (exit code 1) if any of them scans its
+table instead of searching an index, or sorts rows an index should already return in
+order. Run it after migrations or model changes. With DATABASE_SHARDS set, the
+center-scoped querysets are checked in 'default' and in every shard.
+"""
+import datetime
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.admin import UserAdmin
+from accounts.models import Notification, OTPVerification, User
+from bookings.admin import BookingAdmin, RepairChargeAdmin, VehicleAdmin
+from bookings.models import (
+    ArchivedBooking, Booking, BookingEvent, BookingTimeline, RepairCharge, SyncChange, TimeSlot, Vehicle,
+)
+from payments.admin import PaymentAdmin
+from payments.models import Payment
+from smart_repair import shards
+
+
+def hot_querysets(today=None):
+    """(label, queryset) pairs mirroring what the views run. Ids are placeholders."""
+    today = today or timezone.localdate()
+    center, customer, mobile = 1, 1, '9000000000'
+    return [
+        ('employee_bookings (status filter)',
+         Booking.objects.filter(service_center_id=center, status='pending').order_by('-created_at')),
+        ('employee_dashboard recent',
+         Booking.objects.filter(service_center_id=center).order_by('-created_at')[:20]),
+        ('employee_dashboard pending count',
+         Booking.objects.filter(service_center_id=center, status='pending').values('pk')),
+        ('employee_dashboard completed today',
+         Booking.objects.filter(service_center_id=center, status='completed', completed_at__date=today).values('pk')),
+        ('employee_dashboard month to date',
+         Booking.objects.filter(service_center_id=center, created_at__date__gte=today.replace(day=1)).values('pk')),
+        ('my_bookings',
+         Booking.objects.filter(customer_id=customer).order_by('-created_at')),
+        ('book_slot_step2 / get_available_slots',
+         TimeSlot.objects.filter(service_center_id=center, date=today + datetime.timedelta(days=1), is_available=True).order_by('start_time')),
+        ('notification badge',
+         Notification.objects.filter(user_id=customer, is_read=False)[:5]),
+        ('notifications_view',
+         Notification.objects.filter(user_id=customer)),
+        ('OTP verify',
+         OTPVerification.objects.filter(mobile_number=mobile, otp='123456', purpose='login', is_used=False)),
+        ('OTP invalidate previous',
+         OTPVerification.objects.filter(mobile_number=mobile, purpose='login', is_used=False)),
+        ('my_payments',
+         Payment.objects.filter(customer_id=customer).order_by('-created_at')),
+        ('track_service',
+         Booking.objects.filter(Q(booking_id='SR00000000')).select_related('customer')),
+        ('vehicle_history (archived)',
+         ArchivedBooking.objects.filter(vehicle_id=1)),
+        ('my_payments (archived)',
+         ArchivedBooking.objects.filter(customer_id=customer, payment_id__isnull=False)),
+        ('view_receipt (archived)',
+         ArchivedBooking.objects.filter(payment_id=1)),
+        ('booking event history',
+         BookingEvent.objects.filter(booking_id=1).order_by('at')),
+        ('report_turnaround',
+         BookingTimeline.objects.filter(completed_at__gte=timezone.now() - datetime.timedelta(days=30)).values('service_center_id')),
+        ('employee_changes',
+         SyncChange.objects.filter(service_center_id=1, pk__gt=0).order_by('pk')),
+    ] + admin_searches()
+
+
+def admin_searches():
+    """What the large-table changelists filter on for a search (and count); the page itself is ordered by pk."""
+    searches = [
+        (BookingAdmin(Booking, admin.site), 'SR0000'),
+        (RepairChargeAdmin(RepairCharge, admin.site), 'SR0000'),
+        (PaymentAdmin(Payment, admin.site), 'RCP0'),
+        (VehicleAdmin(Vehicle, admin.site), 'AP09'),
+        (UserAdmin(User, admin.site), '9000'),
+    ]
+    return [
+        (f'admin search {model_admin.model._meta.model_name} ({", ".join(model_admin.search_fields)})',
+         model_admin.get_search_results(None, model_admin.model.objects.order_by(), term)[0].values('pk'))
+        for model_admin, term in searches
+    ]
+
+
+def plan_regressions(queryset):
+    """Plan lines that scan the queryset's own table, or sort rows an index should deliver in order."""
+    table = queryset.model._meta.db_table
+    plan = queryset.explain()
+    bad = [
+        line for line in plan.splitlines()
+        if (f'SCAN {table}' in line and 'USING INDEX' not in line and 'COVERING INDEX' not in line)
+        or 'USE TEMP B-TREE FOR ORDER BY' in line
+    ]
+    return plan, bad
+
+
+class Command(BaseCommand):
+    help = 'Fail if any hot-path queryset regresses to a full table scan or an extra sort'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose', action='store_true', help='Print every plan')
+
+    def handle(self, *args, **options):
+        failures = []
+        for label, queryset in self._per_database(hot_querysets()):
+            plan, bad = plan_regressions(queryset)
+            if bad:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'  ✗ {label}'))
+            else:
+                self.stdout.write(f'  ✓ {label}')
+            if bad or options['verbose']:
+                for line in plan.splitlines():
+                    self.stdout.write(f'      {line}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot queries regressed: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('🔎 All hot queries use an index'))
+
+    def _per_database(self, querysets):
+        for label, queryset in querysets:
+            if not (shards.enabled() and shards.is_sharded(queryset.model)):
+                yield label, queryset
+                continue
+            for alias in shards.each():
+                yield f'{label} [{alias}]', queryset.using(alias)
@@ -0,0 +1,78 @@
+"""
+SMART REPAIR — Admin smoke check with DATABASE_SHARDS set
+Run: DATABASE_SHARDS=AP=/data/ap.sqlite3,TS=/data/ts.sqlite3 python manage.py check_sharded_admin
+
+Requests, as a superuser, every sharded model's changelist with each database picked
+in its shard filter (plain, searched, and with no filter at all), one change page per
+database and the autocomplete of every sharded foreign key. Fails (exit code 1) on any
+response but 200. Reads the configured databases, signed in as their first superuser,
+and writes nothing.
+"""
+import io
+from contextlib import redirect_stdout
+
+from django.contrib import admin
+from django.contrib.auth.models import update_last_login
+from django.contrib.auth.signals import user_logged_in
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from smart_repair import shards
+
+
+class Command(BaseCommand):
+    help = 'Request the sharded admin changelists, change pages and autocompletes on every shard'
+
+    def handle(self, *args, **options):
+        if not shards.enabled():
+            raise CommandError('Set DATABASE_SHARDS: without shards there is nothing to check.')
+        superuser = User.objects.filter(is_superuser=True, is_active=True).order_by('pk').first()
+        if superuser is None:
+            raise CommandError('No superuser to sign in as — run seed_data first.')
+        self.failures = []
+        # Only GETs, a cookie session and no last_login stamp: nothing is written
+        with override_settings(ALLOWED_HOSTS=['*'], SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies'):
+            client = Client(raise_request_exception=False)
+            user_logged_in.disconnect(update_last_login, dispatch_uid='update_last_login')
+            try:
+                client.force_login(superuser)
+            finally:
+                user_logged_in.connect(update_last_login, dispatch_uid='update_last_login')
+            with redirect_stdout(io.StringIO()):
+                for model, model_admin in admin.site._registry.items():
+                    if shards.is_sharded(model):
+                        self._check_model(client, model, model_admin)
+
+        if self.failures:
+            raise CommandError(f'{len(self.failures)} admin pages failed with shards on')
+        self.stdout.write(self.style.SUCCESS('🗂️  Every sharded admin page answers on every shard'))
+
+    def _check_model(self, client, model, model_admin):
+        opts = model._meta
+        changelist = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        self._get(client, changelist)
+        for alias in shards.each():
+            query = f'?{shards.ADMIN_PARAM}={alias}'
+            self._get(client, changelist + query)
+            if model_admin.search_fields:
+                self._get(client, f'{changelist}{query}&q=1')
+            with shards.use_shard(alias):
+                pk = model._default_manager.order_by('pk').values_list('pk', flat=True).first()
+            if pk is not None:
+                self._get(client, reverse(f'admin:{opts.app_label}_{opts.model_name}_change', args=[pk]))
+        for field_name in model_admin.autocomplete_fields:
+            field = opts.get_field(field_name)
+            if shards.is_sharded(field.related_model):
+                self._get(client, reverse('admin:autocomplete') + (
+                    f'?app_label={opts.app_label}&model_name={opts.model_name}&field_name={field_name}&term=1'
+                ), HTTP_REFERER=f'http://testserver{changelist}?{shards.ADMIN_PARAM}={shards.each()[-1]}')
+
+    def _get(self, client, url, **extra):
+        status = client.get(url, **extra).status_code
+        if status == 200:
+            self.stdout.write(f'  ✓ {url}')
+        else:
+            self.failures.append(url)
+            self.stdout.write(self.style.ERROR(f'  ✗ {url} → {status}'))
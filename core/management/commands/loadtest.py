@@ -0,0 +1,228 @@
+"""
+SMART REPAIR — Load test for the booking and billing flows
+Run the server with the stub SMS backend and the OTP limiter off, e.g.
+    RATELIMIT_ENABLE=0 SMS_BACKEND=accounts.sms.DummyBackend python manage.py runserver --noreload
+then, against the same database:
+    python manage.py loadtest --customers 20 --employees 5 --iterations 3
+
+Customers log in by OTP (read back from the database), run the three-step booking
+wizard, confirm and poll track_service. Employees pick up the new bookings, add and
+re-price a charge, open the bill and finalize the payment. Reports throughput,
+p50/p95/p99 latency and error rate for every step.
+"""
+import datetime
+import queue
+import random
+import threading
+import time
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import Employee, OTPVerification
+from bookings.models import Booking, RepairCharge, TimeSlot
+from core.catalog import get_catalog
+from core.management.stats import percentile
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Browser:
+    """One virtual user: a cookie jar, CSRF handling and no automatic redirects."""
+
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.jar = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.jar), _NoRedirect)
+        self.stats = stats
+        self.timeout = timeout
+
+    def csrf_token(self):
+        return next((c.value for c in self.jar if c.name == 'csrftoken'), '')
+
+    def call(self, step, path, data=None, expect=(200,), contains=None):
+        """Request `path` (POST when `data` is given) and record the step. Returns (status, body, location)."""
+        url = self.base_url + path
+        body = None
+        headers = {'Referer': url}
+        if data is not None:
+            token = self.csrf_token()
+            body = urlencode({**data, 'csrfmiddlewaretoken': token}, doseq=True).encode()
+            headers['X-CSRFToken'] = token
+        start = time.perf_counter()
+        try:
+            response = self.opener.open(Request(url, data=body, headers=headers), timeout=self.timeout)
+            status, content, location = response.status, response.read(), response.headers.get('Location', '')
+        except HTTPError as exc:  # 3xx (redirects are not followed) and 4xx/5xx
+            status, content, location = exc.code, exc.read(), exc.headers.get('Location', '')
+        except (URLError, OSError):
+            status, content, location = 0, b'', ''
+        elapsed = time.perf_counter() - start
+        ok = status in expect and (contains is None or contains.encode() in content)
+        self.stats.record(step, elapsed, ok)
+        return status, content, location
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps = {}
+
+    def record(self, step, elapsed, ok):
+        with self._lock:
+            latencies, errors = self.steps.setdefault(step, ([], [0]))
+            latencies.append(elapsed)
+            if not ok:
+                errors[0] += 1
+
+
+class Command(BaseCommand):
+    help = 'Replay customer booking and employee billing journeys against a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--customers', type=int, default=10, help='Concurrent customer journeys')
+        parser.add_argument('--employees', type=int, default=3, help='Concurrent employee journeys')
+        parser.add_argument('--iterations', type=int, default=2, help='Bookings per customer')
+        parser.add_argument('--track-polls', type=int, default=3, help='track_service polls per booking')
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--show-otps', action='store_true', help='Print every OTP read from the database')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.run_id = self.rng.randrange(1000)
+        self.stats = Stats()
+        self.work = queue.Queue()
+        self.customers_done = threading.Event()
+        self.print_lock = threading.Lock()
+
+        catalog = get_catalog()
+        self.centers = [c.pk for c in catalog.centers]
+        self.issues = [i.pk for i in catalog.issues_by_vehicle_type['4w']]
+        self.services = [s.pk for s in catalog.services_by_vehicle_type['4w']]
+        self.employees = list(
+            Employee.objects.filter(is_active=True, service_center__isnull=False)
+            .select_related('user').values_list('employee_id', 'user__mobile_number')
+        )
+        if not self.centers:
+            raise CommandError('No active service centers — run seed_data first.')
+        if options['employees'] and not self.employees:
+            raise CommandError('No active employees with a service center — run seed_data first.')
+        status, _, _ = Browser(options['base_url'], Stats(), 5).call('ping', '/')
+        if status != 200:
+            raise CommandError(f'No server answering at {options["base_url"]} (status {status}).')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🏁 {options["customers"]} customers × {options["iterations"]} bookings, '
+            f'{options["employees"]} employees → {options["base_url"]}'
+        ))
+        start = time.perf_counter()
+        customers = [threading.Thread(target=self._customer, args=(i,)) for i in range(options['customers'])]
+        employees = [threading.Thread(target=self._employee, args=(i,)) for i in range(options['employees'])]
+        for t in customers + employees:
+            t.start()
+        for t in customers:
+            t.join()
+        self.customers_done.set()
+        for t in employees:
+            t.join()
+        self._report(time.perf_counter() - start)
+
+    # ── Customer journey ─────────────────────────────────────────────
+    def _customer(self, index):
+        rng = random.Random(f'{self.run_id}-{index}')
+        mobile = f'7{self.run_id:03d}{index:06d}'
+        browser = Browser(self.options['base_url'], self.stats, self.options['timeout'])
+
+        browser.call('login_page', '/accounts/login/')
+        browser.call('send_otp', '/accounts/login/', {'action': 'send_otp', 'mobile_number': mobile})
+        otp = self._latest_otp(mobile, 'login')
+        status, _, location = browser.call('verify_otp', '/accounts/login/', {'action': 'verify_otp', 'otp': otp}, expect=(302,))
+        if status != 302:
+            return
+        if 'complete-profile' in location:
+            browser.call('complete_profile', '/accounts/complete-profile/', {
+                'first_name': 'Load', 'last_name': f'Tester {index}', 'city': 'Vijayawada',
+            }, expect=(302,))
+
+        for iteration in range(self.options['iterations']):
+            center = rng.choice(self.centers)
+            day = timezone.localdate() + datetime.timedelta(days=rng.randint(1, 7))
+            slot = TimeSlot.objects.filter(service_center_id=center, date=day, is_available=True).values_list('pk', flat=True).first()
+
+            browser.call('book_step1', '/bookings/book/step1/')
+            browser.call('book_step2', '/bookings/book/step2/', {
+                'service_center': center, 'date': day.isoformat(), 'booking_type': 'online', 'vehicle_type': '4w',
+            })
+            browser.call('book_step3', '/bookings/book/step3/', {
+                'time_slot': slot or '', 'selected_issues': rng.sample(self.issues, min(2, len(self.issues))),
+                'services': rng.sample(self.services, min(1, len(self.services))),
+                'new_vehicle': f'LT{self.run_id:03d}{index:04d}{iteration:02d}', 'problem_description': 'Load test',
+            })
+            status, _, location = browser.call('confirm_booking', '/bookings/book/confirm/', {}, expect=(302,))
+            if status != 302 or '/bookings/booking/' not in location:
+                continue
+            pk = int(location.rstrip('/').rsplit('/', 1)[-1])
+            booking_id = Booking.objects.filter(pk=pk).values_list('booking_id', flat=True).first()
+            self.work.put(pk)
+
+            for _ in range(self.options['track_polls']):
+                browser.call('track_service', '/track-service/', {'booking_id': booking_id, 'mobile': mobile}, contains=booking_id)
+                time.sleep(rng.uniform(0.05, 0.2))
+
+    # ── Employee journey ─────────────────────────────────────────────
+    def _employee(self, index):
+        employee_id, mobile = self.employees[index % len(self.employees)]
+        browser = Browser(self.options['base_url'], self.stats, self.options['timeout'])
+        browser.call('employee_login_page', '/accounts/employee-login/')
+        status, _, _ = browser.call('employee_login', '/accounts/employee-login/', {
+            'employee_id': employee_id, 'mobile_number': mobile,
+        }, expect=(302,))
+        if status != 302:
+            return
+
+        while True:
+            try:
+                pk = self.work.get(timeout=0.5)
+            except queue.Empty:
+                if self.customers_done.is_set():
+                    return
+                continue
+            browser.call('employee_booking_detail', f'/bookings/employee/booking/{pk}/')
+            browser.call('add_extra_charge', f'/bookings/employee/booking/{pk}/add-charge/', {
+                'description': 'Brake pads', 'quantity': '2', 'unit_price': '450', 'charge_type': 'parts',
+            }, expect=(302,))
+            charge = RepairCharge.objects.filter(booking_id=pk).order_by('-pk').values_list('pk', flat=True).first()
+            if charge:
+                browser.call('update_charge_price', f'/bookings/employee/charge/{charge}/update-price/', {'unit_price': '475'}, expect=(302,))
+            browser.call('create_bill', f'/payments/bill/{pk}/')
+            browser.call('finalize_payment', f'/payments/bill/{pk}/finalize/', {'payment_method': 'cash', 'discount': '0'}, expect=(302,))
+
+    def _latest_otp(self, mobile, purpose):
+        otp = (OTPVerification.objects.filter(mobile_number=mobile, purpose=purpose, is_used=False)
+               .order_by('-created_at').values_list('otp', flat=True).first()) or ''
+        if self.options['show_otps']:
+            with self.print_lock:
+                self.stdout.write(f'  OTP {mobile}: {otp or "(none)"}')
+        return otp
+
+    def _report(self, elapsed):
+        total = sum(len(latencies) for latencies, _ in self.stats.steps.values())
+        self.stdout.write(f'\n  {total} requests in {elapsed:.1f}s → {total / elapsed:.1f} req/s\n')
+        self.stdout.write(f'  {"step":<24} {"count":>6} {"req/s":>7} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>8}')
+        for step, (latencies, errors) in self.stats.steps.items():
+            line = (
+                f'  {step:<24} {len(latencies):>6} {len(latencies) / elapsed:>7.1f} '
+                f'{percentile(latencies, 50) * 1000:>8.1f} {percentile(latencies, 95) * 1000:>8.1f} '
+                f'{percentile(latencies, 99) * 1000:>8.1f} {errors[0] / len(latencies):>7.1%}'
+            )
+            self.stdout.write(self.style.ERROR(line) if errors[0] else line)
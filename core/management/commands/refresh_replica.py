@@ -0,0 +1,47 @@
+"""
+SMART REPAIR — Refresh the local SQLite read replica
+Run: python manage.py refresh_replica            (once)
+     python manage.py refresh_replica --every 30 (keep it within ~30s of the primary)
+
+Copies the primary into DATABASES['replica'] with SQLite's online backup API, a few
+hundred pages at a time so booking writes are never blocked for long.
+"""
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from smart_repair.routers import PRIMARY_ALIAS, REPLICA_ALIAS, replica_configured
+
+
+class Command(BaseCommand):
+    help = 'Copy the primary SQLite database into the read replica using the backup API'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, default=0, help='Repeat every N seconds')
+        parser.add_argument('--pages', type=int, default=256, help='Pages copied per step')
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('No replica configured — set DATABASE_REPLICA_NAME.')
+        target = connections[REPLICA_ALIAS].settings_dict['NAME']
+        while True:
+            self._refresh(target, options['pages'])
+            if not options['every']:
+                break
+            time.sleep(options['every'])
+
+    def _refresh(self, target, pages):
+        primary = connections[PRIMARY_ALIAS]
+        primary.ensure_connection()
+        start = time.perf_counter()
+        replica = sqlite3.connect(target, timeout=20)
+        try:
+            primary.connection.backup(replica, pages=pages, sleep=0.005)
+        finally:
+            replica.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'🔁 Replica refreshed → {target} in {(time.perf_counter() - start) * 1000:.0f} ms'
+        ))
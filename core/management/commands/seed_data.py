@@ -1,13 +1,31 @@
 """
-SMART REPAIR — Complete Seed: 99 AP centers, repair issues, service types, workers, holidays
+SMART REPAIR — Complete Seed: 99 AP + 4 Telangana centers, repair issues, service types, workers, holidays
 Run: python manage.py seed_data
 """
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
 from datetime import date, time, timedelta
 
+from core.catalog import bump_catalog_version
+from smart_repair import shards
+
+
+def _create_missing(model, key, objs):
+    """bulk_create the objs whose `key` fields match no existing row; returns how many were added."""
+    existing = set(model.objects.values_list(*key))
+    new = []
+    for obj in objs:
+        k = tuple(getattr(obj, f) for f in key)
+        if k not in existing:
+            existing.add(k)
+            new.append(obj)
+    model.objects.bulk_create(new, batch_size=500)
+    return len(new)
+
 
 class Command(BaseCommand):
     help = 'Seed all SMART REPAIR data for Andhra Pradesh'
+    requires_system_checks = []  # data only: no need to import every view for the URL checks
 
     def handle(self, *args, **kwargs):
         self.stdout.write(self.style.SUCCESS('🚀 Seeding SMART REPAIR...'))
@@ -18,10 +36,12 @@ class Command(BaseCommand):
         self.create_admin()
         self.create_employees_and_workers()
         self.create_time_slots()
+        # bulk_create sends no post_save, so move the catalog on once ourselves
+        bump_catalog_version()
         self.stdout.write(self.style.SUCCESS('✅ All done!'))
 
     # ─────────────────────────────────────────────────────────────────────────
-    # SERVICE CENTERS — 99 across AP
+    # SERVICE CENTERS — 99 across AP, 4 in Telangana
     # ─────────────────────────────────────────────────────────────────────────
     def create_service_centers(self):
         from core.models import ServiceCenter
@@ -150,15 +170,20 @@ class Command(BaseCommand):
             {'name':'SMART REPAIR - Peddapuram','address':'23 Rajahmundry Road Peddapuram','city':'Peddapuram','district':'Kakinada','pincode':'533437','phone':'8885570010','email':'peddapuram@smartrepair.in','latitude':17.0775,'longitude':82.1380,'working_hours':'8:00 AM - 6:00 PM','manager_name':'Rama Murthy','total_bays':6,'established_year':2021},
             {'name':'SMART REPAIR - Samalkota','address':'5 NH-16 Samalkota','city':'Samalkota','district':'Kakinada','pincode':'533440','phone':'8885570011','email':'samalkota@smartrepair.in','latitude':17.0566,'longitude':82.1751,'working_hours':'8:00 AM - 6:00 PM','manager_name':'Trinadha Rao','total_bays':6,'established_year':2021},
         ]
-        count = 0
-        for c in centers:
-            defaults = {k: v for k, v in c.items() if k != 'name'}
-            defaults.update({'state': 'AP', 'working_days': 'Monday to Saturday', 'is_active': True})
-            _, created = ServiceCenter.objects.get_or_create(name=c['name'], defaults=defaults)
-            if created:
-                count += 1
+        telangana = [
+            # HYDERABAD / WARANGAL (4)
+            {'name':'SMART REPAIR - Hyderabad Kukatpally','address':'18 KPHB Main Road Kukatpally','city':'Hyderabad','district':'Medchal-Malkajgiri','pincode':'500072','phone':'8885710010','email':'hyd.kukatpally@smartrepair.in','latitude':17.4933,'longitude':78.3996,'working_hours':'8:00 AM - 8:00 PM','manager_name':'Praveen Goud','total_bays':18,'established_year':2019},
+            {'name':'SMART REPAIR - Hyderabad LB Nagar','address':'7 Sagar Ring Road LB Nagar','city':'Hyderabad','district':'Rangareddy','pincode':'500074','phone':'8885710011','email':'hyd.lbnagar@smartrepair.in','latitude':17.3457,'longitude':78.5522,'working_hours':'8:00 AM - 8:00 PM','manager_name':'Srikanth Yadav','total_bays':14,'established_year':2020},
+            {'name':'SMART REPAIR - Secunderabad','address':'55 SP Road Secunderabad','city':'Secunderabad','district':'Hyderabad','pincode':'500003','phone':'8885710012','email':'secunderabad@smartrepair.in','latitude':17.4399,'longitude':78.4983,'working_hours':'8:00 AM - 7:00 PM','manager_name':'Mahender Reddy','total_bays':12,'established_year':2021},
+            {'name':'SMART REPAIR - Warangal Hanamkonda','address':'3 Nakkalagutta Hanamkonda','city':'Warangal','district':'Hanamkonda','pincode':'506001','phone':'8885720010','email':'warangal@smartrepair.in','latitude':18.0072,'longitude':79.5584,'working_hours':'8:00 AM - 6:00 PM','manager_name':'Ravinder Rao','total_bays':10,'established_year':2022},
+        ]
+        count = _create_missing(ServiceCenter, ('name',), [
+            ServiceCenter(**c, state=state, working_days='Monday to Saturday', is_active=True)
+            for state, group in (('AP', centers), ('TS', telangana))
+            for c in group
+        ])
         total = ServiceCenter.objects.filter(is_active=True).count()
-        self.stdout.write(self.style.SUCCESS(f'  ✅ {count} new centers added | {total} total across AP'))
+        self.stdout.write(self.style.SUCCESS(f'  ✅ {count} new centers added | {total} total across AP and Telangana'))
 
     # ─────────────────────────────────────────────────────────────────────────
     # REPAIR ISSUES — all vehicle types, all categories
@@ -166,93 +191,69 @@ class Command(BaseCommand):
     def create_repair_issues(self):
         from bookings.models import RepairIssue
         issues = [
-            # ── TWO WHEELER ────────────────────────────────────────────
-            ('Engine Not Starting', 'engine', '2w', 300, 800, 'Bike/scooter engine fails to crank or start'),
-            ('Engine Overheating', 'engine', '2w', 400, 1200, 'Engine temperature rises abnormally'),
-            ('Low Pickup / Misfiring', 'engine', '2w', 250, 700, 'Loss of acceleration, engine misfire'),
-            ('Oil Leakage', 'engine', '2w', 300, 900, 'Engine oil leaking from gasket or seals'),
-            ('Chain Problem / Noise', 'engine', '2w', 150, 500, 'Chain loose, worn, or making noise'),
-            ('Brake Not Working Properly', 'brakes', '2w', 200, 600, 'Brakes feel soft, squealing, or weak'),
-            ('Brake Pads Worn Out', 'brakes', '2w', 150, 400, 'Brake pads need replacement'),
-            ('Front Fork Leaking', 'brakes', '2w', 500, 1500, 'Front suspension fork oil seal leak'),
-            ('Tyre Puncture', 'tyres', '2w', 100, 250, 'Flat tyre, nail, or tube damage'),
-            ('Tyre Worn / Bald', 'tyres', '2w', 500, 2000, 'Tyre tread worn out, needs replacement'),
-            ('Battery Dead / Weak', 'electrical', '2w', 200, 800, 'Battery drains fast or does not charge'),
-            ('Headlight Not Working', 'electrical', '2w', 150, 500, 'Headlight bulb, wire or relay fault'),
-            ('Self Start Not Working', 'electrical', '2w', 300, 800, 'Electric starter motor not working'),
-            ('Indicator / Horn Fault', 'electrical', '2w', 100, 400, 'Turn signals or horn not functioning'),
-            ('Fuel Leakage / Carb Issue', 'fuel', '2w', 200, 700, 'Carburetor or fuel line leaking'),
-            ('Poor Mileage', 'fuel', '2w', 200, 600, 'Fuel efficiency has reduced significantly'),
-            ('Clutch Slipping / Hard', 'transmission', '2w', 200, 700, 'Clutch plates worn or clutch cable issue'),
-            ('Gear Shifting Problem', 'transmission', '2w', 250, 800, 'Gears not shifting smoothly'),
-            ('Periodic Service (2W)', 'service', '2w', 499, 999, 'Full scheduled service: oil, filter, check-up'),
-
-            # ── THREE WHEELER ──────────────────────────────────────────
-            ('Auto Engine Overheating', 'engine', '3w', 500, 1500, 'Auto engine overheats on long runs'),
-            ('CNG Kit Problem', 'fuel', '3w', 300, 1000, 'CNG kit not switching or leaking'),
-            ('Auto Brake Failure', 'brakes', '3w', 400, 1200, 'Brakes weak or not responding'),
-            ('Auto Electrical Fault', 'electrical', '3w', 300, 900, 'Electrical wiring, lights or horn issue'),
-            ('Auto Tyre Wear / Puncture', 'tyres', '3w', 200, 700, 'Tyre puncture or worn out'),
-            ('Auto Transmission Problem', 'transmission', '3w', 500, 2000, 'Gearbox or clutch issue in auto'),
-            ('Auto Periodic Service', 'service', '3w', 799, 1299, 'Full auto rickshaw service'),
-
-            # ── FOUR WHEELER ───────────────────────────────────────────
-            ('Car Engine Not Starting', 'engine', '4w', 500, 2000, 'Car does not start, starter or battery issue'),
-            ('Engine Knocking Sound', 'engine', '4w', 1000, 5000, 'Metallic knocking from engine internals'),
-            ('Engine Overheating', 'engine', '4w', 800, 3000, 'Coolant leak or radiator issue'),
-            ('Car Vibration / Shaking', 'engine', '4w', 500, 2500, 'Car shakes while driving or idling'),
-            ('Oil Leakage (Car)', 'engine', '4w', 500, 2000, 'Engine oil leaking from gasket or sump'),
-            ('Check Engine Light On', 'engine', '4w', 500, 3000, 'MIL / CEL on dashboard illuminated'),
-            ('Brake Failure / Spongy', 'brakes', '4w', 800, 3000, 'Brakes feel spongy, weak, or pulling'),
-            ('Brake Pads / Disc Worn', 'brakes', '4w', 600, 2500, 'Brake pads or rotors need replacement'),
-            ('Car Pulling to One Side', 'brakes', '4w', 500, 1500, 'Steering pulls left/right while braking'),
-            ('Shock Absorber Leaking', 'brakes', '4w', 1500, 5000, 'Suspension oil leaked, bouncy ride'),
-            ('Steering Heavy / Play', 'brakes', '4w', 800, 3000, 'Power steering hard or loose steering'),
-            ('Car Tyre Puncture', 'tyres', '4w', 200, 500, 'Flat tyre needs repair or replacement'),
-            ('Tyre Uneven Wear', 'tyres', '4w', 300, 800, 'Tyres wearing unevenly, alignment needed'),
-            ('AC Not Cooling', 'ac', '4w', 500, 2500, 'AC blowing warm air, gas leak or compressor'),
-            ('AC Gas Leakage', 'ac', '4w', 800, 2000, 'Refrigerant gas leak from AC system'),
-            ('Compressor Not Working', 'ac', '4w', 2000, 8000, 'AC compressor clutch or motor failure'),
-            ('Battery Draining Fast', 'electrical', '4w', 500, 2000, 'Car battery drains overnight or quickly'),
-            ('Car Not Charging Battery', 'electrical', '4w', 800, 2500, 'Alternator or charging circuit fault'),
-            ('Lights Not Working', 'electrical', '4w', 300, 1000, 'Headlights, taillights or interior lights'),
-            ('Car Central Locking Fault', 'electrical', '4w', 500, 1500, 'Central lock not working or key fob issue'),
-            ('Gear Shifting Hard', 'transmission', '4w', 1000, 4000, 'Manual gearbox stiff or not engaging'),
-            ('Automatic Transmission Jerk', 'transmission', '4w', 2000, 8000, 'AT slipping, jerking or delayed shifts'),
-            ('Clutch Plate Worn', 'transmission', '4w', 3000, 8000, 'Clutch slipping or juddering on take-off'),
-            ('Denting / Scratches', 'body', '4w', 500, 5000, 'Panel dents, deep scratches or rust'),
-            ('Windshield Crack / Chip', 'body', '4w', 500, 5000, 'Windscreen damaged or chipped'),
-            ('Car Full Painting', 'body', '4w', 8000, 25000, 'Full vehicle respray or partial paint job'),
-            ('Fuel Pump Issue', 'fuel', '4w', 1500, 5000, 'Fuel pump weak or not pressurising'),
-            ('Diesel Injector Problem', 'fuel', '4w', 2000, 8000, 'Injector clogged, noisy or misfiring'),
-            ('Car Full Service', 'service', '4w', 1299, 2999, 'Complete scheduled service with all checks'),
-
-            # ── HEAVY VEHICLE ──────────────────────────────────────────
-            ('Truck Engine Failure', 'engine', 'heavy', 5000, 25000, 'Major engine fault in truck or bus'),
-            ('Truck Overheating', 'engine', 'heavy', 2000, 8000, 'Cooling system or head gasket issue'),
-            ('Truck Brake Failure', 'brakes', 'heavy', 3000, 12000, 'Air brake or hydraulic brake fault'),
-            ('Heavy Vehicle Tyre Issue', 'tyres', 'heavy', 1500, 8000, 'Commercial tyre puncture or replacement'),
-            ('Truck Electrical Fault', 'electrical', 'heavy', 1500, 6000, 'Wiring, alternator, battery issue'),
-            ('Gearbox Failure', 'transmission', 'heavy', 8000, 40000, 'Truck gearbox grinding or not engaging'),
-            ('Truck Suspension Failure', 'brakes', 'heavy', 5000, 20000, 'Leaf spring, shock absorber broken'),
-            ('Bus AC Not Cooling', 'ac', 'heavy', 3000, 12000, 'Bus AC system underperforming'),
-            ('Heavy Vehicle Full Service', 'service', 'heavy', 4999, 9999, 'Complete truck/bus maintenance service'),
+            # ENGINE
+            ('Engine not starting', 'engine', '2w', 300, 2000, 'Bike/scooter not cranking or turning over'),
+            ('Engine overheating', 'engine', '2w', 500, 3000, 'Engine temperature rising abnormally'),
+            ('Engine oil leaking', 'engine', '2w', 200, 1500, 'Oil dripping from engine'),
+            ('Unusual engine noise / knocking', 'engine', '2w', 500, 4000, 'Tapping, knocking or rattling sounds'),
+            ('Engine not starting', 'engine', '4w', 500, 3000, 'Car cranks but won\'t start or no crank'),
+            ('Engine overheating / coolant issue', 'engine', '4w', 800, 5000, 'Temperature warning, steam, coolant loss'),
+            ('Engine oil leaking', 'engine', '4w', 300, 3000, 'Oil spots under car, burning smell'),
+            ('Engine knocking / rough idle', 'engine', '4w', 1000, 8000, 'Irregular idle, misfires, power loss'),
+            ('Check engine light on', 'engine', 'all', 500, 2000, 'OBD warning light illuminated'),
+            # BRAKES
+            ('Brakes not working / hard pedal', 'brakes', '4w', 500, 3000, 'Pedal goes to floor or very stiff'),
+            ('Brake noise / squealing', 'brakes', 'all', 300, 2500, 'Squealing, grinding when braking'),
+            ('Car pulling to one side when braking', 'brakes', '4w', 500, 2000, 'Vehicle drifts left or right during braking'),
+            ('Handbrake not holding', 'brakes', 'all', 300, 1500, 'Parking brake loose or ineffective'),
+            ('Brake pads worn', 'brakes', '4w', 800, 3000, 'Pad wear indicator noise'),
+            ('Brake vibration / judder', 'brakes', '4w', 500, 3000, 'Steering wheel shaking when braking'),
+            # TYRES
+            ('Flat tyre / puncture', 'tyres', 'all', 100, 500, 'Flat or losing air rapidly'),
+            ('Tyre bulge or cracking', 'tyres', 'all', 500, 3000, 'Visible bulge or sidewall cracks'),
+            ('Abnormal tyre wear', 'tyres', 'all', 300, 2000, 'Uneven wear pattern'),
+            ('Wheel alignment off', 'tyres', '4w', 400, 800, 'Car drifts when driving straight'),
+            ('Wheel balancing needed', 'tyres', 'all', 200, 500, 'Vibration in steering at high speed'),
+            # ELECTRICAL
+            ('Battery dead / not charging', 'electrical', 'all', 300, 5000, 'Car won\'t start, battery warning'),
+            ('Headlights not working', 'electrical', 'all', 200, 2000, 'One or both headlights out'),
+            ('Electrical short / fuse blown', 'electrical', 'all', 200, 2000, 'Repeated fuse failures, dead circuits'),
+            ('Starter motor issue', 'electrical', 'all', 500, 4000, 'Clicking sound when starting'),
+            ('Alternator issue', 'electrical', '4w', 1000, 6000, 'Battery not charging, warning light'),
+            # AC
+            ('AC not cooling', 'ac', '4w', 500, 4000, 'Air not cold enough or warm air'),
+            ('AC gas leaking / refill needed', 'ac', '4w', 800, 2500, 'Refrigerant low, AC blows warm'),
+            ('AC compressor noise', 'ac', '4w', 1000, 8000, 'Rattling or clunking from AC compressor'),
+            ('AC not working at all', 'ac', '4w', 500, 5000, 'Blower works but no cooling'),
+            # BODY
+            ('Body denting repair', 'body', 'all', 500, 10000, 'Door dings, dents from minor accidents'),
+            ('Paint scratches / chips', 'body', 'all', 300, 5000, 'Surface scratches, paint peeling'),
+            ('Rust spots / corrosion', 'body', 'all', 500, 8000, 'Rust on body panels'),
+            ('Windshield crack / chip', 'body', '4w', 500, 5000, 'Cracked or chipped windshield'),
+            # TRANSMISSION
+            ('Gear shifting difficult', 'transmission', 'all', 300, 5000, 'Hard to shift gears or slips out'),
+            ('Clutch slipping / heavy', 'transmission', 'all', 800, 6000, 'Clutch not engaging fully, high clutch point'),
+            ('Transmission fluid leak', 'transmission', '4w', 500, 3000, 'Red fluid dripping, burning smell'),
+            ('Gear box noise', 'transmission', 'all', 500, 8000, 'Grinding or whining in gear'),
+            # FUEL
+            ('Poor fuel economy', 'fuel', 'all', 300, 2000, 'Noticeably more fuel consumption'),
+            ('Fuel leaking / smell', 'fuel', 'all', 500, 3000, 'Strong petrol/diesel smell, visible leak'),
+            ('Engine sputtering on acceleration', 'fuel', 'all', 300, 3000, 'Hesitation, stumbling when accelerating'),
+            # SERVICE
+            ('Periodic service due', 'service', 'all', 499, 2999, 'Routine oil change and service by KM'),
+            ('Full vehicle check-up', 'service', 'all', 499, 1999, 'Complete 50-point vehicle inspection'),
+            ('Pre-trip inspection', 'service', 'all', 299, 599, 'Safety check before long trip'),
+            # HEAVY VEHICLE
+            ('Air brake failure', 'brakes', 'heavy', 2000, 10000, 'Truck/bus air brake not working'),
+            ('Engine overhaul needed', 'engine', 'heavy', 15000, 50000, 'Major engine reconditioning'),
+            ('Leaf spring broken', 'brakes', 'heavy', 2000, 8000, 'Suspension leaf spring damaged'),
         ]
-
-        count = 0
-        for i, (name, cat, vtype, min_cost, max_cost, desc) in enumerate(issues):
-            _, created = RepairIssue.objects.get_or_create(
-                name=name, vehicle_type=vtype,
-                defaults={
-                    'category': cat, 'estimated_cost_min': min_cost,
-                    'estimated_cost_max': max_cost, 'description': desc,
-                    'is_active': True, 'display_order': i,
-                }
-            )
-            if created:
-                count += 1
-        total = RepairIssue.objects.filter(is_active=True).count()
-        self.stdout.write(self.style.SUCCESS(f'  ✅ {count} repair issues created | {total} total'))
+        count = _create_missing(RepairIssue, ('name', 'vehicle_type'), [
+            RepairIssue(name=name, vehicle_type=vtype, category=cat, estimated_cost_min=cmin,
+                        estimated_cost_max=cmax, description=desc, is_active=True, display_order=i)
+            for i, (name, cat, vtype, cmin, cmax, desc) in enumerate(issues)
+        ])
+        self.stdout.write(self.style.SUCCESS(f'  ✅ Created {count} repair issues'))
 
     # ─────────────────────────────────────────────────────────────────────────
     # SERVICE TYPES
@@ -288,15 +289,11 @@ class Command(BaseCommand):
             ('Electrical Repair', 'all', 'Wiring, fuse, relay, sensor repair', 499, 2, 'fa-bolt'),
             ('Emergency Repair', 'all', 'Priority emergency vehicle repair', 999, 2, 'fa-exclamation-triangle'),
         ]
-        count = 0
-        for i, (name, vtype, desc, price, dur, icon) in enumerate(services):
-            _, created = ServiceType.objects.get_or_create(
-                name=name, vehicle_type=vtype,
-                defaults={'description': desc, 'base_price': price, 'estimated_duration': dur,
-                          'icon': icon, 'is_active': True, 'display_order': i}
-            )
-            if created:
-                count += 1
+        count = _create_missing(ServiceType, ('name', 'vehicle_type'), [
+            ServiceType(name=name, vehicle_type=vtype, description=desc, base_price=price,
+                        estimated_duration=dur, icon=icon, is_active=True, display_order=i)
+            for i, (name, vtype, desc, price, dur, icon) in enumerate(services)
+        ])
         self.stdout.write(self.style.SUCCESS(f'  ✅ {count} service types created'))
 
     # ─────────────────────────────────────────────────────────────────────────
@@ -329,13 +326,10 @@ class Command(BaseCommand):
             ('Kartika Pournami', date(2025, 11, 5), False, 'Telugu festival'),
             ('Christmas', date(2025, 12, 25), True, 'Christian festival'),
         ]
-        count = 0
-        for name, hdate, nat, desc in holidays:
-            _, created = Holiday.objects.get_or_create(
-                name=name, date=hdate, defaults={'description': desc, 'is_national': nat}
-            )
-            if created:
-                count += 1
+        count = _create_missing(Holiday, ('name', 'date'), [
+            Holiday(name=name, date=hdate, description=desc, is_national=nat)
+            for name, hdate, nat, desc in holidays
+        ])
         self.stdout.write(self.style.SUCCESS(f'  ✅ {count} holidays created'))
 
     # ─────────────────────────────────────────────────────────────────────────
@@ -377,17 +371,18 @@ class Command(BaseCommand):
             ('EMP015', '8001000015', 'Pavan', 'Kalyan', 'supervisor', 'Rajahmundry Main'),
         ]
 
+        # Hash each shared password once instead of running PBKDF2 for every seeded user
+        emp_password = make_password('emp@123')
+        worker_password = make_password('worker@123')
+
         count = 0
         for emp_id, mobile, fname, lname, designation, center_partial in named:
             user, ucreated = User.objects.get_or_create(
                 mobile_number=mobile,
                 defaults={'first_name': fname, 'last_name': lname,
                           'role': 'employee', 'is_verified': True,
-                          'is_staff': designation == 'manager'}
+                          'is_staff': designation == 'manager', 'password': emp_password}
             )
-            if ucreated:
-                user.set_password('emp@123')
-                user.save()
             center = ServiceCenter.objects.filter(name__icontains=center_partial.split()[-1], is_active=True).first()
             if not center:
                 center = ServiceCenter.objects.filter(is_active=True).first()
@@ -418,6 +413,9 @@ class Command(BaseCommand):
             existing_count = Employee.objects.filter(service_center=center, is_active=True).count()
             needed = max(0, 4 - existing_count)  # ensure at least 4 staff per center
             for j in range(needed):
+                # Re-runs add centers (e.g. a new state): skip numbers earlier runs used
+                while User.objects.filter(mobile_number=str(mobile_counter)).exists():
+                    mobile_counter += 1
                 mobile_str = str(mobile_counter)
                 mobile_counter += 1
                 emp_id_str = f'W{mobile_counter % 100000:05d}'
@@ -429,11 +427,8 @@ class Command(BaseCommand):
                 user, ucreated = User.objects.get_or_create(
                     mobile_number=mobile_str,
                     defaults={'first_name': fname, 'last_name': lname,
-                              'role': 'employee', 'is_verified': True}
+                              'role': 'employee', 'is_verified': True, 'password': worker_password}
                 )
-                if ucreated:
-                    user.set_password('worker@123')
-                    user.save()
 
                 emp, ecreated = Employee.objects.get_or_create(
                     employee_id=emp_id_str,
@@ -455,12 +450,15 @@ class Command(BaseCommand):
         ))
 
     # ─────────────────────────────────────────────────────────────────────────
-    # TIME SLOTS — 21 days for top 20 centers
+    # TIME SLOTS — 21 days for the top 20 centers of each state
     # ─────────────────────────────────────────────────────────────────────────
     def create_time_slots(self):
         from bookings.models import TimeSlot
         from core.models import ServiceCenter
-        centers = ServiceCenter.objects.filter(is_active=True)[:20]
+        centers = [
+            center for state, _ in ServiceCenter.STATE_CHOICES
+            for center in ServiceCenter.objects.filter(is_active=True, state=state)[:20]
+        ]
         today = date.today()
         slot_times = [
             (time(8, 0), time(9, 0)), (time(9, 0), time(10, 0)),
@@ -469,94 +467,21 @@ class Command(BaseCommand):
             (time(15, 0), time(16, 0)), (time(16, 0), time(17, 0)),
             (time(17, 0), time(18, 0)),
         ]
+        days = [today + timedelta(days=offset) for offset in range(0, 21)]
         count = 0
-        for center in centers:
-            for day_offset in range(0, 21):
-                slot_date = today + timedelta(days=day_offset)
-                if slot_date.weekday() == 6:
-                    continue
-                for start_t, end_t in slot_times:
-                    _, created = TimeSlot.objects.get_or_create(
-                        service_center=center, date=slot_date, start_time=start_t,
-                        defaults={'end_time': end_t, 'max_bookings': 5, 'is_available': True}
-                    )
-                    if created:
-                        count += 1
-        self.stdout.write(self.style.SUCCESS(f'  ✅ {count} time slots (21 days × 20 centers)'))
+        # Slots live in their center's state shard (a no-op without DATABASE_SHARDS)
+        for alias in shards.each():
+            with shards.use_shard(alias):
+                count += _create_missing(TimeSlot, ('service_center_id', 'date', 'start_time'), [
+                    TimeSlot(service_center=center, date=slot_date, start_time=start_t, end_time=end_t,
+                             max_bookings=5, is_available=True)
+                    for center in centers if shards.for_state(center.state) == alias
+                    for slot_date in days if slot_date.weekday() != 6
+                    for start_t, end_t in slot_times
+                ])
+        self.stdout.write(self.style.SUCCESS(f'  ✅ {count} time slots (21 days × {len(centers)} centers)'))
 
 
-    def create_repair_issues(self):
-        from bookings.models import RepairIssue
-        issues = [
-            # ENGINE
-            ('Engine not starting', 'engine', '2w', 300, 2000, 'Bike/scooter not cranking or turning over'),
-            ('Engine overheating', 'engine', '2w', 500, 3000, 'Engine temperature rising abnormally'),
-            ('Engine oil leaking', 'engine', '2w', 200, 1500, 'Oil dripping from engine'),
-            ('Unusual engine noise / knocking', 'engine', '2w', 500, 4000, 'Tapping, knocking or rattling sounds'),
-            ('Engine not starting', 'engine', '4w', 500, 3000, 'Car cranks but won\'t start or no crank'),
-            ('Engine overheating / coolant issue', 'engine', '4w', 800, 5000, 'Temperature warning, steam, coolant loss'),
-            ('Engine oil leaking', 'engine', '4w', 300, 3000, 'Oil spots under car, burning smell'),
-            ('Engine knocking / rough idle', 'engine', '4w', 1000, 8000, 'Irregular idle, misfires, power loss'),
-            ('Check engine light on', 'engine', 'all', 500, 2000, 'OBD warning light illuminated'),
-            # BRAKES
-            ('Brakes not working / hard pedal', 'brakes', '4w', 500, 3000, 'Pedal goes to floor or very stiff'),
-            ('Brake noise / squealing', 'brakes', 'all', 300, 2500, 'Squealing, grinding when braking'),
-            ('Car pulling to one side when braking', 'brakes', '4w', 500, 2000, 'Vehicle drifts left or right during braking'),
-            ('Handbrake not holding', 'brakes', 'all', 300, 1500, 'Parking brake loose or ineffective'),
-            ('Brake pads worn', 'brakes', '4w', 800, 3000, 'Pad wear indicator noise'),
-            ('Brake vibration / judder', 'brakes', '4w', 500, 3000, 'Steering wheel shaking when braking'),
-            # TYRES
-            ('Flat tyre / puncture', 'tyres', 'all', 100, 500, 'Flat or losing air rapidly'),
-            ('Tyre bulge or cracking', 'tyres', 'all', 500, 3000, 'Visible bulge or sidewall cracks'),
-            ('Abnormal tyre wear', 'tyres', 'all', 300, 2000, 'Uneven wear pattern'),
-            ('Wheel alignment off', 'tyres', '4w', 400, 800, 'Car drifts when driving straight'),
-            ('Wheel balancing needed', 'tyres', 'all', 200, 500, 'Vibration in steering at high speed'),
-            # ELECTRICAL
-            ('Battery dead / not charging', 'electrical', 'all', 300, 5000, 'Car won\'t start, battery warning'),
-            ('Headlights not working', 'electrical', 'all', 200, 2000, 'One or both headlights out'),
-            ('Electrical short / fuse blown', 'electrical', 'all', 200, 2000, 'Repeated fuse failures, dead circuits'),
-            ('Starter motor issue', 'electrical', 'all', 500, 4000, 'Clicking sound when starting'),
-            ('Alternator issue', 'electrical', '4w', 1000, 6000, 'Battery not charging, warning light'),
-            # AC
-            ('AC not cooling', 'ac', '4w', 500, 4000, 'Air not cold enough or warm air'),
-            ('AC gas leaking / refill needed', 'ac', '4w', 800, 2500, 'Refrigerant low, AC blows warm'),
-            ('AC compressor noise', 'ac', '4w', 1000, 8000, 'Rattling or clunking from AC compressor'),
-            ('AC not working at all', 'ac', '4w', 500, 5000, 'Blower works but no cooling'),
-            # BODY
-            ('Body denting repair', 'body', 'all', 500, 10000, 'Door dings, dents from minor accidents'),
-            ('Paint scratches / chips', 'body', 'all', 300, 5000, 'Surface scratches, paint peeling'),
-            ('Rust spots / corrosion', 'body', 'all', 500, 8000, 'Rust on body panels'),
-            ('Windshield crack / chip', 'body', '4w', 500, 5000, 'Cracked or chipped windshield'),
-            # TRANSMISSION
-            ('Gear shifting difficult', 'transmission', 'all', 300, 5000, 'Hard to shift gears or slips out'),
-            ('Clutch slipping / heavy', 'transmission', 'all', 800, 6000, 'Clutch not engaging fully, high clutch point'),
-            ('Transmission fluid leak', 'transmission', '4w', 500, 3000, 'Red fluid dripping, burning smell'),
-            ('Gear box noise', 'transmission', 'all', 500, 8000, 'Grinding or whining in gear'),
-            # FUEL
-            ('Poor fuel economy', 'fuel', 'all', 300, 2000, 'Noticeably more fuel consumption'),
-            ('Fuel leaking / smell', 'fuel', 'all', 500, 3000, 'Strong petrol/diesel smell, visible leak'),
-            ('Engine sputtering on acceleration', 'fuel', 'all', 300, 3000, 'Hesitation, stumbling when accelerating'),
-            # SERVICE
-            ('Periodic service due', 'service', 'all', 499, 2999, 'Routine oil change and service by KM'),
-            ('Full vehicle check-up', 'service', 'all', 499, 1999, 'Complete 50-point vehicle inspection'),
-            ('Pre-trip inspection', 'service', 'all', 299, 599, 'Safety check before long trip'),
-            # HEAVY VEHICLE
-            ('Air brake failure', 'brakes', 'heavy', 2000, 10000, 'Truck/bus air brake not working'),
-            ('Engine overhaul needed', 'engine', 'heavy', 15000, 50000, 'Major engine reconditioning'),
-            ('Leaf spring broken', 'brakes', 'heavy', 2000, 8000, 'Suspension leaf spring damaged'),
-        ]
-        count = 0
-        for i, (name, cat, vtype, cmin, cmax, desc) in enumerate(issues):
-            _, created = RepairIssue.objects.get_or_create(
-                name=name, vehicle_type=vtype,
-                defaults={'category': cat, 'estimated_cost_min': cmin,
-                          'estimated_cost_max': cmax, 'description': desc,
-                          'is_active': True, 'display_order': i}
-            )
-            if created:
-                count += 1
-        self.stdout.write(self.style.SUCCESS(f'  ✅ Created {count} repair issues'))
-
     def create_workers_for_all_centers(self):
         from accounts.models import User, Employee
         from core.models import ServiceCenter
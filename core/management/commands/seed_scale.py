@@ -0,0 +1,321 @@
+"""
+SMART REPAIR — Scale data for benchmarks
+Run: python manage.py seed_scale --scale 1 --seed 42
+
+Adds customers, vehicles, bookings (with selected issues and service types), repair
+charges, service records, payments and notifications on top of what seed_data
+created. At --scale 1 that is 20,000 customers and 50,000 bookings; --scale 20 gives
+a 1M-booking database. Everything is generated from one seeded RNG and written with
+bulk_create in batches, so the same seed against the same starting database always
+produces the same rows.
+"""
+import random
+import time
+from bisect import bisect
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Max, QuerySet
+from django.utils import timezone
+
+from smart_repair import shards
+
+CUSTOMERS_PER_SCALE = 20_000
+BOOKINGS_PER_SCALE = 50_000
+
+FIRST_NAMES = ['Ravi', 'Suresh', 'Lakshmi', 'Priya', 'Venkat', 'Srinivas', 'Anil', 'Kiran', 'Padma',
+               'Ramesh', 'Sujatha', 'Naresh', 'Durga', 'Mahesh', 'Bhavani', 'Ganesh', 'Swathi', 'Pavan',
+               'Harika', 'Chandra', 'Sravani', 'Murali', 'Kavya', 'Teja', 'Sai', 'Divya', 'Rajesh', 'Anusha']
+LAST_NAMES = ['Reddy', 'Naidu', 'Rao', 'Kumar', 'Chowdary', 'Varma', 'Raju', 'Sharma', 'Prasad', 'Babu',
+              'Murthy', 'Krishna', 'Devi', 'Swamy', 'Goud', 'Yadav']
+MAKES = {
+    '2w': [('Hero', 'Splendor'), ('Honda', 'Activa'), ('Bajaj', 'Pulsar'), ('TVS', 'Jupiter'),
+           ('Royal Enfield', 'Classic 350'), ('Yamaha', 'FZ')],
+    '3w': [('Bajaj', 'RE Compact'), ('Piaggio', 'Ape'), ('Mahindra', 'Alfa')],
+    '4w': [('Maruti Suzuki', 'Swift'), ('Hyundai', 'i20'), ('Tata', 'Nexon'), ('Mahindra', 'XUV700'),
+           ('Toyota', 'Innova'), ('Kia', 'Seltos'), ('Honda', 'City')],
+    'heavy': [('Tata', 'LPT 1613'), ('Ashok Leyland', 'Dost'), ('Eicher', 'Pro 2049')],
+}
+VEHICLE_TYPES = ['2w', '4w', '3w', 'heavy']
+VEHICLE_TYPE_WEIGHTS = list(accumulate([60, 30, 7, 3]))
+FUELS = {'2w': ['petrol'] * 9 + ['electric'], '3w': ['cng', 'diesel', 'electric'],
+         '4w': ['petrol'] * 5 + ['diesel'] * 3 + ['cng', 'hybrid'], 'heavy': ['diesel']}
+COLORS = ['White', 'Black', 'Silver', 'Red', 'Blue', 'Grey']
+PAYMENT_METHODS = ['upi'] * 5 + ['cash'] * 3 + ['card', 'online', 'netbanking']
+GST_RATE = Decimal('18.00')
+
+
+class KeepTimestamps(QuerySet):
+    """
+    bulk_create that writes the generated created_at/updated_at instead of stamping
+    now(): a raw insert reads every field's value as set, skipping pre_save(). The
+    fields themselves are untouched, so other saves in the process are unaffected.
+    """
+
+    def _insert(self, *args, **kwargs):
+        kwargs['raw'] = True
+        return super()._insert(*args, **kwargs)
+
+
+def _next_pk(model, alias=shards.PRIMARY_ALIAS):
+    with shards.use_shard(alias):
+        return (model.objects.aggregate(m=Max('pk'))['m'] or shards.pk_base(alias)) + 1
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, deterministic dataset for performance work'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help=f'1.0 = {CUSTOMERS_PER_SCALE:,} customers, {BOOKINGS_PER_SCALE:,} bookings')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--days', type=int, default=730, help='History window for booking dates')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Bookings per transaction')
+
+    def handle(self, *args, **options):
+        from accounts.models import Employee
+        from core.models import ServiceCenter
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now().replace(microsecond=0)
+        self.days = options['days']
+        n_customers = max(1, int(CUSTOMERS_PER_SCALE * options['scale']))
+        n_bookings = max(1, int(BOOKINGS_PER_SCALE * options['scale']))
+
+        catalog_issues = self._issues_by_vehicle_type()
+        centers = list(ServiceCenter.objects.filter(is_active=True).order_by('pk').values_list('pk', 'total_bays', 'state'))
+        if not centers or not any(catalog_issues.values()):
+            raise CommandError('Service centers and repair issues are missing — run seed_data first.')
+        self.centers = [pk for pk, _, _ in centers]
+        # Each booking and everything hanging off it goes to its center's state shard
+        self.center_shard = {pk: shards.for_state(state) for pk, _, state in centers}
+        # Busier (more bays) centers take proportionally more bookings
+        self.center_weights = list(accumulate(bays or 1 for _, bays, _ in centers))
+        self.staff = {}
+        for pk, center_id in Employee.objects.filter(is_active=True).order_by('pk').values_list('pk', 'service_center_id'):
+            self.staff.setdefault(center_id, []).append(pk)
+        self.issues = catalog_issues
+        self.service_types = self._service_types_by_vehicle_type()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🚀 Generating {n_customers:,} customers and {n_bookings:,} bookings (seed {options["seed"]})...'
+        ))
+        started = time.perf_counter()
+        for alias in shards.each():
+            if connections[alias].vendor == 'sqlite':
+                with connections[alias].cursor() as cursor:
+                    # A crash mid-seed only loses generated data; skip the per-commit fsync
+                    cursor.execute('PRAGMA synchronous = OFF')
+        self.counts = {}
+        self.create_customers(n_customers)
+        self.create_bookings(n_bookings)
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.counts.values())
+        for table, count in self.counts.items():
+            self.stdout.write(f'  ✅ {count:>10,} {table}')
+        self.stdout.write(self.style.SUCCESS(f'✅ {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)'))
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # CATALOG LOOKUPS
+    # ─────────────────────────────────────────────────────────────────────────
+    def _issues_by_vehicle_type(self):
+        from bookings.models import RepairIssue
+        rows = list(RepairIssue.objects.filter(is_active=True).order_by('pk')
+                    .values_list('pk', 'vehicle_type', 'name', 'estimated_cost_min', 'estimated_cost_max'))
+        return {vtype: [r for r in rows if r[1] in (vtype, 'all')] for vtype in VEHICLE_TYPES}
+
+    def _service_types_by_vehicle_type(self):
+        from core.models import ServiceType
+        rows = list(ServiceType.objects.filter(is_active=True).order_by('pk').values_list('pk', 'vehicle_type', 'base_price'))
+        return {vtype: [r for r in rows if r[1] in (vtype, 'all')] for vtype in VEHICLE_TYPES}
+
+    def _past_moment(self, max_days):
+        day = self.now - timedelta(days=self.rng.randrange(max_days))
+        moment = day.replace(hour=self.rng.randint(8, 18), minute=self.rng.choice((0, 15, 30, 45)), second=0)
+        return min(moment, self.now)
+
+    def _insert(self, model, objs):
+        KeepTimestamps(model).bulk_create(objs, batch_size=1000)
+        label = model._meta.db_table
+        self.counts[label] = self.counts.get(label, 0) + len(objs)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # CUSTOMERS + VEHICLES
+    # ─────────────────────────────────────────────────────────────────────────
+    def create_customers(self, n_customers):
+        from accounts.models import User
+        from bookings.models import Vehicle
+
+        rng = self.rng
+        user_pk, vehicle_pk = _next_pk(User), _next_pk(Vehicle)
+        # Per customer: (user pk, [(vehicle pk, vehicle type), ...])
+        self.customers = []
+        for start in range(0, n_customers, self.batch_size):
+            users, vehicles = [], []
+            for _ in range(min(self.batch_size, n_customers - start)):
+                joined = self._past_moment(self.days + 365)
+                users.append(User(
+                    pk=user_pk, mobile_number=f'6{user_pk:09d}', role='customer', is_verified=True,
+                    first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                    city=rng.choice(('Vijayawada', 'Visakhapatnam', 'Guntur', 'Tirupati', 'Nellore', 'Kurnool')),
+                    date_joined=joined, password='!seed_scale',
+                ))
+                owned = []
+                for _ in range(1 if rng.random() < 0.75 else rng.randint(2, 3)):
+                    vtype = VEHICLE_TYPES[bisect(VEHICLE_TYPE_WEIGHTS, rng.random() * VEHICLE_TYPE_WEIGHTS[-1])]
+                    make, model = rng.choice(MAKES[vtype])
+                    vehicles.append(Vehicle(
+                        pk=vehicle_pk, owner_id=user_pk, vehicle_number=f'AP{vehicle_pk % 39 + 1:02d}S{vehicle_pk:07d}',
+                        vehicle_type=vtype, make=make, model=model, year=rng.randint(2008, 2025),
+                        fuel_type=rng.choice(FUELS[vtype]), color=rng.choice(COLORS),
+                        current_km=rng.randint(1_000, 120_000), registered_at=joined,
+                    ))
+                    owned.append((vehicle_pk, vtype))
+                    vehicle_pk += 1
+                self.customers.append((user_pk, owned))
+                user_pk += 1
+            with transaction.atomic():
+                self._insert(User, users)
+                self._insert(Vehicle, vehicles)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # BOOKINGS + EVERYTHING HANGING OFF THEM
+    # ─────────────────────────────────────────────────────────────────────────
+    def create_bookings(self, n_bookings):
+        from accounts.models import Notification
+        from bookings.models import Booking, RepairCharge, ServiceRecord
+        from payments.models import Payment
+
+        rng = self.rng
+        sharded = (Booking, RepairCharge, ServiceRecord, Payment)
+        databases = sorted(set(self.center_shard.values()), key=shards.each().index)
+        # Ids come from each database's own range; notifications stay in 'default'
+        shard_pks = {alias: {model: _next_pk(model, alias) for model in sharded} for alias in databases}
+        notification_pks = {Notification: _next_pk(Notification)}
+        n_customers = len(self.customers)
+        for start in range(0, n_bookings, self.batch_size):
+            shard_rows = {alias: {model: [] for model in sharded} for alias in databases}
+            shard_links = {alias: ([], []) for alias in databases}
+            notifications = []
+            for _ in range(min(self.batch_size, n_bookings - start)):
+                # Heavy-tailed: a few regulars book often, most customers once or twice
+                customer_pk, owned = self.customers[int(n_customers * rng.random() ** 2.5)]
+                vehicle_pk, vtype = rng.choice(owned)
+                center = self.centers[bisect(self.center_weights, rng.random() * self.center_weights[-1])]
+                alias = self.center_shard[center]
+                pks, rows = shard_pks[alias], shard_rows[alias]
+                issue_links, service_links = shard_links[alias]
+                booking_pk = self._take(pks, Booking)
+                staff = self.staff.get(center) or [None]
+                employee = rng.choice(staff)
+                created = self._past_moment(self.days)
+                age = (self.now - created).days
+                status = self._status_for(age)
+
+                issues = rng.sample(self.issues[vtype], min(len(self.issues[vtype]), rng.choice((1, 1, 2, 2, 3))))
+                services = rng.sample(self.service_types[vtype], rng.choice((0, 0, 1))) if self.service_types[vtype] else []
+                issue_links += [Booking.selected_issues.through(booking_id=booking_pk, repairissue_id=i[0]) for i in issues]
+                service_links += [Booking.service_types.through(booking_id=booking_pk, servicetype_id=s[0]) for s in services]
+                estimate = sum(i[4] for i in issues) + sum(s[2] for s in services)
+                completed_at = created + timedelta(hours=rng.randint(3, 72)) if status == 'completed' else None
+
+                rows[Booking].append(Booking(
+                    pk=booking_pk, booking_id=f'SX{booking_pk:08d}', customer_id=customer_pk, vehicle_id=vehicle_pk,
+                    service_center_id=center, booking_type='online' if rng.random() < 0.8 else 'offline',
+                    status=status, booking_date=(created + timedelta(days=rng.randint(0, 5))).date(),
+                    booking_time=created.time(), problem_description=issues[0][2] if issues else '',
+                    assigned_employee_id=employee if status != 'pending' else None,
+                    otp_verified=status in ('in_progress', 'completed'), created_at=created,
+                    updated_at=completed_at or created, completed_at=completed_at,
+                    estimated_total=estimate, reminder_sent=status == 'completed' and rng.random() < 0.5,
+                ))
+                notifications.append(Notification(
+                    pk=self._take(notification_pks, Notification), user_id=customer_pk, title='Booking Confirmed',
+                    message=f'Your booking SX{booking_pk:08d} is confirmed.', notification_type='booking_confirm',
+                    is_read=age > 2 or rng.random() < 0.5, created_at=created,
+                ))
+                if status in ('pending', 'cancelled', 'confirmed'):
+                    continue
+
+                charges = [
+                    (issue[0], 'selected', issue[2], 1, Decimal(rng.randint(int(issue[3]), int(issue[4]))))
+                    for issue in issues
+                ] + [(None, 'service', s[1], 1, s[2]) for s in services]
+                if rng.random() < 0.35:
+                    charges.append((None, rng.choice(('parts', 'labour', 'extra')), 'Additional work', rng.randint(1, 3),
+                                    Decimal(rng.randint(2, 40) * 50)))
+                for issue_pk, charge_type, description, quantity, unit_price in charges:
+                    rows[RepairCharge].append(RepairCharge(
+                        pk=self._take(pks, RepairCharge), booking_id=booking_pk, repair_issue_id=issue_pk,
+                        charge_type=charge_type, description=description, quantity=quantity, unit_price=unit_price,
+                        is_extra=charge_type == 'extra', added_by_id=employee, added_at=created,
+                    ))
+                if status != 'completed':
+                    continue
+
+                rows[ServiceRecord].append(ServiceRecord(
+                    pk=self._take(pks, ServiceRecord), booking_id=booking_pk, vehicle_id=vehicle_pk, employee_id=employee,
+                    work_done='; '.join(c[2] for c in charges), started_at=created, completed_at=completed_at,
+                    km_reading=rng.randint(1_000, 120_000), next_service_date=(completed_at + timedelta(days=180)).date(),
+                ))
+                rows[Payment].append(self._payment(pks, booking_pk, customer_pk, employee, charges, completed_at))
+                notifications.append(Notification(
+                    pk=self._take(notification_pks, Notification), user_id=customer_pk, title='Service Completed',
+                    message=f'Your vehicle is ready. Booking SX{booking_pk:08d}.', notification_type='service_complete',
+                    is_read=age > 7 or rng.random() < 0.3, created_at=completed_at,
+                ))
+
+            for alias in databases:
+                with shards.use_shard(alias), transaction.atomic(using=alias):
+                    for model, objs in shard_rows[alias].items():
+                        self._insert(model, objs)
+                    self._insert(Booking.selected_issues.through, shard_links[alias][0])
+                    self._insert(Booking.service_types.through, shard_links[alias][1])
+            with transaction.atomic():
+                self._insert(Notification, notifications)
+            self.stdout.write(f'  … {min(start + self.batch_size, n_bookings):,}/{n_bookings:,} bookings')
+
+    @staticmethod
+    def _take(pks, model):
+        pk = pks[model]
+        pks[model] += 1
+        return pk
+
+    def _status_for(self, age_days):
+        roll = self.rng.random()
+        if age_days > 14:
+            return 'cancelled' if roll < 0.08 else 'completed'
+        if roll < 0.05:
+            return 'cancelled'
+        if roll < 0.35:
+            return 'pending'
+        if roll < 0.55:
+            return 'confirmed'
+        if roll < 0.75:
+            return 'in_progress'
+        return 'completed'
+
+    def _payment(self, pks, booking_pk, customer_pk, employee, charges, paid_at):
+        from payments.models import Payment
+        totals = {'issue': Decimal(0), 'extra': Decimal(0), 'parts': Decimal(0), 'labour': Decimal(0)}
+        for _, charge_type, _, quantity, unit_price in charges:
+            bucket = charge_type if charge_type in ('extra', 'parts', 'labour') else 'issue'
+            totals[bucket] += quantity * unit_price
+        subtotal = sum(totals.values())
+        gst = (subtotal * GST_RATE / 100).quantize(Decimal('0.01'))
+        discount = Decimal(self.rng.choice((0, 0, 0, 50, 100)))
+        pk = self._take(pks, Payment)
+        return Payment(
+            pk=pk, receipt_number=f'RCX{pk:08d}', booking_id=booking_pk, customer_id=customer_pk,
+            issue_charges_total=totals['issue'], extra_charges_total=totals['extra'],
+            parts_total=totals['parts'], labour_total=totals['labour'], subtotal=subtotal, gst_rate=GST_RATE,
+            gst_amount=gst, discount=discount, total_amount=subtotal + gst - discount,
+            payment_method=self.rng.choice(PAYMENT_METHODS), payment_status='paid', paid_at=paid_at,
+            created_at=paid_at, billed_by_id=employee,
+        )
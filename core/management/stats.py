@@ -0,0 +1,9 @@
+"""Summaries shared by the bench_* and loadtest commands."""
+import statistics
+
+
+def percentile(values, q):
+    """The q-th percentile (1–99) of `values`; the value itself for one, 0 for none."""
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100)[q - 1]
@@ -0,0 +1,162 @@
+"""
+In-process request metrics, rendered in the Prometheus text format at /metrics/.
+
+Per URL name we keep a latency histogram, the number of requests by status class,
+and the number and total time of database queries. Everything lives in this worker's
+memory — with several workers, scrape each one (or sum them in Prometheus).
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+
+# Upper bounds in seconds; the implicit last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+UNRESOLVED = '<unresolved>'
+
+
+class ViewStats:
+    __slots__ = ('latency', 'latency_sum', 'queries', 'query_count', 'db_time', 'statuses')
+
+    def __init__(self):
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.queries = [0] * (len(QUERY_BUCKETS) + 1)
+        self.query_count = 0
+        self.db_time = 0.0
+        self.statuses = {}
+
+
+class Registry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, status, duration, queries, db_time):
+        status_class = f'{status // 100}xx'
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = ViewStats()
+            stats.latency[bisect_left(LATENCY_BUCKETS, duration)] += 1
+            stats.latency_sum += duration
+            stats.queries[bisect_left(QUERY_BUCKETS, queries)] += 1
+            stats.query_count += queries
+            stats.db_time += db_time
+            stats.statuses[status_class] = stats.statuses.get(status_class, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def render(self):
+        with self._lock:
+            snapshot = {
+                view: (list(s.latency), s.latency_sum, list(s.queries), s.query_count, s.db_time, dict(s.statuses))
+                for view, s in self._views.items()
+            }
+        lines = []
+        _histogram(lines, 'smart_repair_request_duration_seconds', 'Request latency by view.',
+                   LATENCY_BUCKETS, {v: (s[0], s[1]) for v, s in snapshot.items()})
+        _histogram(lines, 'smart_repair_request_db_queries', 'Database queries per request by view.',
+                   QUERY_BUCKETS, {v: (s[2], s[3]) for v, s in snapshot.items()})
+        lines += [
+            '# HELP smart_repair_db_query_seconds_total Time spent in database queries by view.',
+            '# TYPE smart_repair_db_query_seconds_total counter',
+        ]
+        lines += [f'smart_repair_db_query_seconds_total{{view="{v}"}} {s[4]:.6f}' for v, s in sorted(snapshot.items())]
+        lines += [
+            '# HELP smart_repair_requests_total Requests by view and status class.',
+            '# TYPE smart_repair_requests_total counter',
+        ]
+        for view, s in sorted(snapshot.items()):
+            for status, count in sorted(s[5].items()):
+                lines.append(f'smart_repair_requests_total{{view="{view}",status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram(lines, name, help_text, bounds, series):
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for view, (counts, total) in sorted(series.items()):
+        cumulative = 0
+        for bound, count in zip((*bounds, '+Inf'), counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{view="{view}"}} {round(total, 6)}')
+        lines.append(f'{name}_count{{view="{view}"}} {cumulative}')
+
+
+registry = Registry()
+
+
+class QueryTimer:
+    """connection.execute_wrapper that counts queries and adds up their time."""
+    __slots__ = ('count', 'elapsed')
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Time each request and its queries. Put it first so the whole stack is measured."""
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        start = time.perf_counter()
+        status = 500
+        try:
+            with _timed_connections(timer):
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            _record(request, status, start, timer)
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        status = 500
+        try:
+            # Connections follow the request's context into sync_to_async threads, so the
+            # wrappers installed here see the queries of the async ORM calls too
+            with _timed_connections(timer):
+                response = await self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            _record(request, status, start, timer)
+
+
+def _timed_connections(timer):
+    stack = ExitStack()
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(timer))
+    return stack
+
+
+def _record(request, status, start, timer):
+    match = request.resolver_match
+    view = (match.view_name if match else None) or getattr(request, 'metrics_label', UNRESOLVED)
+    registry.record(view, status, time.perf_counter() - start, timer.count, timer.elapsed)
@@ -115,3 +115,26 @@ class ContactMessage(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.subject}"
+
+
+class CatalogVersion(models.Model):
+    """Single row bumped whenever services, repair issues, service centers or holidays change.
+    Workers compare it against their in-memory catalog snapshot (see core/catalog.py)."""
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Catalog v{self.version}"
+
+
+class ImageAsset(models.Model):
+    """An uploaded image whose resized derivatives are ready. Derivatives live under the
+    content hash, so identical uploads share them (see core/images.py)."""
+    source = models.CharField(max_length=255, unique=True, help_text='Storage name of the original upload')
+    digest = models.CharField(max_length=64, db_index=True)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.source} ({self.digest[:12]})"
@@ -0,0 +1,155 @@
+"""
+Sliding-window rate limiting backed by the shared cache.
+
+Each limit keeps one counter per fixed window; the current count is estimated as
+the previous window's count (weighted by how much of it still overlaps the sliding
+window) plus the current window's count. That is two cache reads and one increment
+per key, and no database work, so rejected requests cost almost nothing.
+
+Rates live in settings.RATELIMITS, e.g. {'otp_send': {'ip': '30/h', 'mobile': '5/15m'}}.
+"""
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'5/15m' -> (5, 900). A bare unit ('10/m') means one of that unit."""
+    count, period = rate.split('/')
+    number, unit = period[:-1], period[-1]
+    return int(count), int(number or 1) * UNITS[unit]
+
+
+def client_ip(request):
+    if getattr(settings, 'RATELIMIT_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _buckets(keys, now):
+    buckets = []
+    for prefix, limit, window in keys:
+        bucket = int(now // window)
+        buckets.append((f'{prefix}:{bucket}', f'{prefix}:{bucket - 1}', limit, window))
+    return buckets
+
+
+def _retry_after(buckets, counts, now):
+    retry_after = 0
+    for current, previous, limit, window in buckets:
+        overlap = 1 - (now % window) / window
+        estimate = counts.get(previous, 0) * overlap + counts.get(current, 0)
+        if estimate >= limit:
+            retry_after = max(retry_after, math.ceil(window * overlap) or 1)
+    return retry_after
+
+
+def check_and_hit(keys, now=None):
+    """
+    keys: list of (cache_key_prefix, limit, window_seconds).
+    Returns 0 and counts the hit against every key if all are under their limit,
+    otherwise returns the number of seconds to wait and counts nothing.
+    """
+    now = time.time() if now is None else now
+    buckets = _buckets(keys, now)
+    counts = cache.get_many([key for current, previous, _, _ in buckets for key in (current, previous)])
+    retry_after = _retry_after(buckets, counts, now)
+    if retry_after:
+        return retry_after
+
+    for current, previous, limit, window in buckets:
+        # Counters outlive their window by one more so the next window can weight them
+        if not cache.add(current, 1, window * 2):
+            try:
+                cache.incr(current)
+            except ValueError:
+                cache.set(current, 1, window * 2)
+    return 0
+
+
+async def acheck_and_hit(keys, now=None):
+    """check_and_hit() through the async cache API."""
+    now = time.time() if now is None else now
+    buckets = _buckets(keys, now)
+    counts = await cache.aget_many([key for current, previous, _, _ in buckets for key in (current, previous)])
+    retry_after = _retry_after(buckets, counts, now)
+    if retry_after:
+        return retry_after
+
+    for current, previous, limit, window in buckets:
+        if not await cache.aadd(current, 1, window * 2):
+            try:
+                await cache.aincr(current)
+            except ValueError:
+                await cache.aset(current, 1, window * 2)
+    return 0
+
+
+def ratelimit(group, purpose, mobile=None, when=None, json=False, methods=('POST',)):
+    """
+    Limit a view by client IP and, when `mobile(request)` returns a number, by mobile
+    number + purpose, using the rates configured for `group`.
+
+    `purpose` may be a string or a callable taking the request; `when` can narrow the
+    limit to specific submissions (e.g. only the send-OTP action of a multi-step form).
+    Over-limit requests get a 429 before the view runs.
+    """
+    def applies(request):
+        return (getattr(settings, 'RATELIMIT_ENABLE', True)
+                and request.method in methods
+                and (when is None or when(request)))
+
+    def limit_keys(request):
+        rates = settings.RATELIMITS.get(group, {})
+        keys = []
+        if 'ip' in rates:
+            keys.append((f'rl:{group}:ip:{client_ip(request)}', *parse_rate(rates['ip'])))
+        number = mobile(request) if mobile else None
+        if number and 'mobile' in rates:
+            scope = purpose(request) if callable(purpose) else purpose
+            keys.append((f'rl:{group}:{scope}:m:{number.strip()}', *parse_rate(rates['mobile'])))
+        return keys
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _awrapped(request, *args, **kwargs):
+                if applies(request):
+                    # The key callables may read the session, which is sync-only
+                    keys = await sync_to_async(limit_keys)(request)
+                    retry_after = await acheck_and_hit(keys) if keys else 0
+                    if retry_after:
+                        return too_many_requests(retry_after, json)
+                return await view_func(request, *args, **kwargs)
+            return _awrapped
+
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if applies(request):
+                keys = limit_keys(request)
+                retry_after = check_and_hit(keys) if keys else 0
+                if retry_after:
+                    return too_many_requests(retry_after, json)
+            return view_func(request, *args, **kwargs)
+        return _wrapped
+    return decorator
+
+
+def too_many_requests(retry_after, json=False):
+    minutes = math.ceil(retry_after / 60)
+    message = f'Too many attempts. Please try again in {minutes} minute{"s" if minutes != 1 else ""}.'
+    if json:
+        response = JsonResponse({'success': False, 'message': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(retry_after)
+    return response
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+
+from smart_repair import shards
+
+from . import images
+from .catalog import bump_catalog_version
+from .models import ServiceCenter, ServiceType, Holiday
+
+
+@receiver([post_save, post_delete], sender=ServiceCenter)
+@receiver([post_save, post_delete], sender=ServiceType)
+@receiver([post_save, post_delete], sender=Holiday)
+@receiver([post_save, post_delete], sender='bookings.RepairIssue')
+def catalog_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=ServiceCenter)
+def image_fields_saved(sender, instance, update_fields=None, **kwargs):
+    images.schedule_for(instance, update_fields)
+
+
+@receiver(post_migrate)
+def database_migrated(sender, using, **kwargs):
+    # A new state shard hands out ids from its own range
+    shards.start_sequences(using)
@@ -0,0 +1,31 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from core import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(field, preset, alt='', css_class=''):
+    """<picture> with WebP and JPEG/PNG srcsets for `preset`; a plain <img> of the
+    original upload until the derivatives are ready."""
+    if not field:
+        return ''
+    found = images.variants(field, preset)
+    if found is None:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">', field.url, alt, css_class)
+    base = images.PRESETS[preset].widths[0]
+
+    def srcset(urls):
+        return ', '.join(f'{url} {width / base:g}x' for width, url in urls)
+
+    *modern, (_, fallback) = found
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}">',
+        ((images.CONTENT_TYPES[fmt], srcset(urls)) for fmt, urls in modern),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" alt="{}" class="{}" loading="lazy"></picture>',
+        sources, fallback[0][1], srcset(fallback), alt, css_class,
+    )
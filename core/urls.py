@@ -11,4 +11,5 @@ urlpatterns = [
     path('track-service/', views.track_service, name='track_service'),
     path('holidays/', views.holidays, name='holidays'),
     path('api/centers/', views.get_centers_api, name='centers_api'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
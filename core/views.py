@@ -1,25 +1,58 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.utils import timezone
-from django.http import JsonResponse
-from .models import ServiceCenter, Holiday, ServiceType, ContactMessage
+from django.http import Http404, HttpResponse, JsonResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.crypto import constant_time_compare
+from .models import Holiday, ContactMessage
+from .async_utils import arender
+from .catalog import aget_catalog, get_catalog
+from .conditional import catalog_conditional
+from .metrics import registry
+from smart_repair import shards
+from smart_repair.routers import read_replica
+
+HOME_CACHE_TIMEOUT = getattr(settings, 'HOME_CACHE_TIMEOUT', 3600)
+CSRF_PLACEHOLDER = 'csrf-token-placeholder-0f3c9a'
+
+
+def _home_context(catalog, today):
+    # Querysets stay lazy: with warm fragment caches the holiday lists are never evaluated
+    return {
+        'service_centers': catalog.centers[:6],
+        'services': catalog.services[:8],
+        'upcoming_holidays': Holiday.objects.filter(date__gte=today).order_by('date')[:5],
+        'all_holidays': Holiday.objects.filter(date__year=today.year).order_by('date'),
+        'total_centers': len(catalog.centers),
+        'total_services': len(catalog.services),
+        'home_cache_timeout': HOME_CACHE_TIMEOUT,
+        # Catalog version moves on center/service/holiday changes; the date rolls holiday lists over
+        'fragment_version': f'{catalog.version}:{today.isoformat()}',
+    }
 
 
+@read_replica
 def home(request):
-    service_centers = ServiceCenter.objects.filter(is_active=True)[:6]
-    services = ServiceType.objects.filter(is_active=True)[:8]
-    upcoming_holidays = Holiday.objects.filter(date__gte=timezone.now().date()).order_by('date')[:5]
-    all_holidays = Holiday.objects.filter(date__year=timezone.now().year).order_by('date')
-
-    context = {
-        'service_centers': service_centers,
-        'services': services,
-        'upcoming_holidays': upcoming_holidays,
-        'all_holidays': all_holidays,
-        'total_centers': ServiceCenter.objects.filter(is_active=True).count(),
-        'total_services': ServiceType.objects.filter(is_active=True).count(),
-    }
-    return render(request, 'core/home.html', context)
+    catalog = get_catalog()
+    today = timezone.localdate()
+
+    # Anonymous visitors with nothing to flash all see the same page: serve it whole
+    # from the cache, only swapping in their CSRF token for the contact form.
+    if not request.user.is_authenticated and not len(messages.get_messages(request)):
+        key = f'home:page:{catalog.version}:{today.isoformat()}'
+        content = cache.get(key)
+        if content is None:
+            context = {**_home_context(catalog, today), 'csrf_token': CSRF_PLACEHOLDER}
+            content = render_to_string('core/home.html', context, request)
+            cache.set(key, content, HOME_CACHE_TIMEOUT)
+        return HttpResponse(content.replace(CSRF_PLACEHOLDER, get_token(request)))
+
+    return render(request, 'core/home.html', _home_context(catalog, today))
 
 
 def about(request):
@@ -44,61 +77,106 @@ def contact(request):
     return render(request, 'core/contact.html')
 
 
+@catalog_conditional('service_centers')
 def service_centers_list(request):
-    centers = ServiceCenter.objects.filter(is_active=True).order_by('city')
-    cities = centers.values_list('city', flat=True).distinct()
-    city_filter = request.GET.get('city', '')
-    if city_filter:
-        centers = centers.filter(city__icontains=city_filter)
+    catalog = get_catalog()
+    index = catalog.locality
+    filters = {
+        'q': request.GET.get('q', ''),
+        'city': request.GET.get('city', ''),
+        'district': request.GET.get('district', ''),
+        'pincode': request.GET.get('pincode', ''),
+    }
+    centers = index.search(**filters)
+    # Cache the grid per facet choice only: free text would give every query its own entry
+    cities, districts = dict(index.city_facets), dict(index.district_facets)
+    free_text = filters['q'].strip() or filters['pincode'].strip()
+    if free_text or (filters['city'] and filters['city'] not in cities) or (
+            filters['district'] and filters['district'] not in districts):
+        filter_key = None
+    else:
+        filter_key = f"{filters['city']}|{filters['district']}"
     return render(request, 'core/service_centers.html', {
-        'centers': centers, 'cities': cities, 'city_filter': city_filter
+        'centers': centers,
+        'cities': [city for city, _ in index.city_facets],
+        'city_facets': index.city_facets,
+        'district_facets': index.district_facets,
+        'city_filter': filters['city'],
+        'district_filter': filters['district'],
+        'query': filters['q'],
+        'home_cache_timeout': HOME_CACHE_TIMEOUT,
+        'fragment_version': catalog.version,
+        'filter_key': filter_key,
     })
 
 
+@catalog_conditional('center_detail')
 def service_center_detail(request, pk):
-    center = get_object_or_404(ServiceCenter, pk=pk, is_active=True)
+    center = get_catalog().get_center_or_404(pk)
+    if not center.is_active:
+        raise Http404('No ServiceCenter matches the given query.')
     return render(request, 'core/center_detail.html', {'center': center})
 
 
+@catalog_conditional('services_list')
 def services_list(request):
     vehicle_type = request.GET.get('type', 'all')
-    services = ServiceType.objects.filter(is_active=True)
-    if vehicle_type != 'all':
-        services = services.filter(vehicle_type__in=[vehicle_type, 'all'])
+    by_type = get_catalog().services_by_vehicle_type
+    services = by_type.get(vehicle_type) or tuple(s for s in by_type['all'] if s.vehicle_type == 'all')
     return render(request, 'core/services_list.html', {
         'services': services, 'vehicle_type': vehicle_type
     })
 
 
-def track_service(request):
+async def track_service(request):
     booking = None
     if request.method == 'POST':
         booking_id = request.POST.get('booking_id')
         mobile = request.POST.get('mobile')
-        from bookings.models import Booking
-        try:
-            booking = Booking.objects.get(
-                booking_id=booking_id,
-                customer__mobile_number=mobile
-            )
-        except Booking.DoesNotExist:
+        from bookings.models import Booking, WorkAssignment
+        bookings = Booking.objects.select_related('vehicle', 'service_center').prefetch_related(
+            Prefetch('work_assignments', WorkAssignment.objects.select_related('worker__user')),
+        ).filter(
+            booking_id=booking_id,
+            customer__mobile_number=mobile
+        )
+        if shards.enabled():
+            # The booking id does not say which state it was made in
+            found = await sync_to_async(shards.fan_out)(lambda: bookings[:1])
+            booking = found[0] if found else None
+        else:
+            booking = await bookings.afirst()
+        if booking is None:
             messages.error(request, 'Booking not found. Please check your Booking ID and Mobile Number.')
 
-    return render(request, 'core/track_service.html', {'booking': booking})
+    live_token = None
+    if booking is not None:
+        from bookings.live import page_token
+        live_token = page_token(request, booking)
+    return await arender(request, 'core/track_service.html', {'booking': booking, 'live_token': live_token})
 
 
+@catalog_conditional('holidays', daily=True)
+@read_replica
 def holidays(request):
-    current_year = timezone.now().year
-    all_holidays = Holiday.objects.filter(date__year=current_year).order_by('date')
-    return render(request, 'core/holidays.html', {'holidays': all_holidays, 'year': current_year})
+    today = timezone.localdate()
+    all_holidays = Holiday.objects.filter(date__year=today.year).order_by('date')
+    return render(request, 'core/holidays.html', {'holidays': all_holidays, 'year': today.year, 'today': today})
+
+
+@catalog_conditional('centers_api', html=False)
+async def get_centers_api(request):
+    return JsonResponse({'centers': list((await aget_catalog()).api_centers)})
 
 
-def get_centers_api(request):
-    centers = ServiceCenter.objects.filter(is_active=True).values(
-        'id', 'name', 'city', 'address', 'phone', 'latitude', 'longitude',
-        'working_hours', 'working_days'
-    )
-    return JsonResponse({'centers': list(centers)})
+def metrics(request):
+    """Prometheus scrape endpoint: staff sessions, or `Authorization: Bearer <METRICS_TOKEN>`."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    bearer = request.META.get('HTTP_AUTHORIZATION', '').removeprefix('Bearer ').strip()
+    allowed = request.user.is_authenticated and (request.user.is_staff or request.principal.role == 'admin')
+    if not allowed and not (token and constant_time_compare(bearer, token)):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 def custom_404(request, exception):
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['customer', 'created_at'], name='payment_customer_created_idx'),
+        ),
+    ]
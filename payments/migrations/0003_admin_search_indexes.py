@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:25
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(django.db.models.functions.comparison.Collate('receipt_number', 'NOCASE'), name='payment_receipt_nocase_idx'),
+        ),
+    ]
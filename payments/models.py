@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Collate
 import uuid
 
 
@@ -54,6 +55,12 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # My payments, newest first
+            models.Index(fields=['customer', 'created_at'], name='payment_customer_created_idx'),
+            # Admin search by receipt number prefix (see core.admin_tools)
+            models.Index(Collate('receipt_number', 'NOCASE'), name='payment_receipt_nocase_idx'),
+        ]
 
     def __str__(self):
         return f"{self.receipt_number} — ₹{self.total_amount}"
@@ -1,29 +1,43 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.utils import timezone
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import Http404, JsonResponse
 from decimal import Decimal
 
 from .models import Payment
+from bookings import archive, events
 from bookings.models import Booking, RepairCharge
 from accounts.models import Notification
+from core import images
+from core.async_utils import alogin_required, arequire_POST, get_user
 from core.models import ServiceCenter
+from accounts.decorators import employee_required
+from smart_repair import shards
 
 
-def _get_employee(user):
-    try:
-        return user.employee_profile
-    except Exception:
-        return None
+def _charges_for(booking):
+    return (RepairCharge.objects.filter(booking=booking)
+            .select_related('repair_issue').order_by('charge_type', 'added_at'))
+
+
+def _get_booking(pk):
+    return get_object_or_404(Booking.objects.select_related('customer', 'vehicle', 'service_center'), pk=pk)
+
+
+def _get_employee(request):
+    return request.principal.employee
 
 
 def _build_totals(charges):
-    selected = charges.filter(charge_type__in=['selected', 'diagnosed', 'service'])
-    extra    = charges.filter(is_extra=True)
-    parts    = charges.filter(charge_type='parts')
-    labour   = charges.filter(charge_type='labour')
+    # One query for all charges, split in Python (a charge can be both selected-type and extra)
+    charges  = list(charges)
+    selected = [c for c in charges if c.charge_type in ('selected', 'diagnosed', 'service')]
+    extra    = [c for c in charges if c.is_extra]
+    parts    = [c for c in charges if c.charge_type == 'parts']
+    labour   = [c for c in charges if c.charge_type == 'labour']
 
     issue_total  = sum(c.total for c in selected)
     extra_total  = sum(c.total for c in extra)
@@ -48,15 +62,13 @@ def _build_totals(charges):
     }
 
 
-@login_required
+@employee_required
 def create_bill(request, pk):
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
-    booking = get_object_or_404(Booking, pk=pk)
-    charges = RepairCharge.objects.filter(booking=booking).order_by('charge_type', 'added_at')
+    booking = _get_booking(pk)
+    charges = _charges_for(booking)
 
-    if not charges.exists():
-        emp = _get_employee(request.user)
+    if not charges:
+        emp = _get_employee(request)
         for issue in booking.selected_issues.all():
             RepairCharge.objects.create(
                 booking=booking, repair_issue=issue, charge_type='selected',
@@ -69,7 +81,7 @@ def create_bill(request, pk):
                 description=stype.name, quantity=1,
                 unit_price=stype.base_price, is_extra=False, added_by=emp,
             )
-        charges = RepairCharge.objects.filter(booking=booking).order_by('charge_type', 'added_at')
+        charges = _charges_for(booking)
 
     totals = _build_totals(charges)
     return render(request, 'payments/create_bill.html', {
@@ -77,12 +89,10 @@ def create_bill(request, pk):
     })
 
 
-@login_required
+@employee_required
 def finalize_payment(request, pk):
-    if request.user.role not in ['employee', 'admin']:
-        return redirect('home')
-    booking  = get_object_or_404(Booking, pk=pk)
-    charges  = RepairCharge.objects.filter(booking=booking)
+    booking  = _get_booking(pk)
+    charges  = _charges_for(booking)
     totals   = _build_totals(charges)
     discount = Decimal(request.POST.get('discount', '0') or '0')
     method   = request.POST.get('payment_method', 'cash')
@@ -104,10 +114,11 @@ def finalize_payment(request, pk):
             'payment_method':      method,
             'payment_status':      'paid',
             'paid_at':             timezone.now(),
-            'billed_by':           _get_employee(request.user),
+            'billed_by':           _get_employee(request),
             'notes':               notes,
         }
     )
+    events.record(booking, 'paid', request.user, method=method, amount=final)
     Notification.objects.create(
         user=booking.customer,
         title='💳 Payment Receipt Ready',
@@ -120,12 +131,15 @@ def finalize_payment(request, pk):
 
 @login_required
 def view_receipt(request, pk):
-    payment = get_object_or_404(Payment, pk=pk)
-    if request.user != payment.customer and request.user.role not in ['employee', 'admin']:
+    # Receipts of archived bookings stay readable under their original URL
+    payment = archive.get_payment(pk)
+    if payment is None:
+        raise Http404('No Payment matches the given query.')
+    if request.user.pk != payment.customer_id and request.user.role not in ['employee', 'admin']:
         messages.error(request, 'Access denied.')
         return redirect('home')
     booking = payment.booking
-    charges = RepairCharge.objects.filter(booking=booking).order_by('charge_type', 'added_at')
+    charges = booking.repair_charges.all() if getattr(payment, 'archived', False) else _charges_for(booking)
     totals  = _build_totals(charges)
     return render(request, 'payments/receipt.html', {
         'payment': payment, 'booking': booking, 'charges': charges, **totals,
@@ -137,13 +151,13 @@ def view_receipt(request, pk):
 # ──────────────────────────────────────────────────────────────────────
 @login_required
 def online_payment(request, pk):
-    booking = get_object_or_404(Booking, pk=pk)
-    if request.user != booking.customer and request.user.role not in ['employee', 'admin']:
+    booking = _get_booking(pk)
+    if request.user.pk != booking.customer_id and request.user.role not in ['employee', 'admin']:
         messages.error(request, 'Access denied.')
         return redirect('home')
 
-    charges = RepairCharge.objects.filter(booking=booking)
-    if not charges.exists():
+    charges = _charges_for(booking)
+    if not charges:
         messages.warning(request, 'No charges added yet. Please check with service center.')
         return redirect('booking_detail', pk=pk)
 
@@ -157,18 +171,21 @@ def online_payment(request, pk):
     })
 
 
-@login_required
-@require_POST
-def confirm_online_payment(request, pk):
+@alogin_required
+@arequire_POST
+async def confirm_online_payment(request, pk):
     """
     AJAX endpoint — called after customer confirms payment on the QR page.
     Creates/updates the Payment record and returns JSON with receipt URL.
     """
-    booking = get_object_or_404(Booking, pk=pk)
-    if request.user != booking.customer and request.user.role not in ['employee', 'admin']:
+    booking = await Booking.objects.select_related('customer', 'vehicle', 'service_center').filter(pk=pk).afirst()
+    if booking is None:
+        raise Http404('No Booking matches the given query.')
+    user = await get_user(request)
+    if user.pk != booking.customer_id and user.role not in ['employee', 'admin']:
         return JsonResponse({'success': False, 'error': 'Access denied.'}, status=403)
 
-    charges  = RepairCharge.objects.filter(booking=booking)
+    charges  = [charge async for charge in _charges_for(booking)]
     totals   = _build_totals(charges)
     upi_ref  = request.POST.get('upi_reference', '').strip()
     discount = Decimal(request.POST.get('discount', '0') or '0')
@@ -177,7 +194,7 @@ def confirm_online_payment(request, pk):
     if not upi_ref:
         return JsonResponse({'success': False, 'error': 'Please enter the UPI transaction reference number.'})
 
-    payment, _ = Payment.objects.update_or_create(
+    payment, _ = await Payment.objects.aupdate_or_create(
         booking=booking,
         defaults={
             'customer':            booking.customer,
@@ -195,7 +212,8 @@ def confirm_online_payment(request, pk):
             'paid_at':             timezone.now(),
         }
     )
-    Notification.objects.create(
+    await sync_to_async(events.record)(booking, 'paid', user, method='online', amount=final)
+    await Notification.objects.acreate(
         user=booking.customer,
         title='✅ Online Payment Confirmed',
         message=(f'UPI payment ₹{final:.2f} confirmed for booking {booking.booking_id}. '
@@ -217,14 +235,9 @@ def confirm_online_payment(request, pk):
 # ──────────────────────────────────────────────────────────────────────
 # EMPLOYEE — Upload/Update QR code for their service center
 # ──────────────────────────────────────────────────────────────────────
-@login_required
+@employee_required(denied_message='Access denied.')
 def upload_qr_code(request):
-    if request.user.role not in ['employee', 'admin']:
-        messages.error(request, 'Access denied.')
-        return redirect('home')
-
-    emp = _get_employee(request.user)
-    center = emp.service_center if emp else None
+    center = request.principal.center
 
     # Admin can select any center
     if request.user.role == 'admin' and request.GET.get('center'):
@@ -240,18 +253,15 @@ def upload_qr_code(request):
 
         if upi_id:
             center.upi_id = upi_id
+        replaced = None
         if qr_file:
-            # Delete old QR if exists
-            if center.payment_qr_code:
-                try:
-                    import os
-                    if os.path.exists(center.payment_qr_code.path):
-                        os.remove(center.payment_qr_code.path)
-                except Exception:
-                    pass
+            # The new upload gets its own name; the old file stays until the row points away from it
+            replaced = center.payment_qr_code.name
             center.payment_qr_code = qr_file
 
         center.save()
+        if replaced:
+            transaction.on_commit(lambda: images.discard(replaced))
         messages.success(request, f'✅ Payment QR code updated for {center.name}!')
         return redirect('upload_qr_code')
 
@@ -266,5 +276,9 @@ def upload_qr_code(request):
 
 @login_required
 def my_payments(request):
-    payments = Payment.objects.filter(customer=request.user).order_by('-created_at')
+    payments = shards.fan_out(
+        lambda: Payment.objects.filter(customer=request.user).select_related('booking').order_by('-created_at'),
+        key=lambda p: p.created_at, reverse=True,
+    )
+    payments += sorted(archive.archived_payments(request.user), key=lambda p: p.created_at, reverse=True)
     return render(request, 'payments/my_payments.html', {'payments': payments})
@@ -0,0 +1,13 @@
+"""
+ASGI entry point, e.g.
+    uvicorn smart_repair.asgi:application --workers 2
+The polling/JSON endpoints (slots, centers, track_service, resend_otp and
+confirm_online_payment) are async views here, and booking_live's event streams are
+coroutines rather than a thread each; everything else runs in Django's thread pool
+exactly as under smart_repair/wsgi.py.
+"""
+import os
+from django.core.asgi import get_asgi_application
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_repair.settings')
+os.environ['DJANGO_ASGI'] = '1'
+application = get_asgi_application()
@@ -0,0 +1,60 @@
+"""
+Database profiles for the single-node SQLite deployment.
+
+  stock       — Django's defaults: rollback journal, a new connection per request,
+                deferred transactions. Kept for comparison and for debugging.
+  production  — WAL (readers never block on the writer), synchronous=NORMAL (safe
+                in WAL, fsync only at checkpoints), a larger page cache and mmap,
+                persistent connections, and IMMEDIATE write transactions with a
+                busy timeout long enough to ride out a morning booking rush.
+
+Pick one with the DATABASE_PROFILE environment variable; the default is 'production',
+or 'stock' while DEBUG is on.
+"""
+
+PROFILES = {
+    'stock': {
+        'ENGINE': 'django.db.backends.sqlite3',
+    },
+    'production': {
+        'ENGINE': 'smart_repair.sqlite_backend',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 20,  # seconds a writer waits for the lock before "database is locked"
+            'immediate_transactions': True,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'cache_size': -20000,      # KiB, i.e. ~20 MB of page cache per connection
+                'mmap_size': 268435456,    # 256 MB
+                'temp_store': 'MEMORY',
+            },
+        },
+    },
+}
+
+
+def sqlite_database(name, profile='production'):
+    """A DATABASES entry for the SQLite file `name` under the given profile."""
+    try:
+        config = PROFILES[profile]
+    except KeyError:
+        raise ValueError(f'Unknown DATABASE_PROFILE {profile!r}; expected one of {", ".join(PROFILES)}')
+    options = dict(config.get('OPTIONS', {}))
+    if 'pragmas' in options:
+        options['pragmas'] = dict(options['pragmas'])
+    return {**config, 'NAME': name, 'OPTIONS': options}
+
+
+def shard_database(name, profile='production', primary='default'):
+    """
+    A DATABASES entry for a state shard (smart_repair/shards.py). The shard file holds
+    only the center-scoped tables and attaches `primary` for everything else; foreign
+    keys to users, vehicles and centers cannot be checked across files, so they are off.
+    """
+    database = sqlite_database(name, profile)
+    database['ENGINE'] = 'smart_repair.sqlite_backend'
+    database['OPTIONS'].setdefault('pragmas', {})['foreign_keys'] = 'OFF'
+    database['OPTIONS']['attach'] = {'global': primary}
+    return database
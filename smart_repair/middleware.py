@@ -0,0 +1,128 @@
+from urllib.parse import parse_qs, urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import QueryDict
+from django.urls import Resolver404, resolve
+
+from . import shards
+from .routers import RoutingState, _state, replica_configured, routing_state
+
+PIN_COOKIE = 'db_pin'
+# URL kwargs holding the id of a booking, charge or payment (or an admin object)
+SHARD_KWARGS = ('pk', 'charge_pk', 'object_id')
+
+
+class ReplicaPinMiddleware:
+    """
+    Fresh routing state per request; clients that wrote recently are pinned to the
+    primary via a short-lived cookie. Admin changelist GETs read from the replica.
+    Place it before SessionMiddleware so the session save counts as a write.
+    """
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _state.set(RoutingState(pinned=PIN_COOKIE in request.COOKIES))
+        try:
+            response = self.get_response(request)
+            self._pin(response)
+        finally:
+            _state.reset(token)
+        return response
+
+    async def __acall__(self, request):
+        # The context variable is copied into sync_to_async threads, so the router still sees it
+        token = _state.set(RoutingState(pinned=PIN_COOKIE in request.COOKIES))
+        try:
+            response = await self.get_response(request)
+            self._pin(response)
+        finally:
+            _state.reset(token)
+        return response
+
+    def _pin(self, response):
+        if _state.get().wrote and replica_configured():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 5),
+                httponly=True, samesite='Lax',
+            )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (request.method in ('GET', 'HEAD') and match and match.namespace == 'admin'
+                and (match.url_name or '').endswith('_changelist')):
+            _state.get().use_replica = True
+
+
+class ShardMiddleware:
+    """
+    Picks the state shard for a request's center-scoped queries (smart_repair/shards.py):
+    the shard an id in the URL belongs to, else — worked out only if a query needs it —
+    in the admin the one its shard filter chose, elsewhere the signed-in employee's
+    center's shard. Must come after PrincipalMiddleware. Without DATABASE_SHARDS it
+    takes itself out of the stack.
+    """
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        if not shards.enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        return self.get_response(request)  # a coroutine under ASGI, awaited by the caller
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        for name in SHARD_KWARGS:
+            alias = shards.for_pk(view_kwargs[name]) if name in view_kwargs else None
+            if alias:
+                shards.select(alias)
+                return None
+        match = request.resolver_match
+        if match and match.namespace == 'admin':
+            routing_state().shard_resolver = lambda: _admin_shard(request)
+        else:
+            routing_state().shard_resolver = lambda: _employee_shard(request)
+        return None
+
+
+def _employee_shard(request):
+    center = request.principal.center
+    return shards.for_center(center.pk) if center is not None else None
+
+
+def _admin_shard(request):
+    """
+    ?shard= on a changelist, or carried in the _changelist_filters of the add page it
+    links to, or on the page an autocomplete widget asks from; else the first shard.
+    """
+    alias = _shard_in(request.GET)
+    if alias is None and 'HTTP_REFERER' in request.META:
+        referer = urlsplit(request.META['HTTP_REFERER'])
+        alias = _shard_in(QueryDict(referer.query))
+        if alias is None:
+            try:
+                object_id = resolve(referer.path).kwargs.get('object_id')
+            except Resolver404:
+                object_id = None
+            alias = shards.for_pk(object_id) if object_id else None
+    return alias if alias in shards.each() else shards.aliases()[0]
+
+
+def _shard_in(query):
+    if shards.ADMIN_PARAM in query:
+        return query[shards.ADMIN_PARAM]
+    filters = parse_qs(query.get('_changelist_filters', ''))
+    return filters[shards.ADMIN_PARAM][0] if shards.ADMIN_PARAM in filters else None
@@ -0,0 +1,109 @@
+"""
+Read-replica routing.
+
+Reads go to the replica only inside an opt-in scope — views wrapped in
+@read_replica (catalog pages, exports, reports) and admin changelists — and only
+until the request writes anything. After a write the request stays on the primary,
+and ReplicaPinMiddleware pins the client there for REPLICA_PIN_SECONDS so the page
+after a POST/redirect sees what was just saved. Sessions, auth and the catalog
+version row are always read from the primary.
+
+With no 'replica' entry in DATABASES every read goes to 'default', unchanged.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY_ALIAS = 'default'
+REPLICA_ALIAS = 'replica'
+PRIMARY_ONLY = ('sessions', 'auth', 'contenttypes', 'admin', 'core.catalogversion')
+
+
+class RoutingState:
+    __slots__ = ('use_replica', 'pinned', 'wrote', 'shard', 'shard_resolver')
+
+    def __init__(self, pinned=False):
+        self.use_replica = False
+        self.pinned = pinned
+        self.wrote = False
+        # State shard for center-scoped models, or a callable that picks it on first use
+        self.shard = None
+        self.shard_resolver = None
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def routing_state():
+    state = _state.get()
+    if state is None:
+        state = RoutingState()
+        _state.set(state)
+    return state
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _primary_only(model):
+    meta = model._meta
+    return meta.app_label in PRIMARY_ONLY or meta.label_lower in PRIMARY_ONLY
+
+
+@contextmanager
+def replica_reads():
+    """Let reads in this block use the replica (unless the request is pinned)."""
+    state = routing_state()
+    previous, state.use_replica = state.use_replica, True
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+
+
+@contextmanager
+def primary_reads():
+    """Force reads in this block onto the primary, e.g. to rebuild a shared cache."""
+    state = routing_state()
+    previous, state.use_replica = state.use_replica, False
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+
+
+def read_replica(view_func):
+    """Serve this read-only view from the replica when one is configured."""
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        with replica_reads():
+            return view_func(request, *args, **kwargs)
+    return _wrapped
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = routing_state()
+        if state.use_replica and not state.pinned and replica_configured() and not _primary_only(model):
+            return REPLICA_ALIAS
+        return PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Read-your-writes: once this request writes, its remaining reads stay on the primary
+        state = routing_state()
+        state.pinned = state.wrote = True
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = (PRIMARY_ALIAS, REPLICA_ALIAS)
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a byte copy of the primary (refresh_replica), never migrated itself
+        return db != REPLICA_ALIAS
@@ -6,6 +6,8 @@ Settings Configuration
 from pathlib import Path
 import os
 
+from .db_profiles import shard_database, sqlite_database
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'smart-repair-secret-key-change-in-production-2024'
@@ -50,23 +52,35 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'smart_repair.staticfiles.StaticFilesMiddleware',
+    'smart_repair.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.PrincipalMiddleware',
+    'smart_repair.middleware.ShardMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'smart_repair.urls'
 
+# Templates are parsed once per process by the cached loader. In development Django's
+# autoreloader empties it whenever a template file changes, so edits still show up.
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -78,14 +92,97 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'smart_repair.wsgi.application'
+ASGI_APPLICATION = 'smart_repair.asgi.application'
+
+# 'production' (WAL, pragmas, persistent connections) or 'stock' — see smart_repair/db_profiles.py.
+# With DEBUG on the default is 'stock': WAL mode is written into the database file, and the
+# development db.sqlite3 is tracked in git.
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'stock' if DEBUG else 'production')
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': sqlite_database(BASE_DIR / 'db.sqlite3', DATABASE_PROFILE),
+}
+
+# Optional read replica: a second SQLite file kept fresh by `manage.py refresh_replica`
+DATABASE_REPLICA_NAME = os.environ.get('DATABASE_REPLICA_NAME')
+if DATABASE_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **sqlite_database(DATABASE_REPLICA_NAME, DATABASE_PROFILE),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Optional state shards: DATABASE_SHARDS="AP=/data/ap.sqlite3,TS=/data/ts.sqlite3" keeps each
+# state's slots, bookings, charges and payments in its own SQLite file with its own write
+# lock (see smart_repair/shards.py). Append new states at the end: a shard's position
+# fixes the id range of its rows. Unset, everything stays in 'default'.
+DATABASE_SHARDS = {}
+for entry in filter(None, os.environ.get('DATABASE_SHARDS', '').split(',')):
+    state, name = (part.strip() for part in entry.split('=', 1))
+    DATABASES[f'shard_{state.lower()}'] = shard_database(name, DATABASE_PROFILE)
+    DATABASE_SHARDS[state.upper()] = f'shard_{state.lower()}'
+
+# Under ASGI each request gets its own connection objects, so persistent connections
+# would pile up instead of being reused (smart_repair/asgi.py sets DJANGO_ASGI)
+if os.environ.get('DJANGO_ASGI') == '1':
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 0
+
+DATABASE_ROUTERS = ['smart_repair.shards.ShardRouter', 'smart_repair.routers.ReplicaRouter']
+
+# Seconds a client stays on the primary after writing, so it reads its own writes
+REPLICA_PIN_SECONDS = 5
+
+# Completed/cancelled bookings untouched this many days are moved to the archive table
+# by `manage.py archive_bookings` (see bookings/archive.py)
+BOOKING_ARCHIVE_AFTER_DAYS = 365
+
+# Shared cache. Local memory is fine for a single process; point REDIS_URL at a
+# Redis server when running several workers so they see the same entries.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
     }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'smart-repair',
+        }
+    }
+
+# Seconds a resolved employee/center principal stays cached (invalidated on Employee changes)
+PRINCIPAL_CACHE_TIMEOUT = 60
+
+# Seconds a worker trusts its cached catalog version before re-reading the
+# CatalogVersion row (see core/catalog.py). With a shared cache, bumps are seen at once.
+CATALOG_VERSION_TTL = 5
+
+# Seconds the rendered home page and its fragments stay cached. Entries are keyed by
+# catalog version and date, so center/service/holiday edits show up immediately anyway.
+HOME_CACHE_TIMEOUT = 3600
+
+# Seconds cached fragments of staff pages (issue lists, center worker lists) live. Keys
+# carry the catalog / center staff version; staff versions live in the cache, so with
+# several workers point REDIS_URL at a shared cache for edits to reach them all at once.
+FRAGMENT_CACHE_TIMEOUT = 300
+
+# Sliding-window limits for OTP sends (see core/ratelimit.py). 'mobile' is per number
+# and purpose, 'ip' is per client across purposes.
+RATELIMIT_ENABLE = os.environ.get('RATELIMIT_ENABLE', '1') != '0'   # load tests run with 0
+RATELIMIT_TRUST_X_FORWARDED_FOR = False   # set True only behind a trusted proxy
+RATELIMITS = {
+    'otp_send': {'mobile': '5/15m', 'ip': '30/h'},
 }
 
+# SMS delivery for OTPs and notifications (see accounts/sms.py)
+SMS_BACKEND = os.environ.get('SMS_BACKEND', 'accounts.sms.ConsoleBackend')
+
+# Lets a Prometheus scraper read /metrics/ without a staff session (empty = staff only)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -95,7 +192,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Asia/Kolkata'
-USE_I18N = True
+USE_I18N = False  # English only; skips loading every app's translation catalogs at startup
 USE_TZ = True
 
 STATIC_URL = '/static/'
@@ -105,6 +202,21 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# collectstatic writes hashed names plus .gz/.br copies (brotli needs `pip install brotli`)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'smart_repair.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+
+# Serve STATIC_ROOT and MEDIA_ROOT from the app when there is no front proxy (see
+# smart_repair/staticfiles.py). Hashed files are cached for a year; others for STATIC_MAX_AGE.
+SERVE_STATIC = os.environ.get('SERVE_STATIC', '0' if DEBUG else '1') == '1'
+STATIC_MAX_AGE = 60
+
+# Threads per process that resize uploaded images (see core/images.py). Set 0 when
+# `manage.py build_image_derivatives --every N` runs as a separate worker.
+IMAGE_WORKER_THREADS = int(os.environ.get('IMAGE_WORKER_THREADS', '1'))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.User'
@@ -0,0 +1,234 @@
+"""
+State-level sharding of the center-scoped tables.
+
+No booking ever spans centers and every center is in one state, so the time slots,
+bookings, repair charges, work assignments, service records, payments, archived
+bookings, booking events and timelines and the sync change feed of a state's centers
+can live in that state's own SQLite file (DATABASE_SHARDS in settings), each with its
+own write lock. Users, vehicles, employees and the catalog stay in 'default', which
+every shard attaches, so the usual select_related joins keep working.
+
+Rows of the Nth shard get ids from N × PK_STRIDE up, so an id in a URL names its
+shard; rows still in 'default' (ids below PK_STRIDE) stay reachable. A query on a
+center-scoped model goes to:
+
+  the shard it was loaded from     — saved rows, related managers, prefetches
+  its center's or booking's shard  — new rows
+  the request's shard              — ShardMiddleware takes it from a pk in the URL,
+                                     else ?shard= in the admin (ADMIN_PARAM), else the
+                                     signed-in employee's center; views that know the
+                                     center call select(); scripts use_shard()
+  every shard                      — customer-wide lists, through fan_out()
+
+A center-scoped query with none of these raises ShardNotSelected instead of reading
+the wrong file. With DATABASE_SHARDS empty, routing is unchanged.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+
+from .routers import PRIMARY_ALIAS, routing_state
+
+SHARDED_MODELS = frozenset({
+    'bookings.timeslot', 'bookings.booking', 'bookings.repaircharge', 'bookings.workassignment',
+    'bookings.servicerecord', 'bookings.archivedbooking', 'bookings.bookingevent', 'bookings.bookingtimeline',
+    'bookings.syncchange', 'payments.payment', 'payments.servicecharge',
+})
+PK_STRIDE = 10 ** 12
+# The admin's changelist filter picking which database a sharded table is listed from
+ADMIN_PARAM = 'shard'
+
+
+class ShardNotSelected(RuntimeError):
+    pass
+
+
+def shard_map():
+    """{state: alias}, in configuration order."""
+    return getattr(settings, 'DATABASE_SHARDS', {})
+
+
+def enabled():
+    return bool(shard_map())
+
+
+def aliases():
+    return list(shard_map().values())
+
+
+def each():
+    """Every database that can hold center-scoped rows: 'default', then the shards."""
+    return [PRIMARY_ALIAS, *aliases()]
+
+
+def label(alias):
+    """What the admin calls a database: its states, or 'Primary' for 'default'."""
+    states = [state for state, shard in shard_map().items() if shard == alias]
+    return ', '.join(states) if states else 'Primary'
+
+
+def is_sharded(model):
+    """For a model class or instance."""
+    meta = model._meta
+    if meta.auto_created:  # the through table of a many-to-many field
+        meta = meta.auto_created._meta
+    return meta.label_lower in SHARDED_MODELS
+
+
+# ── Which shard ──────────────────────────────────────────────────────
+
+def pk_base(alias):
+    """Ids in `alias` start after this; 0 for 'default'."""
+    return 0 if alias == PRIMARY_ALIAS else (aliases().index(alias) + 1) * PK_STRIDE
+
+
+def for_pk(pk):
+    try:
+        index = int(pk) // PK_STRIDE
+    except (TypeError, ValueError):
+        return None
+    return each()[index] if 0 <= index <= len(aliases()) else None
+
+
+def for_state(state):
+    """The shard of a state; 'default' for states without one."""
+    return shard_map().get(state, PRIMARY_ALIAS)
+
+
+def for_center(center_id):
+    """The shard of the center's state, looked up in the catalog snapshot."""
+    if not enabled():
+        return PRIMARY_ALIAS
+    from core.catalog import get_catalog
+    try:
+        center = get_catalog().center_by_id[int(center_id)]
+    except (KeyError, TypeError, ValueError):
+        return None
+    return for_state(center.state)
+
+
+def for_instance(instance):
+    """The database a center-scoped row lives in, or will once saved."""
+    if instance._state.db and not instance._state.adding:
+        return instance._state.db
+    center_id = getattr(instance, 'service_center_id', None)
+    if center_id is not None:
+        return for_center(center_id)
+    for field in instance._meta.concrete_fields:
+        if field.is_relation and is_sharded(field.related_model):
+            related = field.get_cached_value(instance, None)
+            if related is not None:
+                return for_instance(related)
+            if getattr(instance, field.attname) is not None:
+                return for_pk(getattr(instance, field.attname))
+    return for_pk(instance.pk) if instance.pk is not None else None
+
+
+# ── The request's shard ──────────────────────────────────────────────
+
+def current():
+    state = routing_state()
+    if state.shard is None and state.shard_resolver is not None:
+        resolver, state.shard_resolver = state.shard_resolver, None
+        state.shard = resolver()
+    return state.shard
+
+
+def select(alias):
+    """Send this request's center-scoped queries to `alias` from here on."""
+    routing_state().shard = alias
+
+
+@contextmanager
+def use_shard(alias):
+    state = routing_state()
+    previous, state.shard = state.shard, alias
+    try:
+        yield
+    finally:
+        state.shard = previous
+
+
+def fan_out(build, key=None, reverse=False):
+    """
+    Evaluate `build()` — a queryset, or anything iterable — against every database in
+    each() and return the rows as one list, sorted by `key` when given. Without shards
+    it is list(build()), in the queryset's own order.
+    """
+    if not enabled():
+        return list(build())
+    rows = []
+    for alias in each():
+        with use_shard(alias):
+            result = build()
+            # A queryset built once outside the lambda would replay its first result cache
+            rows += result.all() if isinstance(result, QuerySet) else result
+    if key is not None:
+        rows.sort(key=key, reverse=reverse)
+    return rows
+
+
+def start_sequences(using):
+    """Move the shard's AUTOINCREMENT counters to the start of its id range (post_migrate)."""
+    if using not in aliases():
+        return
+    from django.apps import apps
+    base = pk_base(using)
+    tables = [m._meta.db_table for m in apps.get_models(include_auto_created=True) if is_sharded(m)]
+    with connections[using].cursor() as cursor:
+        for table in tables:
+            cursor.execute('UPDATE sqlite_sequence SET seq = %s WHERE name = %s AND seq < %s', [base, table, base])
+            cursor.execute(
+                'INSERT INTO sqlite_sequence (name, seq) SELECT %s, %s '
+                'WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)',
+                [table, base, table],
+            )
+
+
+# ── Router ───────────────────────────────────────────────────────────
+
+class ShardRouter:
+    """Center-scoped models to their state's shard; everything else on to ReplicaRouter."""
+
+    def _route(self, model, hints, write):
+        if not enabled() or not is_sharded(model):
+            return None
+        instance = hints.get('instance')
+        if instance is not None and is_sharded(instance):  # may be a lazy request.user
+            alias = for_instance(instance)
+            if alias:
+                return alias
+        alias = current()
+        if alias:
+            return alias
+        if write and instance is not None:
+            # A user or vehicle assigned to an unsaved row: save() routes the row itself
+            return None
+        raise ShardNotSelected(
+            f'No shard selected for {model._meta.label}: use shards.select(), use_shard() or fan_out().'
+        )
+
+    def db_for_read(self, model, **hints):
+        return self._route(model, hints, write=False)
+
+    def db_for_write(self, model, **hints):
+        alias = self._route(model, hints, write=True)
+        if alias is not None:
+            state = routing_state()
+            state.pinned = state.wrote = True
+        return alias
+
+    def allow_relation(self, obj1, obj2, **hints):
+        shards = aliases()
+        if obj1._state.db in shards or obj2._state.db in shards:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Shards hold only the center-scoped tables; the rest resolves to the attached primary
+        if db not in aliases():
+            return None
+        model = hints.get('model')
+        return model is not None and is_sharded(model)
@@ -0,0 +1,194 @@
+"""
+Production static assets: hashed, precompressed at collectstatic time, served with
+long-lived cache headers.
+
+`CompressedManifestStaticFilesStorage` writes `name.<hash>.ext` copies plus `.gz` (and
+`.br` when the optional `brotli` package is installed) next to every text asset.
+`StaticFilesMiddleware` serves STATIC_ROOT from an in-memory index built at startup,
+picking the best encoding the client accepts; hashed names are immutable for a year,
+so a repeat visit only fetches the HTML. Media uploads are served from MEDIA_ROOT with
+ETag revalidation, since their contents can change under the same name.
+"""
+import gzip
+import mimetypes
+import os
+from email.utils import formatdate
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, StaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone still covers every browser
+    brotli = None
+
+COMPRESSIBLE = {'.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.map', '.ico'}
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE = 'public, max-age=31536000, immutable'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def url(self, name, force=False):
+        # Before the first collectstatic there is no manifest: link the plain names
+        # rather than fail every {% static %} with a ValueError
+        if not self.hashed_files and not force:
+            return StaticFilesStorage.url(self, name)
+        return super().url(name, force)
+
+    def post_process(self, *args, **kwargs):
+        yield from super().post_process(*args, **kwargs)
+        for name in {*self.hashed_files.keys(), *self.hashed_files.values()}:
+            if Path(name).suffix.lower() in COMPRESSIBLE and self.exists(name):
+                for compressed in self._compress(name):
+                    yield name, compressed, True
+
+    def _compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data)))
+        for suffix, payload in variants:
+            if len(payload) < len(data) * 0.95:  # not worth a second file otherwise
+                with open(path + suffix, 'wb') as f:
+                    f.write(payload)
+                yield name + suffix
+
+
+class StaticFile:
+    __slots__ = ('path', 'content_type', 'last_modified', 'variants')
+
+    def __init__(self, path):
+        self.path = path
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        stat = os.stat(path)
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        # encoding → (file, size, etag); '' is the uncompressed original
+        self.variants = {'': (path, stat.st_size, f'"{int(stat.st_mtime):x}-{stat.st_size:x}"')}
+        for encoding, suffix in ENCODINGS:
+            if os.path.isfile(path + suffix):
+                size = os.path.getsize(path + suffix)
+                self.variants[encoding] = (path + suffix, size, f'"{int(stat.st_mtime):x}-{size:x}-{encoding}"')
+
+    def pick(self, accept_encoding):
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding, self.variants[encoding]
+        return '', self.variants['']
+
+
+def _accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header; 'br;q=0' means the client refuses br."""
+    accepted = {}
+    for item in header.lower().split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def _serve(request, static_file, cache_control):
+    encoding, (path, size, etag) = static_file.pick(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=static_file.content_type)
+        response['Content-Length'] = size
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = static_file.last_modified
+    response['Cache-Control'] = cache_control
+    if len(static_file.variants) > 1:
+        response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected static files and media uploads without a front proxy. On when
+    SERVE_STATIC is set (default: whenever DEBUG is off). Place it right after
+    SecurityMiddleware so asset requests skip sessions, auth and CSRF.
+    """
+
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVE_STATIC', not settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.static_prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+        self.media_prefix = settings.MEDIA_URL if settings.MEDIA_URL.startswith('/') else '/' + settings.MEDIA_URL
+        self.max_age = getattr(settings, 'STATIC_MAX_AGE', 60)
+        hashed = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        self.files = {}
+        self.immutable = set()
+        root = str(settings.STATIC_ROOT)
+        for directory, _, names in os.walk(root):
+            for filename in names:
+                if filename.endswith(('.gz', '.br')):
+                    continue
+                name = os.path.relpath(os.path.join(directory, filename), root).replace(os.sep, '/')
+                self.files[name] = StaticFile(os.path.join(directory, filename))
+                if name in hashed:
+                    self.immutable.add(name)
+
+    def __call__(self, request):
+        response = self._match(request)
+        if response is not None:
+            if iscoroutinefunction(self):
+                return self._ready(response)
+            return response
+        return self.get_response(request)
+
+    async def _ready(self, response):
+        # File bodies are read lazily by the ASGI handler in a thread; nothing here blocks
+        return response
+
+    def _match(self, request):
+        if request.method in ('GET', 'HEAD'):
+            if request.path_info.startswith(self.static_prefix):
+                name = request.path_info[len(self.static_prefix):]
+                static_file = self.files.get(name)
+                if static_file is not None:
+                    request.metrics_label = 'static'
+                    cache_control = IMMUTABLE if name in self.immutable else f'public, max-age={self.max_age}'
+                    return _serve(request, static_file, cache_control)
+            elif request.path_info.startswith(self.media_prefix):
+                response = self._serve_media(request, request.path_info[len(self.media_prefix):])
+                if response is not None:
+                    request.metrics_label = 'media'
+                    return response
+        return None
+
+    def _serve_media(self, request, name):
+        try:
+            path = safe_join(settings.MEDIA_ROOT, name)
+        except ValueError:  # '..' escaping MEDIA_ROOT
+            return None
+        if not os.path.isfile(path):
+            return None
+        # Uploads can be replaced in place (e.g. a center's payment QR), so always revalidate
+        return _serve(request, StaticFile(path), 'no-cache')
@@ -10,8 +10,7 @@ urlpatterns = [
     path('services/', include('services.urls')),
     path('bookings/', include('bookings.urls')),
     path('payments/', include('payments.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) \
-  + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)  # DEBUG only; see smart_repair/staticfiles.py
 
 handler404 = 'core.views.custom_404'
 handler500 = 'core.views.custom_500'